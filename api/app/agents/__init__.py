@@ -1,5 +1,5 @@
 """Agent orchestration with LangGraph."""
 
-from .react_agent import agent_graph, run_agent, run_agent_stream
+from .react_agent import agent_graph, run_agent, run_agent_events, run_agent_stream
 
-__all__ = ["agent_graph", "run_agent", "run_agent_stream"]
+__all__ = ["agent_graph", "run_agent", "run_agent_events", "run_agent_stream"]
@@ -0,0 +1,135 @@
+"""Per-run budgets for the ReAct loop: model iterations, tokens and wall-clock time.
+
+The graph checks the budget before every model call. When it runs out, the graph goes to
+a `finalize` node that answers from the tool results gathered so far and makes no further
+LLM call. The request deadline also counts, so finalizing happens before the request
+deadline cancels the run.
+
+Every model call the agent makes is also recorded against the tenant's token quota with
+`record_message_usage`, the same accounting `LLMClient` applies to its calls.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Literal, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from app.core.deadline import remaining_seconds
+from app.llm.usage import estimate_tokens, record_usage
+
+
+StopReason = Literal["max_iterations", "token_budget", "timeout"]
+
+# Below this much time left, a model call cannot finish; finalize instead.
+_MIN_MODEL_CALL_SECONDS = 1.0
+_MAX_TOOL_RESULT_CHARS = 500
+
+
+@dataclass(frozen=True)
+class AgentBudget:
+    max_iterations: int
+    max_tokens: int
+    max_seconds: float
+
+    @classmethod
+    def from_settings(cls) -> AgentBudget:
+        from app.core.config import get_settings
+
+        settings = get_settings()
+        return cls(
+            max_iterations=settings.agent_max_iterations,
+            max_tokens=settings.agent_max_tokens,
+            max_seconds=settings.agent_max_seconds,
+        )
+
+    def seconds_left(self, started_at: float) -> float:
+        left = self.max_seconds - (time.monotonic() - started_at)
+        request_left = remaining_seconds()
+        return left if request_left is None else min(left, request_left)
+
+    def stop_reason(
+        self, *, iterations: int, tokens_used: int, started_at: float
+    ) -> StopReason | None:
+        """Why another model call is not allowed, or None when it is."""
+        if iterations >= self.max_iterations:
+            return "max_iterations"
+        if self.max_tokens > 0 and tokens_used >= self.max_tokens:
+            return "token_budget"
+        if self.seconds_left(started_at) < _MIN_MODEL_CALL_SECONDS:
+            return "timeout"
+        return None
+
+
+def message_usage(prompt: Sequence[BaseMessage], response: BaseMessage) -> tuple[int, int]:
+    """(prompt, completion) tokens for one model call.
+
+    Uses the provider-reported `usage_metadata`, else a character estimate.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.get("total_tokens"):
+        return int(usage.get("input_tokens") or 0), int(usage.get("output_tokens") or 0)
+    prompt_text = "".join(str(m.content) for m in prompt)
+    return estimate_tokens(prompt_text), estimate_tokens(str(response.content))
+
+
+def message_tokens(prompt: Sequence[BaseMessage], response: BaseMessage) -> int:
+    """Tokens for one model call: provider-reported usage, else a character estimate."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage and usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    return sum(message_usage(prompt, response))
+
+
+async def record_message_usage(
+    tenant_id: str, prompt: Sequence[BaseMessage], response: BaseMessage, *, flow: str
+) -> None:
+    """Count one LangChain model call against the tenant's token quota."""
+    prompt_tokens, completion_tokens = message_usage(prompt, response)
+    await record_usage(
+        tenant_id, flow=flow, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+    )
+
+
+def current_turn(messages: Sequence[BaseMessage]) -> Sequence[BaseMessage]:
+    """Messages from the last user message on; a resumed thread holds earlier turns too."""
+    start = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+    return messages[start:]
+
+
+_STOP_LEADS: dict[StopReason, str] = {
+    "timeout": "I ran out of time before finishing.",
+    "max_iterations": "I reached the step limit for this request before finishing.",
+    "token_budget": "I used up the token budget for this request before finishing.",
+}
+
+
+def final_answer(messages: Sequence[BaseMessage], reason: StopReason) -> AIMessage:
+    """Closing answer assembled from the tool results gathered in the current turn."""
+    results = [
+        m
+        for m in current_turn(messages)
+        if isinstance(m, ToolMessage) and getattr(m, "status", None) != "error"
+    ]
+    lead = _STOP_LEADS[reason]
+    if results:
+        lines = [f"{lead} Here is what I found so far:"]
+        for m in results:
+            content = str(m.content).strip()
+            if len(content) > _MAX_TOOL_RESULT_CHARS:
+                content = content[: _MAX_TOOL_RESULT_CHARS - 1].rstrip() + "…"
+            lines.append(f"- {m.name}: {content}")
+        text = "\n".join(lines)
+    else:
+        text = f"{lead} Try a simpler or more specific question."
+    return AIMessage(content=text, response_metadata={"stop_reason": reason})
+
+
+def stop_reason_of(messages: Sequence[Any]) -> StopReason | None:
+    """Stop reason recorded by the finalize node, if the run ended there."""
+    for m in reversed(messages):
+        if isinstance(m, AIMessage):
+            return (m.response_metadata or {}).get("stop_reason")
+    return None
@@ -11,6 +11,7 @@ from functools import lru_cache
 from typing import Any
 
 from app.core.config import Settings
+from app.llm.profiles import GenerationProfile, get_profile
 
 
 def _filter_init_kwargs(cls: type, kwargs: dict[str, Any]) -> dict[str, Any]:
@@ -35,8 +36,11 @@ def _cached_chat_model(
     api_key: str | None,
     timeout_seconds: float,
     max_retries: int,
+    profile: GenerationProfile,
 ) -> Any:
     base = str(base_url).rstrip("/")
+    temperature = profile.temperature if profile.temperature is not None else 0
+    stop = list(profile.stop) or None
 
     if provider == "ollama":
         from langchain_ollama import ChatOllama
@@ -44,9 +48,10 @@ def _cached_chat_model(
         kwargs: dict[str, Any] = {
             "base_url": base,
             "model": model,
-            "temperature": 0,
-            "num_ctx": 2048,
-            "num_predict": 512,
+            "temperature": temperature,
+            "num_ctx": profile.num_ctx or 2048,
+            "num_predict": profile.max_tokens or 512,
+            "stop": stop,
             # Some versions use `timeout`, others `request_timeout`.
             "timeout": timeout_seconds,
             "request_timeout": timeout_seconds,
@@ -60,19 +65,25 @@ def _cached_chat_model(
         "base_url": f"{base}/v1",
         "api_key": api_key or "not-needed",
         "model": model,
-        "temperature": 0,
+        "temperature": temperature,
+        "max_tokens": profile.max_tokens,
+        "stop": stop,
         "timeout": timeout_seconds,
         "max_retries": max_retries,
     }
     return ChatOpenAI(**_filter_init_kwargs(ChatOpenAI, kwargs))
 
 
-def create_chat_model(settings: Settings) -> Any:
-    """Create a configured LangChain chat model based on current settings."""
+def create_chat_model(settings: Settings, profile: GenerationProfile | None = None) -> Any:
+    """Create a configured LangChain chat model based on current settings.
+
+    `profile` defaults to the "agent" generation profile.
+    """
     if not settings.llm_base_url or not settings.llm_provider:
         return None
 
-    timeout_seconds = float(settings.llm_timeout_seconds)
+    profile = profile or get_profile("agent")
+    timeout_seconds = float(profile.timeout_seconds or settings.llm_timeout_seconds)
     max_retries = int(settings.llm_max_retries)
 
     return _cached_chat_model(
@@ -82,4 +93,5 @@ def create_chat_model(settings: Settings) -> Any:
         settings.llm_api_key,
         timeout_seconds,
         max_retries,
+        profile,
     )
@@ -0,0 +1,276 @@
+"""Persistent agent conversations: checkpointer selection and bounded, summarized history.
+
+With `AGENT_CONVERSATION_STORE` set, a chat request that carries a `conversation_id`
+resumes the tenant's LangGraph thread for that conversation (see `thread_id`) from the
+checkpointer. The client sends only the new message instead of resending the whole
+conversation.
+
+The stores are:
+
+- `memory` - per-process `InMemorySaver`, for development and tests
+- `database` - `DATABASE_URL`. SQLite needs `langgraph-checkpoint-sqlite` and Postgres
+  needs `langgraph-checkpoint-postgres`.
+- `redis` - `REDIS_URL`, needs `langgraph-checkpoint-redis`
+
+These packages are in the `checkpoint` extra. If a store cannot be opened, requests run
+stateless, as they do without a conversation id, and opening is retried after
+`AGENT_CONVERSATION_STORE_RETRY_SECONDS`.
+
+Each turn starts with `compact_history`. When the stored messages exceed
+`AGENT_HISTORY_MAX_TOKENS`, the oldest turns are removed from the thread and folded
+into a rolling `summary`, which the model sees in its system prompt. Prompt size stays
+roughly constant however long the conversation runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from contextlib import AsyncExitStack
+from typing import TYPE_CHECKING, Any, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from app.core.logging import get_logger
+from app.llm.usage import estimate_tokens
+
+from .budget import record_message_usage
+
+
+if TYPE_CHECKING:
+    from app.core.config import Settings
+
+logger = get_logger(__name__)
+
+_SUMMARY_PROMPT = """\
+You maintain a running summary of a conversation between a user and an assistant.
+Update the summary with the new messages below. Keep facts, names, numbers, document ids
+and open questions; drop pleasantries. Reply with the summary only, at most {words} words.
+"""
+
+_checkpointer: Any = None
+_exit_stack: AsyncExitStack | None = None
+# Serializes the first open, so concurrent requests do not each open (and leak) a store.
+_open_lock: asyncio.Lock | None = None
+# After a failed open, `time.monotonic()` before which requests stay stateless.
+_retry_at: float | None = None
+
+
+def thread_id(tenant_id: str, conversation_id: str) -> str:
+    """Checkpointer thread for a tenant's conversation; tenants never share threads.
+
+    The tenant id is length-prefixed because both ids may contain ":"; a plain
+    "tenant:conversation" key would let ("acme", "x:y") and ("acme:x", "y") collide.
+    """
+    return f"{len(tenant_id)}:{tenant_id}:{conversation_id}"
+
+
+async def _open_database_store(stack: AsyncExitStack, database_url: str) -> Any:
+    from sqlalchemy.engine import make_url
+
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        return await stack.enter_async_context(
+            AsyncSqliteSaver.from_conn_string(url.database or ":memory:")
+        )
+
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+
+    conninfo = url.set(drivername="postgresql").render_as_string(hide_password=False)
+    pool = AsyncConnectionPool(
+        conninfo=conninfo,
+        max_size=10,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        open=False,
+    )
+    await pool.open()
+    stack.push_async_callback(pool.close)
+    return AsyncPostgresSaver(pool)
+
+
+async def _open_redis_store(stack: AsyncExitStack, redis_url: str) -> Any:
+    from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+
+    return await stack.enter_async_context(AsyncRedisSaver.from_conn_string(redis_url))
+
+
+async def get_checkpointer() -> Any:
+    """Shared checkpointer for `AGENT_CONVERSATION_STORE`, or None (stateless)."""
+    global _open_lock
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    store = settings.agent_conversation_store
+    if store == "none":
+        return None
+    if _checkpointer is not None:
+        return _checkpointer
+    if _retry_at is not None and time.monotonic() < _retry_at:
+        return None
+
+    if _open_lock is None:
+        _open_lock = asyncio.Lock()
+    async with _open_lock:
+        # Another request may have opened the store, or failed to, while this one waited.
+        if _checkpointer is not None:
+            return _checkpointer
+        if _retry_at is not None and time.monotonic() < _retry_at:
+            return None
+        return await _open_store(store, settings)
+
+
+async def _open_store(store: str, settings: Settings) -> Any:
+    global _checkpointer, _exit_stack, _retry_at
+    if store == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+
+        _checkpointer = InMemorySaver()
+        return _checkpointer
+
+    stack = AsyncExitStack()
+    try:
+        if store == "redis":
+            if not settings.redis_url:
+                raise ValueError("AGENT_CONVERSATION_STORE=redis requires REDIS_URL")
+            saver = await _open_redis_store(stack, str(settings.redis_url))
+        else:
+            saver = await _open_database_store(stack, settings.database_url)
+        setup = getattr(saver, "asetup", None) or getattr(saver, "setup", None)
+        if setup is not None:
+            result = setup()
+            if inspect.isawaitable(result):
+                await result
+    except Exception as e:
+        await stack.aclose()
+        retry_seconds = settings.agent_conversation_store_retry_seconds
+        _retry_at = time.monotonic() + retry_seconds
+        logger.warning(
+            "agent.conversation_store_unavailable",
+            store=store,
+            error=str(e),
+            retry_in_seconds=retry_seconds,
+        )
+        return None
+    _checkpointer, _exit_stack, _retry_at = saver, stack, None
+    logger.info("agent.conversation_store_ready", store=store)
+    return _checkpointer
+
+
+async def close_checkpointer() -> None:
+    global _checkpointer, _exit_stack, _open_lock, _retry_at
+    if _exit_stack is not None:
+        await _exit_stack.aclose()
+    _checkpointer, _exit_stack, _open_lock, _retry_at = None, None, None, None
+
+
+def _history_tokens(messages: Sequence[BaseMessage]) -> int:
+    return sum(estimate_tokens(str(m.content)) for m in messages)
+
+
+def split_history(
+    messages: Sequence[BaseMessage], max_tokens: int
+) -> tuple[list[BaseMessage], list[BaseMessage]]:
+    """(older, recent): `recent` fits `max_tokens` where possible and starts at a user turn.
+
+    The latest user turn is always kept in full, so a tool call is never separated from
+    its results.
+    """
+    turn_starts = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+    if len(turn_starts) < 2 or _history_tokens(messages) <= max_tokens:
+        return [], list(messages)
+    cut = turn_starts[-1]
+    for start in reversed(turn_starts[:-1]):
+        if _history_tokens(messages[start:]) > max_tokens:
+            break
+        cut = start
+    return list(messages[:cut]), list(messages[cut:])
+
+
+def _transcript(messages: Sequence[BaseMessage], max_chars: int = 500) -> str:
+    lines = []
+    for m in messages:
+        if isinstance(m, HumanMessage):
+            role = "User"
+        elif isinstance(m, ToolMessage):
+            role = f"Tool {m.name}"
+        elif isinstance(m, AIMessage):
+            if not m.content:
+                continue
+            role = "Assistant"
+        else:
+            continue
+        content = str(m.content).strip()
+        if len(content) > max_chars:
+            content = content[: max_chars - 1].rstrip() + "…"
+        lines.append(f"{role}: {content}")
+    return "\n".join(lines)
+
+
+async def summarize_history(
+    model: Any,
+    summary: str,
+    older: Sequence[BaseMessage],
+    *,
+    max_words: int,
+    tenant_id: str = "default",
+) -> str:
+    """Fold `older` messages into the rolling summary; extractive if the model fails."""
+    transcript = _transcript(older)
+    prompt = [
+        SystemMessage(content=_SUMMARY_PROMPT.format(words=max_words)),
+        HumanMessage(
+            content=f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"
+        ),
+    ]
+    try:
+        response = await model.ainvoke(prompt)
+        await record_message_usage(tenant_id, prompt, response, flow="agent_history_summary")
+        text = str(response.content).strip()
+        if text:
+            return text
+    except Exception as e:  # noqa: BLE001 - fall back to an extractive summary
+        logger.warning("agent.history_summary_failed", error=str(e))
+    words = f"{summary}\n{transcript}".split()
+    return " ".join(words[-max_words:])
+
+
+def summary_system_prompt(base: str, summary: str | None) -> str:
+    if not summary:
+        return base
+    return f"{base}\nSummary of the earlier conversation:\n{summary}\n"
+
+
+async def compact_history(
+    model: Any, state: dict[str, Any], *, tenant_id: str = "default"
+) -> dict[str, Any]:
+    """Graph update that trims the thread to the token window, summarizing what it drops."""
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    older, _ = split_history(state["messages"], settings.agent_history_max_tokens)
+    if not older:
+        return {}
+    summary = await summarize_history(
+        model,
+        state.get("summary") or "",
+        older,
+        max_words=settings.agent_history_summary_max_words,
+        tenant_id=tenant_id,
+    )
+    logger.info("agent.history_compacted", removed_messages=len(older))
+    return {
+        "messages": [RemoveMessage(id=m.id) for m in older if m.id],
+        "summary": summary,
+    }
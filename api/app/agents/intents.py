@@ -0,0 +1,455 @@
+"""Deterministic intent router: answers common agent requests without the LLM loop.
+
+Each route has a matcher and a handler. The matcher returns a confidence for one message.
+A message that matches the whole phrasing of a route scores `_FULL_MATCH`. A message
+that only contains it somewhere scores `_PARTIAL_MATCH`. The best route at or above its
+threshold handles the request (`AGENT_INTENT_THRESHOLDS` overrides the per-route
+default). Everything else, including a handler that declines or fails, goes to the
+agent as before.
+
+Outcomes are counted in `ai_platform_agent_intent_routes_total{intent, outcome}`, so
+the hit rate is `outcome="hit"` over the total.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import statistics
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Sequence
+
+from app.core.deadline import flow_deadline_scope
+from app.core.logging import get_logger
+from app.core.metrics import AGENT_INTENT_ROUTES
+from app.llm.errors import LLMError
+
+from .tools.document_lookup import GetDocumentFn, lookup_document
+
+
+logger = get_logger(__name__)
+
+_FULL_MATCH = 0.95
+_PARTIAL_MATCH = 0.6
+_DEFAULT_THRESHOLD = 0.8
+
+_NUMBER = r"-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?"
+_NUMBER_LIST = rf"{_NUMBER}(?:\s*(?:,|and|&)?\s*{_NUMBER})*"
+_LEAD = r"(?:please\s+)?(?:what\s+is\s+|what\s+are\s+|find\s+|compute\s+|calculate\s+|convert\s+)?"
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    intent: str
+    confidence: float
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class IntentContext:
+    tenant_id: str
+    get_document_fn: GetDocumentFn
+
+
+@dataclass(frozen=True)
+class IntentAnswer:
+    intent: str
+    answer: str
+    tools_used: list[str]
+
+
+Matcher = Callable[[str], IntentMatch | None]
+# A handler returns None to decline; the request then goes to the agent.
+Handler = Callable[[IntentMatch, IntentContext], Awaitable[IntentAnswer | None]]
+
+
+@dataclass(frozen=True)
+class IntentRoute:
+    name: str
+    match: Matcher
+    handle: Handler
+    threshold: float = _DEFAULT_THRESHOLD
+
+
+def _normalize(message: str) -> str:
+    # Case is kept for document ids; every pattern is case-insensitive.
+    text = re.sub(r"\s+", " ", message).strip()
+    text = re.sub(r"\bwhat's\b", "what is", text, flags=re.IGNORECASE)
+    return text.rstrip("?.! ")
+
+
+def _parse_number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def _numbers(text: str) -> list[float]:
+    return [_parse_number(n) for n in re.findall(_NUMBER, text)]
+
+
+def _format_number(value: float) -> str:
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return f"{value:.6f}".rstrip("0").rstrip(".")
+
+
+def _regex_match(intent: str, pattern: re.Pattern[str], text: str) -> IntentMatch | None:
+    m = pattern.fullmatch(text)
+    if m:
+        return IntentMatch(intent, _FULL_MATCH, m.groupdict())
+    m = pattern.search(text)
+    if m:
+        return IntentMatch(intent, _PARTIAL_MATCH, m.groupdict())
+    return None
+
+
+# --- Statistics: median, min, max, standard deviation ---------------------------------
+
+_STAT_KEYWORDS = {
+    "median": "median",
+    "minimum": "min",
+    "min": "min",
+    "smallest": "min",
+    "lowest": "min",
+    "maximum": "max",
+    "max": "max",
+    "largest": "max",
+    "highest": "max",
+    "standard deviation": "stdev",
+    "std dev": "stdev",
+    "stdev": "stdev",
+}
+_STAT_LABELS = {
+    "median": "median",
+    "min": "minimum",
+    "max": "maximum",
+    "stdev": "standard deviation",
+}
+_STAT_RE = re.compile(
+    rf"{_LEAD}(?:the\s+)?\b(?P<op>{'|'.join(sorted(_STAT_KEYWORDS, key=len, reverse=True))})"
+    rf"\s+(?:(?:value\s+)?of\s+)?(?:the\s+)?(?:numbers\s+)?(?:in\s+)?(?P<nums>{_NUMBER_LIST})",
+    re.IGNORECASE,
+)
+
+
+def match_statistic(text: str) -> IntentMatch | None:
+    match = _regex_match("statistics", _STAT_RE, text)
+    if match is None:
+        return None
+    nums = _numbers(match.params["nums"])
+    op = _STAT_KEYWORDS[re.sub(r"\s+", " ", match.params["op"].lower())]
+    if op == "stdev" and len(nums) < 2:
+        return None
+    return IntentMatch(match.intent, match.confidence, {"op": op, "numbers": nums})
+
+
+async def handle_statistic(match: IntentMatch, ctx: IntentContext) -> IntentAnswer:
+    op, nums = match.params["op"], match.params["numbers"]
+    if op == "median":
+        value = statistics.median(nums)
+    elif op == "min":
+        value = min(nums)
+    elif op == "max":
+        value = max(nums)
+    else:
+        value = statistics.stdev(nums)
+    label = _STAT_LABELS[op]
+    answer = f"The {label} is {_format_number(value)}."
+    if op == "stdev":
+        answer = f"The sample {label} is {_format_number(value)}."
+    return IntentAnswer(match.intent, answer, ["calculator_tool"])
+
+
+# --- Percentages ----------------------------------------------------------------------
+
+_PERCENT_RES = (
+    (
+        "of",
+        re.compile(
+            rf"{_LEAD}(?P<a>{_NUMBER})\s*(?:%|percent)\s+of\s+(?P<b>{_NUMBER})", re.IGNORECASE
+        ),
+    ),
+    (
+        "ratio",
+        re.compile(
+            rf"(?:what\s+percent(?:age)?\s+is\s+(?P<a>{_NUMBER})\s+of\s+(?P<b>{_NUMBER})"
+            rf"|(?P<a2>{_NUMBER})\s+is\s+what\s+percent(?:age)?\s+of\s+(?P<b2>{_NUMBER}))",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "change",
+        re.compile(
+            rf"{_LEAD}(?:the\s+)?percent(?:age)?\s+(?:change|increase|decrease)\s+"
+            rf"from\s+(?P<a>{_NUMBER})\s+to\s+(?P<b>{_NUMBER})",
+            re.IGNORECASE,
+        ),
+    ),
+)
+
+
+def match_percentage(text: str) -> IntentMatch | None:
+    best: IntentMatch | None = None
+    for kind, pattern in _PERCENT_RES:
+        match = _regex_match("percentage", pattern, text)
+        if match and (best is None or match.confidence > best.confidence):
+            groups = match.params
+            a = groups.get("a") or groups.get("a2")
+            b = groups.get("b") or groups.get("b2")
+            best = IntentMatch(
+                match.intent,
+                match.confidence,
+                {"kind": kind, "a": _parse_number(a), "b": _parse_number(b)},
+            )
+    return best
+
+
+async def handle_percentage(match: IntentMatch, ctx: IntentContext) -> IntentAnswer | None:
+    kind, a, b = match.params["kind"], match.params["a"], match.params["b"]
+    if kind == "of":
+        answer = f"{_format_number(a)}% of {_format_number(b)} is {_format_number(a * b / 100)}."
+    elif kind == "ratio":
+        if b == 0:
+            return None
+        answer = f"{_format_number(a)} is {_format_number(a / b * 100)}% of {_format_number(b)}."
+    else:
+        if a == 0:
+            return None
+        change = (b - a) / abs(a) * 100
+        answer = (
+            f"The change from {_format_number(a)} to {_format_number(b)} "
+            f"is {'+' if change >= 0 else ''}{_format_number(change)}%."
+        )
+    return IntentAnswer(match.intent, answer, ["calculator_tool"])
+
+
+# --- Unit conversion ------------------------------------------------------------------
+
+# unit alias -> (dimension, canonical symbol, factor to the dimension's base unit)
+_UNITS: dict[str, tuple[str, str, float]] = {}
+
+
+def _add_units(dimension: str, symbol: str, factor: float, *aliases: str) -> None:
+    for alias in (symbol, *aliases):
+        _UNITS[alias] = (dimension, symbol, factor)
+
+
+_add_units("length", "mm", 0.001, "millimeter", "millimeters", "millimetre", "millimetres")
+_add_units("length", "cm", 0.01, "centimeter", "centimeters", "centimetre", "centimetres")
+_add_units("length", "m", 1.0, "meter", "meters", "metre", "metres")
+_add_units("length", "km", 1000.0, "kilometer", "kilometers", "kilometre", "kilometres")
+_add_units("length", "in", 0.0254, "inch", "inches")
+_add_units("length", "ft", 0.3048, "foot", "feet")
+_add_units("length", "yd", 0.9144, "yard", "yards")
+_add_units("length", "mi", 1609.344, "mile", "miles")
+_add_units("mass", "mg", 1e-6, "milligram", "milligrams")
+_add_units("mass", "g", 0.001, "gram", "grams")
+_add_units("mass", "kg", 1.0, "kilo", "kilos", "kilogram", "kilograms")
+_add_units("mass", "t", 1000.0, "tonne", "tonnes", "metric ton", "metric tons")
+_add_units("mass", "oz", 0.028349523125, "ounce", "ounces")
+_add_units("mass", "lb", 0.45359237, "lbs", "pound", "pounds")
+_add_units("volume", "ml", 0.001, "milliliter", "milliliters", "millilitre", "millilitres")
+_add_units("volume", "l", 1.0, "liter", "liters", "litre", "litres")
+_add_units("volume", "gal", 3.785411784, "gallon", "gallons")
+_add_units("temperature", "°C", 1.0, "c", "°c", "celsius", "degrees celsius")
+_add_units("temperature", "°F", 1.0, "f", "°f", "fahrenheit", "degrees fahrenheit")
+_add_units("temperature", "K", 1.0, "k", "kelvin", "kelvins")
+
+_UNIT_ALT = "|".join(re.escape(u) for u in sorted(_UNITS, key=len, reverse=True) if u != u.upper())
+_UNIT_RE = re.compile(
+    rf"{_LEAD}(?:how\s+many\s+(?P<dst2>{_UNIT_ALT})\s+(?:is|are|in)\s+)?"
+    rf"(?P<value>{_NUMBER})\s*(?P<src>{_UNIT_ALT})\b"
+    rf"(?:\s+(?:to|in|into|as)\s+(?P<dst>{_UNIT_ALT})\b)?",
+    re.IGNORECASE,
+)
+
+
+def _to_kelvin(value: float, symbol: str) -> float:
+    if symbol == "°C":
+        return value + 273.15
+    if symbol == "°F":
+        return (value - 32) * 5 / 9 + 273.15
+    return value
+
+
+def _from_kelvin(value: float, symbol: str) -> float:
+    if symbol == "°C":
+        return value - 273.15
+    if symbol == "°F":
+        return (value - 273.15) * 9 / 5 + 32
+    return value
+
+
+def match_unit_conversion(text: str) -> IntentMatch | None:
+    match = _regex_match("unit_conversion", _UNIT_RE, text)
+    if match is None:
+        return None
+    dst = match.params.get("dst") or match.params.get("dst2")
+    if not dst:
+        return None
+    src_dim, src, src_factor = _UNITS[match.params["src"].lower()]
+    dst_dim, dst, dst_factor = _UNITS[dst.lower()]
+    if src_dim != dst_dim or src == dst:
+        return None
+    return IntentMatch(
+        match.intent,
+        match.confidence,
+        {
+            "value": _parse_number(match.params["value"]),
+            "dimension": src_dim,
+            "src": (src, src_factor),
+            "dst": (dst, dst_factor),
+        },
+    )
+
+
+async def handle_unit_conversion(match: IntentMatch, ctx: IntentContext) -> IntentAnswer:
+    value = match.params["value"]
+    (src, src_factor), (dst, dst_factor) = match.params["src"], match.params["dst"]
+    if match.params["dimension"] == "temperature":
+        converted = _from_kelvin(_to_kelvin(value, src), dst)
+    else:
+        converted = value * src_factor / dst_factor
+    if not math.isfinite(converted):
+        return None
+    answer = f"{_format_number(value)} {src} is {_format_number(converted)} {dst}."
+    return IntentAnswer(match.intent, answer, ["calculator_tool"])
+
+
+# --- Documents ------------------------------------------------------------------------
+
+
+def _document_id_pattern() -> str:
+    from app.core.config import get_settings
+
+    return get_settings().agent_intent_document_id_pattern
+
+
+def match_document_fetch(text: str) -> IntentMatch | None:
+    doc_id = _document_id_pattern()
+    pattern = re.compile(
+        r"(?:please\s+)?(?:show|open|get|fetch|display|read|look\s*up)\s+(?:me\s+)?(?:the\s+)?"
+        rf"(?:document|doc)\s+#?(?P<id>{doc_id})",
+        re.IGNORECASE,
+    )
+    return _regex_match("document_fetch", pattern, text)
+
+
+_DUTCH_SUMMARY = ("vat ", "samenvatting", "akte")
+
+
+def match_document_summary(text: str) -> IntentMatch | None:
+    doc_id = _document_id_pattern()
+    pattern = re.compile(
+        r"(?:please\s+)?(?:summari[sz]e|give\s+(?:me\s+)?a\s+summary\s+of|"
+        r"vat|maak\s+een\s+samenvatting\s+van|samenvatting\s+van)\s+"
+        r"(?:the\s+|het\s+|de\s+)?(?:document|doc|deed|akte)\s+#?"
+        rf"(?P<id>{doc_id})(?:\s+samen)?",
+        re.IGNORECASE,
+    )
+    match = _regex_match("document_summary", pattern, text)
+    if match is None:
+        return None
+    lowered = text.lower()
+    language = "nl" if any(word in lowered for word in _DUTCH_SUMMARY) else "en"
+    return IntentMatch(match.intent, match.confidence, {**match.params, "language": language})
+
+
+async def handle_document_fetch(match: IntentMatch, ctx: IntentContext) -> IntentAnswer:
+    # The user asked to see the document, so it is shown as text (still capped).
+    answer = await lookup_document(
+        match.params["id"], ctx.tenant_id, ctx.get_document_fn, mode="full"
+    )
+    return IntentAnswer(match.intent, answer, ["document_lookup_tool"])
+
+
+async def handle_document_summary(match: IntentMatch, ctx: IntentContext) -> IntentAnswer | None:
+    from app.flows.common import AiFlowError, sanitize_flow_text
+    from app.flows.notary import notary_prompt
+    from app.services_llm import llm_client
+
+    document_id = match.params["id"]
+    document = await ctx.get_document_fn(document_id, ctx.tenant_id)
+    if not document:
+        return IntentAnswer(match.intent, f"Document '{document_id}' not found.", [])
+    try:
+        text = sanitize_flow_text(
+            document.get("text", ""),
+            tenant_id=ctx.tenant_id,
+            max_length=50000,
+            log_event="notary.input_validation_failed",
+        )
+        with flow_deadline_scope("notary"):
+            result = await llm_client.generate_notary_summary(
+                notary_prompt(text, match.params["language"]), tenant_id=ctx.tenant_id
+            )
+    except (AiFlowError, LLMError) as exc:
+        logger.warning("agent.intent_summary_failed", document_id=document_id, error=str(exc))
+        return None
+    return IntentAnswer(match.intent, result.raw_text, ["document_lookup_tool", "notary_summarize"])
+
+
+DEFAULT_ROUTES: tuple[IntentRoute, ...] = (
+    IntentRoute("statistics", match_statistic, handle_statistic),
+    IntentRoute("percentage", match_percentage, handle_percentage),
+    IntentRoute("unit_conversion", match_unit_conversion, handle_unit_conversion),
+    IntentRoute("document_fetch", match_document_fetch, handle_document_fetch),
+    IntentRoute("document_summary", match_document_summary, handle_document_summary),
+)
+
+
+class IntentRouter:
+    """Picks the most confident route above its threshold and runs its handler."""
+
+    def __init__(self, routes: Sequence[IntentRoute] = DEFAULT_ROUTES) -> None:
+        self._routes = list(routes)
+
+    @property
+    def routes(self) -> list[IntentRoute]:
+        return list(self._routes)
+
+    def register(self, route: IntentRoute) -> None:
+        self._routes = [r for r in self._routes if r.name != route.name] + [route]
+
+    def _threshold(self, route: IntentRoute) -> float:
+        from app.core.config import get_settings
+
+        overrides = get_settings().agent_intent_thresholds
+        return float(overrides.get(route.name, route.threshold))
+
+    def select(self, message: str) -> tuple[IntentRoute, IntentMatch] | None:
+        """Best route for `message`, or None. Below-threshold matches are counted."""
+        text = _normalize(message)
+        best: tuple[IntentRoute, IntentMatch] | None = None
+        for route in self._routes:
+            match = route.match(text)
+            if match is None:
+                continue
+            if match.confidence < self._threshold(route):
+                AGENT_INTENT_ROUTES.labels(intent=route.name, outcome="below_threshold").inc()
+                continue
+            if best is None or match.confidence > best[1].confidence:
+                best = (route, match)
+        return best
+
+    async def route(self, message: str, ctx: IntentContext) -> IntentAnswer | None:
+        from app.core.config import get_settings
+
+        if get_settings().agent_intent_routing_enabled is False:
+            return None
+        selected = self.select(message)
+        if selected is None:
+            AGENT_INTENT_ROUTES.labels(intent="none", outcome="miss").inc()
+            return None
+        route, match = selected
+        try:
+            answer = await route.handle(match, ctx)
+        except Exception as e:  # noqa: BLE001 - the agent answers instead
+            logger.warning("agent.intent_route_failed", intent=route.name, error=str(e))
+            AGENT_INTENT_ROUTES.labels(intent=route.name, outcome="failed").inc()
+            return None
+        outcome = "hit" if answer is not None else "declined"
+        AGENT_INTENT_ROUTES.labels(intent=route.name, outcome=outcome).inc()
+        return answer
+
+
+intent_router = IntentRouter()
@@ -2,26 +2,56 @@
 
 from __future__ import annotations
 
+import asyncio
 import re
-from typing import Annotated, Any, AsyncIterator, Awaitable, Callable, Literal, Sequence, TypedDict
+import time
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Literal,
+    Sequence,
+    TypedDict,
+)
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode
 
+from app.core.deadline import deadline_expired, flow_deadline_scope, run_within_deadline
 from app.core.logging import get_logger
+from app.core.metrics import AGENT_DURATION, AGENT_EXECUTIONS, AGENT_INTENT_ROUTES
+from app.llm.profiles import get_profile
+from app.llm.streaming import StreamObserver
 from app.security import sanitize_user_input
 
+from .budget import (
+    AgentBudget,
+    current_turn,
+    final_answer,
+    message_tokens,
+    record_message_usage,
+    stop_reason_of,
+)
 from .chat_models import create_chat_model
+from .conversations import compact_history, get_checkpointer, summary_system_prompt, thread_id
+from .intents import IntentContext, intent_router
 from .prompts import REACT_SYSTEM_PROMPT
-from .tools import BASE_TOOLS, calculator_tool, create_document_lookup_tool
-from .tools.search import SearchToolError, SearchToolNoResults, search_web
+from .speculation import SpeculativeSearch, first_success, speculation_budget
+from .tool_executor import ToolExecutor
+from .tools import AGENT_TOOLS, calculator_tool, document_lookup_config
+from .tools.document_lookup import GetDocumentFn, SearchPassagesFn
+from .tools.search import SearchToolError, SearchToolNoResults, asearch_web
 
 logger = get_logger(__name__)
 
-GetDocumentFn = Callable[[str, str], Awaitable[dict[str, Any] | None]]
+_DEADLINE_EXCEEDED_ANSWER = (
+    "This request ran out of time before an answer was ready. "
+    "Try a simpler question or try again later."
+)
 
 
 def _translate_math_intent(message: str) -> tuple[str, str] | None:
@@ -105,52 +135,164 @@ class AgentState(TypedDict):
     """State for the ReAct agent."""
 
     messages: Annotated[Sequence[BaseMessage], add_messages]
+    # Budget bookkeeping for the current run (see app.agents.budget).
+    iterations: int
+    tokens_used: int
+    started_at: float | None
+    stop_reason: str | None
+    # Rolling summary of turns compacted out of a persistent conversation.
+    summary: str | None
 
 
-def _create_agent_graph(tools: list) -> Any:
-    """Build the ReAct graph with given tools."""
-    from app.core.config import get_settings
+def _tenant_of(config: RunnableConfig) -> str:
+    return (config.get("configurable") or {}).get("tenant_id") or "default"
 
-    settings = get_settings()
-    model = create_chat_model(settings)
-    if not model:
-        return None
+
+def _create_agent_graph(model: Any, tools: list, checkpointer: Any = None) -> Any:
+    """Build and compile the ReAct graph for a chat model and tools."""
     model_with_tools = model.bind_tools(tools)
 
-    def call_model(state: AgentState, config: RunnableConfig) -> dict:
-        system = SystemMessage(content=REACT_SYSTEM_PROMPT)
-        response = model_with_tools.invoke(
-            [system] + list(state["messages"]),
-            config,
+    async def compact(state: AgentState, config: RunnableConfig) -> dict:
+        return await compact_history(model, state, tenant_id=_tenant_of(config))
+
+    async def call_model(state: AgentState, config: RunnableConfig) -> dict:
+        # Async so concurrent chats wait on the model as coroutines, not executor threads.
+        budget = AgentBudget.from_settings()
+        started_at = state.get("started_at") or time.monotonic()
+        iterations = state.get("iterations") or 0
+        tokens_used = state.get("tokens_used") or 0
+        reason = budget.stop_reason(
+            iterations=iterations, tokens_used=tokens_used, started_at=started_at
         )
-        return {"messages": [response]}
+        if reason:
+            return {"stop_reason": reason, "started_at": started_at}
 
-    tool_node = ToolNode(tools)
+        system = summary_system_prompt(REACT_SYSTEM_PROMPT, state.get("summary"))
+        prompt = [SystemMessage(content=system)] + list(state["messages"])
+        try:
+            response = await asyncio.wait_for(
+                model_with_tools.ainvoke(prompt, config),
+                timeout=budget.seconds_left(started_at),
+            )
+        except asyncio.TimeoutError:
+            return {"stop_reason": "timeout", "started_at": started_at}
+        await record_message_usage(_tenant_of(config), prompt, response, flow="agent")
+        return {
+            "messages": [response],
+            "iterations": iterations + 1,
+            "tokens_used": tokens_used + message_tokens(prompt, response),
+            "started_at": started_at,
+        }
+
+    def finalize(state: AgentState) -> dict:
+        return {"messages": [final_answer(state["messages"], state["stop_reason"])]}
+
+    tool_node = ToolExecutor(tools)
 
     workflow = StateGraph(AgentState)
+    workflow.add_node("compact", compact)
     workflow.add_node("agent", call_model)
     workflow.add_node("tools", tool_node)
-    workflow.set_entry_point("agent")
+    workflow.add_node("finalize", finalize)
+    workflow.set_entry_point("compact")
+    workflow.add_edge("compact", "agent")
 
     def should_continue(state: AgentState) -> str:
+        if state.get("stop_reason"):
+            return "finalize"
         last = state["messages"][-1]
         if isinstance(last, AIMessage) and last.tool_calls:
             return "tools"
         return "end"
 
-    workflow.add_conditional_edges("agent", should_continue, {"tools": "tools", "end": END})
+    workflow.add_conditional_edges(
+        "agent", should_continue, {"tools": "tools", "finalize": "finalize", "end": END}
+    )
     workflow.add_edge("tools", "agent")
-    return workflow.compile()
+    workflow.add_edge("finalize", END)
+    return workflow.compile(checkpointer=checkpointer)
+
 
+# Compiled graphs keyed by chat model and checkpointer identity. `create_chat_model`
+# returns one cached instance per model configuration, so this holds one graph per
+# configuration (stateless and persistent); both objects are kept in the value so their
+# ids cannot be reused while the entry exists.
+_GRAPH_CACHE: dict[tuple[int, int], tuple[Any, Any, Any]] = {}
+_GRAPH_CACHE_SIZE = 8
 
-def agent_graph(
+
+def agent_graph(checkpointer: Any = None) -> Any:
+    """Compiled agent graph for the current model configuration (None if LLM is unset).
+
+    The graph is shared across requests and tenants; pass the tenant through
+    `_run_config` when invoking it. With a checkpointer, runs resume the conversation
+    thread named in the run config.
+    """
+    from app.core.config import get_settings
+
+    model = create_chat_model(get_settings(), get_profile("agent"))
+    if not model:
+        return None
+    key = (id(model), id(checkpointer))
+    cached = _GRAPH_CACHE.get(key)
+    if cached is not None and cached[0] is model and cached[1] is checkpointer:
+        return cached[2]
+    graph = _create_agent_graph(model, AGENT_TOOLS, checkpointer)
+    if len(_GRAPH_CACHE) >= _GRAPH_CACHE_SIZE:
+        _GRAPH_CACHE.pop(next(iter(_GRAPH_CACHE)))
+    _GRAPH_CACHE[key] = (model, checkpointer, graph)
+    return graph
+
+
+def _run_config(
     tenant_id: str,
     get_document_fn: GetDocumentFn,
-) -> Any:
-    """Create the agent graph with document lookup bound to tenant."""
-    doc_tool = create_document_lookup_tool(tenant_id, get_document_fn)
-    tools = BASE_TOOLS + [doc_tool]
-    return _create_agent_graph(tools)
+    conversation_id: str | None = None,
+    *,
+    question: str | None = None,
+    search_passages_fn: SearchPassagesFn | None = None,
+) -> RunnableConfig:
+    budget = AgentBudget.from_settings()
+    configurable = document_lookup_config(
+        tenant_id, get_document_fn, search_passages_fn=search_passages_fn, question=question
+    )
+    if conversation_id:
+        configurable["thread_id"] = thread_id(tenant_id, conversation_id)
+    return {
+        "configurable": configurable,
+        # Backstop only; the iteration budget normally ends the loop first.
+        "recursion_limit": 2 * budget.max_iterations + 6,
+    }
+
+
+def _agent_inputs(message: str) -> dict[str, Any]:
+    """Graph input for one run; budget counters start fresh each time."""
+    return {
+        "messages": [HumanMessage(content=message)],
+        "iterations": 0,
+        "tokens_used": 0,
+        "started_at": None,
+        "stop_reason": None,
+    }
+
+
+_STOP_REASON_ERRORS = {
+    "timeout": "timeout",
+    "max_iterations": "budget_exhausted",
+    "token_budget": "budget_exhausted",
+}
+_EXECUTION_STATUS = {
+    None: "success",
+    "deadline_exceeded": "timeout",
+    "timeout": "timeout",
+    "budget_exhausted": "budget_exhausted",
+    "cancelled": "cancelled",
+}
+
+
+def _record_execution(tenant_id: str, error: str | None, started: float) -> None:
+    AGENT_EXECUTIONS.labels(tenant_id=tenant_id, status=_EXECUTION_STATUS.get(error, "error")).inc()
+    AGENT_DURATION.labels(tenant_id=tenant_id).observe(time.perf_counter() - started)
 
 
 def _get_model_without_tools() -> Any:
@@ -158,7 +300,7 @@ def _get_model_without_tools() -> Any:
     from app.core.config import get_settings
 
     settings = get_settings()
-    return create_chat_model(settings)
+    return create_chat_model(settings, get_profile("summarizer"))
 
 
 async def _summarize_search_results(
@@ -166,6 +308,7 @@ async def _summarize_search_results(
     *,
     search_content: str,
     strict_english: bool,
+    tenant_id: str = "default",
 ) -> str | None:
     """Summarize search results for a user question."""
     model = _get_model_without_tools()
@@ -195,10 +338,12 @@ async def _summarize_search_results(
         f"Search results:\n{search_content[:2000]}"
     )
 
+    messages = [system, HumanMessage(content=prompt)]
     try:
-        response = await model.ainvoke([system, HumanMessage(content=prompt)])
+        response = await model.ainvoke(messages)
     except Exception:
         return None
+    await record_message_usage(tenant_id, messages, response, flow="agent_search_summary")
 
     content = getattr(response, "content", None)
     if not content:
@@ -213,42 +358,147 @@ async def _summarize_search_results(
 WebFallbackStatus = Literal["ok", "no_results", "search_failed", "summarize_failed"]
 
 
-async def _web_fallback_answer(message: str) -> tuple[str | None, WebFallbackStatus]:
-    """Try answering by searching the web and summarizing results."""
-    query = _search_query_from_message(message)
+async def _web_fallback_answer(
+    message: str,
+    speculation: SpeculativeSearch | None = None,
+    *,
+    tenant_id: str = "default",
+) -> tuple[str | None, WebFallbackStatus]:
+    """Try answering by searching the web and summarizing results.
+
+    `speculation` is a search already started alongside the graph. With speculation
+    enabled, both summarizer prompts race and the first usable answer wins.
+    """
+    query = speculation.query if speculation else _search_query_from_message(message)
     try:
-        search_content = search_web(query)
+        search_content = await (speculation.result() if speculation else asearch_web(query))
     except SearchToolNoResults:
         return None, "no_results"
     except SearchToolError as e:
         logger.warning("react_agent.search_failed", error=str(e), query=query)
         return None, "search_failed"
 
-    summary = await _summarize_search_results(
-        message,
-        search_content=search_content,
-        strict_english=False,
-    )
-    if summary:
-        return summary, "ok"
+    def summarize(strict_english: bool) -> Callable[[], Awaitable[str | None]]:
+        return lambda: _summarize_search_results(
+            message,
+            search_content=search_content,
+            strict_english=strict_english,
+            tenant_id=tenant_id,
+        )
 
-    summary = await _summarize_search_results(
-        message,
-        search_content=search_content,
-        strict_english=True,
-    )
+    if speculation_budget() is not None:
+        summary = await first_success(summarize(False), summarize(True))
+    else:
+        summary = await summarize(False)() or await summarize(True)()
     if summary:
         return summary, "ok"
 
     return None, "summarize_failed"
 
 
+def _web_fallback_result(
+    summary: str | None,
+    status: WebFallbackStatus,
+    tools_used: list[str],
+) -> tuple[str, list[str]]:
+    """Map a web-fallback outcome to the user-facing answer and tools used."""
+    if summary:
+        return summary, list(dict.fromkeys(tools_used + ["search_tool"]))
+    if status == "summarize_failed":
+        return (
+            "I found some information but couldn't format it properly. "
+            "Try rephrasing your question, or use math (e.g. average of 1,2,5,6) "
+            "or document lookup.",
+            list(dict.fromkeys(tools_used + ["search_tool"])),
+        )
+    if status == "search_failed":
+        return (
+            "I couldn't perform a web search right now. Try rephrasing your question "
+            "or try again later.",
+            tools_used,
+        )
+    return (
+        "I couldn't find an answer. Try asking again or rephrasing. "
+        "You can also try math (e.g. average of 1,2,5,6) or document lookup.",
+        tools_used,
+    )
+
+
+async def _shortcut_answer(
+    tenant_id: str, message: str, get_document_fn: GetDocumentFn
+) -> tuple[str, list[str]] | None:
+    """(answer, tools_used) when a deterministic route answers without the agent loop."""
+    translated = _translate_math_intent(message)
+    if translated:
+        expr, intent = translated
+        try:
+            result = calculator_tool.invoke({"expression": expr})
+            if result.startswith("Error:"):
+                answer = result
+            else:
+                label = (
+                    "average" if intent == "average" else "sum" if intent == "sum" else "product"
+                )
+                answer = f"The {label} is {result}."
+            AGENT_INTENT_ROUTES.labels(intent="arithmetic", outcome="hit").inc()
+            return answer, ["calculator_tool"]
+        except Exception as e:
+            AGENT_INTENT_ROUTES.labels(intent="arithmetic", outcome="failed").inc()
+            logger.warning(
+                "react_agent.math_intent_failed", error=str(e), expression=expr, intent=intent
+            )
+
+    routed = await intent_router.route(message, IntentContext(tenant_id, get_document_fn))
+    if routed:
+        return routed.answer, routed.tools_used
+    return None
+
+
+async def _remember_turn(tenant_id: str, conversation_id: str, message: str, answer: str) -> None:
+    """Append a turn answered outside the graph to the conversation thread."""
+    checkpointer = await get_checkpointer()
+    graph = agent_graph(checkpointer) if checkpointer else None
+    if not graph:
+        return
+    config: RunnableConfig = {"configurable": {"thread_id": thread_id(tenant_id, conversation_id)}}
+    try:
+        await graph.aupdate_state(
+            config,
+            {"messages": [HumanMessage(content=message), AIMessage(content=answer)]},
+            as_node="agent",
+        )
+    except Exception as e:  # noqa: BLE001 - history is best-effort for shortcut answers
+        logger.warning("react_agent.remember_turn_failed", tenant_id=tenant_id, error=str(e))
+
+
 async def run_agent(
     tenant_id: str,
     message: str,
     get_document_fn: GetDocumentFn,
+    conversation_id: str | None = None,
+    search_passages_fn: SearchPassagesFn | None = None,
+) -> dict[str, Any]:
+    """Run the agent and return the final response.
+
+    With a `conversation_id` (and `AGENT_CONVERSATION_STORE` configured) the run resumes
+    that conversation's stored history. `search_passages_fn` lets document lookup use the
+    RAG index.
+    """
+    started = time.perf_counter()
+    result = await _run_agent(
+        tenant_id, message, get_document_fn, conversation_id, search_passages_fn
+    )
+    _record_execution(tenant_id, result.get("error"), started)
+    return result
+
+
+async def _run_agent(
+    tenant_id: str,
+    message: str,
+    get_document_fn: GetDocumentFn,
+    conversation_id: str | None,
+    search_passages_fn: SearchPassagesFn | None,
 ) -> dict[str, Any]:
-    """Run the agent and return the final response."""
     # Sanitize user input for security
     try:
         message = sanitize_user_input(
@@ -269,25 +519,15 @@ async def run_agent(
             "error": "input_validation_failed",
         }
 
-    translated = _translate_math_intent(message)
-    if translated:
-        expr, intent = translated
-        try:
-            result = calculator_tool.invoke({"expression": expr})
-            if result.startswith("Error:"):
-                answer = result
-            else:
-                label = (
-                    "average" if intent == "average" else "sum" if intent == "sum" else "product"
-                )
-                answer = f"The {label} is {result}."
-            return {"answer": answer, "tools_used": ["calculator_tool"]}
-        except Exception as e:
-            logger.warning(
-                "react_agent.math_intent_failed", error=str(e), expression=expr, intent=intent
-            )
+    shortcut = await _shortcut_answer(tenant_id, message, get_document_fn)
+    if shortcut:
+        answer, tools_used = shortcut
+        if conversation_id:
+            await _remember_turn(tenant_id, conversation_id, message, answer)
+        return {"answer": answer, "tools_used": tools_used}
 
-    graph = agent_graph(tenant_id, get_document_fn)
+    checkpointer = await get_checkpointer() if conversation_id else None
+    graph = agent_graph(checkpointer)
     if not graph:
         return {"answer": "LLM not configured.", "tools_used": [], "error": "llm_not_configured"}
 
@@ -303,56 +543,144 @@ async def run_agent(
                 final = final.strip() or "No response."
                 break
 
-        for m in messages:
+        # A resumed conversation returns the whole thread; tools count for this turn only.
+        for m in current_turn(messages):
             if isinstance(m, ToolMessage) and getattr(m, "name", None):
                 used.append(m.name)
 
         return final or "No response.", list(dict.fromkeys(used))
 
-    inputs = {"messages": [HumanMessage(content=message)]}
+    inputs = _agent_inputs(message)
+    # Questions likely to end on the web fallback start their search alongside the graph.
+    speculation = SpeculativeSearch.maybe_start(message, _search_query_from_message(message))
     try:
-        result = await graph.ainvoke(inputs)
-    except Exception as e:
-        logger.exception("react_agent.graph_invoke_failed", tenant_id=tenant_id, error=str(e))
-        return {
-            "answer": "Something went wrong while generating a response. Please try again.",
-            "tools_used": [],
-            "error": "agent_failed",
-        }
-    answer, tools_used = _extract_result(result)
-
-    if _is_malformed(answer) or not answer or answer == "No response.":
-        summary, status = await _web_fallback_answer(message)
-        if summary:
-            answer = summary
-            tools_used = list(dict.fromkeys(tools_used + ["search_tool"]))
-        elif status == "summarize_failed":
-            answer = (
-                "I found some information but couldn't format it properly. "
-                "Try rephrasing your question, or use math (e.g. average of 1,2,5,6) "
-                "or document lookup."
-            )
-            tools_used = list(dict.fromkeys(tools_used + ["search_tool"]))
-        elif status == "search_failed":
-            answer = (
-                "I couldn't perform a web search right now. Try rephrasing your question "
-                "or try again later."
-            )
-        else:
-            answer = (
-                "I couldn't find an answer. Try asking again or rephrasing. "
-                "You can also try math (e.g. average of 1,2,5,6) or document lookup."
-            )
+        with flow_deadline_scope("agent"):
+            try:
+                result = await run_within_deadline(
+                    graph.ainvoke(
+                        inputs,
+                        _run_config(
+                            tenant_id,
+                            get_document_fn,
+                            conversation_id,
+                            question=message,
+                            search_passages_fn=search_passages_fn,
+                        ),
+                    )
+                )
+            except asyncio.TimeoutError:
+                logger.info("react_agent.deadline_exceeded", tenant_id=tenant_id, stage="graph")
+                return {
+                    "answer": _DEADLINE_EXCEEDED_ANSWER,
+                    "tools_used": [],
+                    "error": "deadline_exceeded",
+                }
+            except Exception as e:
+                logger.exception(
+                    "react_agent.graph_invoke_failed", tenant_id=tenant_id, error=str(e)
+                )
+                return {
+                    "answer": "Something went wrong while generating a response. Please try again.",
+                    "tools_used": [],
+                    "error": "agent_failed",
+                }
+            answer, tools_used = _extract_result(result)
+
+            stop_reason = stop_reason_of(result.get("messages") or [])
+            if stop_reason:
+                logger.info("react_agent.budget_exhausted", tenant_id=tenant_id, reason=stop_reason)
+                return {
+                    "answer": answer,
+                    "tools_used": tools_used,
+                    "error": _STOP_REASON_ERRORS[stop_reason],
+                }
+
+            needs_fallback = _is_malformed(answer) or not answer or answer == "No response."
+            if needs_fallback and deadline_expired():
+                logger.info("react_agent.deadline_exceeded", tenant_id=tenant_id, stage="fallback")
+                return {
+                    "answer": _DEADLINE_EXCEEDED_ANSWER,
+                    "tools_used": tools_used,
+                    "error": "deadline_exceeded",
+                }
+            if needs_fallback:
+                try:
+                    summary, status = await run_within_deadline(
+                        _web_fallback_answer(message, speculation, tenant_id=tenant_id)
+                    )
+                except asyncio.TimeoutError:
+                    summary, status = None, "search_failed"
+                answer, tools_used = _web_fallback_result(summary, status, tools_used)
+
+    finally:
+        if speculation:
+            speculation.discard()
 
     return {"answer": answer, "tools_used": tools_used}
 
 
+def _token_text(msg: Any) -> str:
+    if isinstance(msg, AIMessage):
+        content = msg.content
+    elif isinstance(msg, dict):
+        content = msg.get("content")
+    else:
+        return ""
+    if not content:
+        return ""
+    return content if isinstance(content, str) else str(content)
+
+
 async def run_agent_stream(
     tenant_id: str,
     message: str,
     get_document_fn: GetDocumentFn,
+    conversation_id: str | None = None,
+    search_passages_fn: SearchPassagesFn | None = None,
 ) -> AsyncIterator[str]:
     """Stream agent response tokens."""
+    events = run_agent_events(
+        tenant_id, message, get_document_fn, conversation_id, search_passages_fn
+    )
+    try:
+        async for event in events:
+            if event["type"] == "token":
+                yield event["content"]
+    finally:
+        await events.aclose()
+
+
+async def run_agent_events(
+    tenant_id: str,
+    message: str,
+    get_document_fn: GetDocumentFn,
+    conversation_id: str | None = None,
+    search_passages_fn: SearchPassagesFn | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Stream the agent run as typed events.
+
+    Events have a `type`:
+
+    - `node_start` / `node_end` - a graph node ran; `node_end` carries `duration_ms`
+    - `tool_start` / `tool_end` - a tool call with its `args`, then `status` and `duration_ms`
+    - `token` - a `content` delta of the answer
+    - `done` - last event: `iterations`, `tokens_used`, `tools_used`, `duration_ms`, and
+      `error` when the run did not answer normally
+    """
+    started = time.perf_counter()
+    summary: dict[str, Any] = {"iterations": 0, "tokens_used": 0, "tools_used": []}
+
+    def done(error: str | None = None) -> dict[str, Any]:
+        event = {
+            "type": "done",
+            **summary,
+            "tools_used": list(dict.fromkeys(summary["tools_used"])),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        if error:
+            event["error"] = error
+        return event
+
     # Sanitize user input for security (match run_agent behavior)
     try:
         message = sanitize_user_input(
@@ -367,42 +695,96 @@ async def run_agent_stream(
             tenant_id=tenant_id,
             error=str(e),
         )
-        yield "Input validation failed. Please check your input and try again."
+        yield {
+            "type": "token",
+            "content": "Input validation failed. Please check your input and try again.",
+        }
+        yield done("input_validation_failed")
         return
 
-    translated = _translate_math_intent(message)
-    if translated:
-        expr, intent = translated
-        try:
-            result = calculator_tool.invoke({"expression": expr})
-            if result.startswith("Error:"):
-                answer = result
-            else:
-                label = (
-                    "average" if intent == "average" else "sum" if intent == "sum" else "product"
-                )
-                answer = f"The {label} is {result}."
-            yield answer
-            return
-        except Exception as e:
-            logger.warning(
-                "react_agent.math_intent_failed", error=str(e), expression=expr, intent=intent
-            )
+    shortcut = await _shortcut_answer(tenant_id, message, get_document_fn)
+    if shortcut:
+        if conversation_id:
+            await _remember_turn(tenant_id, conversation_id, message, shortcut[0])
+        summary["tools_used"] = shortcut[1]
+        yield {"type": "token", "content": shortcut[0]}
+        yield done()
+        return
 
-    graph = agent_graph(tenant_id, get_document_fn)
+    checkpointer = await get_checkpointer() if conversation_id else None
+    graph = agent_graph(checkpointer)
     if not graph:
-        yield "LLM not configured. Set LLM_PROVIDER and LLM_BASE_URL."
+        yield {"type": "token", "content": "LLM not configured. Set LLM_PROVIDER and LLM_BASE_URL."}
+        yield done("llm_not_configured")
         return
 
-    inputs = {"messages": [HumanMessage(content=message)]}
+    from app.core.config import get_settings
+
+    inputs = _agent_inputs(message)
+    settings = get_settings()
+    observer = StreamObserver(
+        provider=settings.llm_provider or "none", model=settings.llm_model, flow="agent_stream"
+    )
+    node_started: dict[str, float] = {}
+    error: str | None = None
     try:
-        async for msg, metadata in graph.astream(inputs, stream_mode="messages"):
-            if isinstance(msg, AIMessage) and msg.content:
-                yield msg.content if isinstance(msg.content, str) else str(msg.content)
-            elif isinstance(msg, dict):
-                content = msg.get("content")
-                if content:
-                    yield content if isinstance(content, str) else str(content)
+        # Same per-flow deadline as `run_agent`; the graph finalizes early when it runs low.
+        with flow_deadline_scope("agent"):
+            async for mode, chunk in graph.astream(
+                inputs,
+                _run_config(
+                    tenant_id,
+                    get_document_fn,
+                    conversation_id,
+                    question=message,
+                    search_passages_fn=search_passages_fn,
+                ),
+                stream_mode=["messages", "tasks", "custom"],
+            ):
+                if mode == "messages":
+                    msg, metadata = chunk
+                    node = metadata.get("langgraph_node")
+                    if node == "finalize" and isinstance(msg, AIMessage):
+                        error = _STOP_REASON_ERRORS.get(stop_reason_of([msg]) or "", error)
+                    # The `compact` node's history summary is not part of the answer.
+                    text = _token_text(msg) if node != "compact" else ""
+                    if text:
+                        observer.on_token()
+                        yield {"type": "token", "content": text}
+                elif mode == "custom":
+                    if isinstance(chunk, dict) and chunk.get("type") == "tool_end":
+                        summary["tools_used"].append(chunk["tool"])
+                    yield chunk
+                elif "result" not in chunk:
+                    node_started[chunk["id"]] = time.perf_counter()
+                    yield {"type": "node_start", "node": chunk["name"]}
+                else:
+                    elapsed = time.perf_counter() - node_started.pop(chunk["id"], started)
+                    result = chunk["result"]
+                    if isinstance(result, dict):
+                        for key in ("iterations", "tokens_used"):
+                            if key in result:
+                                summary[key] = result[key]
+                    event = {
+                        "type": "node_end",
+                        "node": chunk["name"],
+                        "duration_ms": round(elapsed * 1000, 1),
+                    }
+                    if chunk.get("error") is not None:
+                        event["error"] = str(chunk["error"])
+                    yield event
+    except (GeneratorExit, asyncio.CancelledError):
+        # The client went away (SSE disconnect); the run neither answered nor failed.
+        error = "cancelled"
+        raise
     except Exception as e:
+        error = "agent_failed"
         logger.exception("react_agent.graph_stream_failed", tenant_id=tenant_id, error=str(e))
-        yield "Something went wrong while generating a response. Please try again."
+        yield {
+            "type": "token",
+            "content": "Something went wrong while generating a response. Please try again.",
+        }
+    finally:
+        observer.finish()
+        _record_execution(tenant_id, error, started)
+    yield done(error)
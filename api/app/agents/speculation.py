@@ -0,0 +1,172 @@
+"""Speculative web fallback for the agent.
+
+When the graph returns malformed or empty output, `run_agent` falls back to a web search
+and a summary. Run in order, that costs a search plus up to two summarize calls after
+the graph has already failed. With `AGENT_SPECULATIVE_FALLBACK_ENABLED`, two things change:
+
+- For messages that look like they need fresh web data, the search starts alongside the
+  graph and is discarded if the graph answers.
+- The plain and the strict-English summarize prompts run concurrently, and the first
+  usable answer wins.
+
+Both draw on one `HedgeBudget`: speculative work is capped at
+`AGENT_SPECULATIVE_BUDGET_PERCENT` of agent runs. Results are counted in
+`ai_platform_agent_speculation_total{kind, outcome}`. Seconds saved on the fallback path
+and spent on discarded work are in `ai_platform_agent_speculation_seconds_total`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from app.core.metrics import AGENT_SPECULATION, AGENT_SPECULATION_SECONDS
+from app.llm.hedging import HedgeBudget
+
+from .tools.search import asearch_web
+
+
+T = TypeVar("T")
+
+# Questions about fresh or external facts, which the small agent model often fails on.
+_WEB_HINT_RE = re.compile(
+    r"\b(?:latest|today|tonight|tomorrow|yesterday|news|current(?:ly)?|recent(?:ly)?|"
+    r"weather|forecast|price|stock|score|release(?:d)?|population|ceo|president|"
+    r"who\s+(?:is|was|won)|when\s+(?:is|was|did)|where\s+is|20[2-9]\d)\b",
+    re.IGNORECASE,
+)
+_DOCUMENT_RE = re.compile(r"\b(?:document|doc|deed|akte)\b", re.IGNORECASE)
+
+_budget: HedgeBudget | None = None
+
+
+def may_need_web(message: str) -> bool:
+    """Cheap prediction that the agent will end up on the web fallback for `message`."""
+    if _DOCUMENT_RE.search(message):
+        return False
+    return bool(_WEB_HINT_RE.search(message))
+
+
+def speculation_budget() -> HedgeBudget | None:
+    """Shared budget, or None when speculation is disabled."""
+    global _budget
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    if settings.agent_speculative_fallback_enabled is not True:
+        return None
+    ratio = settings.agent_speculative_budget_percent / 100.0
+    if _budget is None or _budget.max_ratio != ratio:
+        _budget = HedgeBudget(ratio)
+    return _budget
+
+
+def _acquire(kind: str) -> bool:
+    budget = speculation_budget()
+    if budget is None:
+        return False
+    if not budget.try_acquire():
+        AGENT_SPECULATION.labels(kind=kind, outcome="budget_exhausted").inc()
+        return False
+    AGENT_SPECULATION.labels(kind=kind, outcome="started").inc()
+    return True
+
+
+class SpeculativeSearch:
+    """A web search started next to the graph; used by the fallback or discarded."""
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self._started = time.perf_counter()
+        self._finished: float | None = None
+        self._settled = False
+        self._task = asyncio.create_task(asearch_web(query))
+        self._task.add_done_callback(self._mark_finished)
+
+    def _mark_finished(self, _task: asyncio.Task) -> None:
+        self._finished = time.perf_counter()
+
+    @classmethod
+    def maybe_start(cls, message: str, query: str) -> SpeculativeSearch | None:
+        """Start a search for `query` if speculation is on, predicted useful and in budget."""
+        budget = speculation_budget()
+        if budget is None:
+            return None
+        budget.record_request()
+        if not may_need_web(message) or not _acquire("search"):
+            return None
+        return cls(query)
+
+    async def result(self) -> str:
+        """The search result. Raises what `asearch_web` raises."""
+        needed_at = time.perf_counter()
+        self._settled = True
+        AGENT_SPECULATION.labels(kind="search", outcome="used").inc()
+        # The search ran while the graph was still working; that overlap is saved latency.
+        overlap = (self._finished or needed_at) - self._started
+        AGENT_SPECULATION_SECONDS.labels(kind="search", outcome="saved").inc(max(overlap, 0.0))
+        return await self._task
+
+    def discard(self) -> None:
+        """Cancel the search if it is unused; no-op after `result()`."""
+        if self._settled:
+            return
+        self._settled = True
+        if not self._task.done():
+            self._task.cancel()
+        elif not self._task.cancelled():
+            # Retrieve any exception so asyncio does not log it as never retrieved.
+            self._task.exception()
+        wasted = (self._finished or time.perf_counter()) - self._started
+        AGENT_SPECULATION.labels(kind="search", outcome="wasted").inc()
+        AGENT_SPECULATION_SECONDS.labels(kind="search", outcome="wasted").inc(wasted)
+
+
+async def first_success(
+    primary: Callable[[], Awaitable[T | None]],
+    secondary: Callable[[], Awaitable[T | None]],
+) -> T | None:
+    """Run both concurrently; return the first truthy result and cancel the other.
+
+    Falls back to running them in order when the speculation budget is spent.
+    """
+    if not _acquire("summarize"):
+        return await primary() or await secondary()
+
+    started = time.perf_counter()
+    tasks = {
+        asyncio.create_task(primary()): "primary",
+        asyncio.create_task(secondary()): "secondary",
+    }
+    primary_failed_after: float | None = None
+    winner: T | None = None
+    try:
+        pending = set(tasks)
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = None if task.exception() else task.result()
+                if result:
+                    winner = result
+                    if tasks[task] == "secondary" and primary_failed_after is not None:
+                        # In order, the secondary would only have started after the failure.
+                        AGENT_SPECULATION_SECONDS.labels(kind="summarize", outcome="saved").inc(
+                            min(primary_failed_after, time.perf_counter() - started)
+                        )
+                    break
+                if tasks[task] == "primary":
+                    primary_failed_after = time.perf_counter() - started
+        return winner
+    finally:
+        leftover = [t for t in tasks if not t.done()]
+        for task in leftover:
+            task.cancel()
+        if leftover:
+            await asyncio.gather(*leftover, return_exceptions=True)
+            AGENT_SPECULATION.labels(kind="summarize", outcome="wasted").inc(len(leftover))
+            AGENT_SPECULATION_SECONDS.labels(kind="summarize", outcome="wasted").inc(
+                (time.perf_counter() - started) * len(leftover)
+            )
+        AGENT_SPECULATION.labels(kind="summarize", outcome="used" if winner else "failed").inc()
@@ -0,0 +1,114 @@
+"""Tool-execution node for the ReAct graph: concurrent calls with per-tool timeouts.
+
+Replaces LangGraph's `ToolNode`. All tool calls from one model turn run concurrently,
+and each one is bounded by its own timeout (`AGENT_TOOL_TIMEOUTS`, falling back to
+`AGENT_TOOL_TIMEOUT_SECONDS`) and by the request deadline. A call that times out or
+fails becomes an error `ToolMessage` so the model still sees the results that did
+arrive, instead of the whole turn waiting on the slowest tool.
+
+When the graph is streamed with the "custom" mode, each call also emits `tool_start`
+(with its arguments) and `tool_end` (with status and latency) events; a cancelled call reports `cancelled`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Sequence
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.types import StreamWriter
+
+from app.core.deadline import clamp_timeout
+from app.core.logging import get_logger
+from app.core.metrics import AGENT_TOOL_CALLS, AGENT_TOOL_DURATION
+
+
+logger = get_logger(__name__)
+
+
+def _no_writer(_chunk: Any) -> None:
+    return None
+
+
+def _tool_end(call: dict[str, Any], status: str, elapsed: float) -> dict[str, Any]:
+    return {
+        "type": "tool_end",
+        "tool": call["name"],
+        "call_id": call["id"],
+        "status": status,
+        "duration_ms": round(elapsed * 1000, 1),
+    }
+
+
+class ToolExecutor:
+    """Graph node that runs the last AI message's tool calls concurrently."""
+
+    def __init__(self, tools: Sequence[BaseTool]) -> None:
+        self._tools = {t.name: t for t in tools}
+
+    def _timeout(self, tool_name: str) -> float:
+        from app.core.config import get_settings
+
+        settings = get_settings()
+        timeout = settings.agent_tool_timeouts.get(tool_name, settings.agent_tool_timeout_seconds)
+        return clamp_timeout(float(timeout))
+
+    async def _run(
+        self, call: dict[str, Any], config: RunnableConfig, writer: StreamWriter
+    ) -> ToolMessage:
+        name = call["name"]
+        args = call.get("args") or {}
+        writer({"type": "tool_start", "tool": name, "call_id": call["id"], "args": args})
+        tool = self._tools.get(name)
+        if tool is None:
+            AGENT_TOOL_CALLS.labels(tool_name=name, status="error").inc()
+            writer(_tool_end(call, "error", 0.0))
+            return ToolMessage(
+                content=f"Error: unknown tool '{name}'.",
+                name=name,
+                tool_call_id=call["id"],
+                status="error",
+            )
+
+        timeout = self._timeout(name)
+        started = time.perf_counter()
+        status = "success"
+        try:
+            output = await asyncio.wait_for(tool.ainvoke(args, config), timeout)
+            content = output if isinstance(output, str) else str(output)
+        except asyncio.TimeoutError:
+            status = "timeout"
+            content = f"Error: {name} timed out after {timeout:g}s and returned no result."
+            logger.warning("agent.tool_timeout", tool=name, timeout_seconds=timeout)
+        except asyncio.CancelledError:
+            # The run was cancelled (e.g. the client disconnected); not a tool success.
+            status = "cancelled"
+            raise
+        except Exception as e:  # noqa: BLE001 - reported to the model as a tool error
+            status = "error"
+            content = f"Error: {e}"
+            logger.warning("agent.tool_failed", tool=name, error=str(e))
+        finally:
+            elapsed = time.perf_counter() - started
+            AGENT_TOOL_CALLS.labels(tool_name=name, status=status).inc()
+            AGENT_TOOL_DURATION.labels(tool_name=name, status=status).observe(elapsed)
+            writer(_tool_end(call, status, elapsed))
+
+        return ToolMessage(
+            content=content,
+            name=name,
+            tool_call_id=call["id"],
+            status="success" if status == "success" else "error",
+        )
+
+    async def __call__(
+        self, state: dict[str, Any], config: RunnableConfig, writer: StreamWriter = _no_writer
+    ) -> dict:
+        # LangGraph injects `writer` because the annotation is exactly `StreamWriter`.
+        last = state["messages"][-1]
+        calls = last.tool_calls if isinstance(last, AIMessage) else []
+        messages = await asyncio.gather(*(self._run(call, config, writer) for call in calls))
+        return {"messages": list(messages)}
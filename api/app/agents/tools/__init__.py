@@ -1,9 +1,27 @@
 """Agent tools for ReAct agent."""
 
 from .calculator import calculator_tool
-from .document_lookup import create_document_lookup_tool
+from .document_lookup import (
+    create_document_lookup_tool,
+    document_lookup_config,
+    SearchPassagesFn,
+    document_lookup_tool,
+    lookup_document,
+)
 from .search import search_tool
 
 BASE_TOOLS = [calculator_tool, search_tool]
+# Tenant-independent: document lookup reads tenant and fetcher from the run config.
+AGENT_TOOLS = [*BASE_TOOLS, document_lookup_tool]
 
-__all__ = ["BASE_TOOLS", "calculator_tool", "search_tool", "create_document_lookup_tool"]
+__all__ = [
+    "AGENT_TOOLS",
+    "BASE_TOOLS",
+    "SearchPassagesFn",
+    "calculator_tool",
+    "search_tool",
+    "create_document_lookup_tool",
+    "document_lookup_config",
+    "document_lookup_tool",
+    "lookup_document",
+]
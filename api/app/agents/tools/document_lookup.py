@@ -1,27 +1,146 @@
-"""Document lookup tool - fetches document by ID from the database."""
+"""Document lookup tool - fetches a document by ID and returns the passages that matter.
+
+In the default "passages" mode (`AGENT_DOCUMENT_LOOKUP_MODE`), the tool returns the title,
+a short outline and the top-k passages for the question. Passages come from the RAG index
+when the document is indexed, and from on-the-fly keyword scoring otherwise. The question
+is the model's `query`, or else the user's message. Output is capped at
+`AGENT_DOCUMENT_LOOKUP_MAX_CHARS` in every mode, so a large document cannot fill the
+model's context or be re-sent on every later turn.
+"""
 
 from __future__ import annotations
 
-from typing import Any, Awaitable, Callable
+from typing import Any, Awaitable, Callable, Literal
 
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
+from app.core.logging import get_logger
+from app.rag.passages import keyword_passages, outline
+
+
+logger = get_logger(__name__)
+
+GetDocumentFn = Callable[[str, str], Awaitable[dict[str, Any] | None]]
+# (document_id, tenant_id, query, top_k) -> indexed chunks, best first; [] if not indexed.
+SearchPassagesFn = Callable[[str, str, str, int], Awaitable[list[dict[str, Any]]]]
+LookupMode = Literal["passages", "full"]
+
+
+def document_lookup_config(
+    tenant_id: str,
+    get_document_fn: GetDocumentFn,
+    *,
+    search_passages_fn: SearchPassagesFn | None = None,
+    question: str | None = None,
+) -> dict[str, Any]:
+    """`configurable` entries that `document_lookup_tool` reads at call time."""
+    configurable: dict[str, Any] = {"tenant_id": tenant_id, "get_document_fn": get_document_fn}
+    if search_passages_fn is not None:
+        configurable["search_passages_fn"] = search_passages_fn
+    if question:
+        configurable["question"] = question
+    return configurable
+
+
+def _clip(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[: max(limit - 1, 0)].rstrip() + "…"
+
+
+async def _passages(
+    document_id: str,
+    tenant_id: str,
+    text: str,
+    query: str,
+    top_k: int,
+    search_passages_fn: SearchPassagesFn | None,
+) -> tuple[list[dict[str, Any]], str]:
+    if query and search_passages_fn is not None:
+        try:
+            indexed = await search_passages_fn(document_id, tenant_id, query, top_k)
+        except Exception as e:  # noqa: BLE001 - keyword scoring still works
+            logger.warning("document_lookup.index_search_failed", error=str(e))
+            indexed = []
+        if indexed:
+            return sorted(indexed[:top_k], key=lambda p: p.get("chunk_index", 0)), "index"
+    return keyword_passages(text, query, top_k=top_k), "keyword"
+
 
-def create_document_lookup_tool(
+async def lookup_document(
+    document_id: str,
     tenant_id: str,
-    get_document_fn: Callable[[str, str], Awaitable[dict[str, Any] | None]],
-) -> Any:
+    get_document_fn: GetDocumentFn,
+    *,
+    query: str = "",
+    search_passages_fn: SearchPassagesFn | None = None,
+    mode: LookupMode | None = None,
+) -> str:
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    max_chars = settings.agent_document_lookup_max_chars
+    try:
+        doc = await get_document_fn(document_id, tenant_id)
+        if not doc:
+            return f"Document '{document_id}' not found."
+        title = doc.get("title", "Untitled")
+        text = doc.get("text", "")
+        if (mode or settings.agent_document_lookup_mode) == "full":
+            return _clip(f"Title: {title}\n\nContent:\n{text}", max_chars)
+
+        passages, source = await _passages(
+            document_id,
+            tenant_id,
+            text,
+            query,
+            settings.agent_document_lookup_top_k,
+            search_passages_fn,
+        )
+    except Exception as e:
+        return f"Error fetching document: {e}"
+
+    parts = [f"Title: {title}", f"Length: {len(text)} characters"]
+    headings = outline(text)
+    if headings:
+        parts.append("Outline:\n" + "\n".join(f"- {h}" for h in headings))
+    if passages:
+        parts.append(f"Relevant passages ({source} search):")
+    result = "\n".join(parts)
+    for p in passages:
+        block = f"\n[{p.get('chunk_index', 0)}] {str(p.get('text', '')).strip()}"
+        remaining = max_chars - len(result)
+        if remaining < 80:
+            break
+        result += _clip(block, remaining)
+    return _clip(result, max_chars)
+
+
+@tool
+async def document_lookup_tool(document_id: str, config: RunnableConfig, query: str = "") -> str:
+    """Look up a document by ID. Returns its title, outline and the passages most relevant to `query` (defaults to the user's question). Use when the user asks about a specific document or references a document ID."""
+    # Tenant and fetcher come from the run config so one compiled graph serves all tenants.
+    configurable = config.get("configurable") or {}
+    tenant_id = configurable.get("tenant_id")
+    get_document_fn = configurable.get("get_document_fn")
+    if not tenant_id or get_document_fn is None:
+        return "Error fetching document: document lookup is not available for this request."
+    return await lookup_document(
+        document_id,
+        tenant_id,
+        get_document_fn,
+        query=query or configurable.get("question", ""),
+        search_passages_fn=configurable.get("search_passages_fn"),
+    )
+
+
+def create_document_lookup_tool(tenant_id: str, get_document_fn: GetDocumentFn) -> Any:
     """Create a document_lookup tool bound to tenant and async document fetcher."""
 
     @tool
-    async def document_lookup_tool(document_id: str) -> str:
-        """Look up a document by ID. Use when the user asks about a specific document or references a document ID."""
-        try:
-            doc = await get_document_fn(document_id, tenant_id)
-            if not doc:
-                return f"Document '{document_id}' not found."
-            return f"Title: {doc.get('title', 'Untitled')}\n\nContent:\n{doc.get('text', '')}"
-        except Exception as e:
-            return f"Error fetching document: {e}"
+    async def document_lookup_tool(document_id: str, query: str = "") -> str:
+        """Look up a document by ID. Returns its title, outline and the passages most relevant to `query`. Use when the user asks about a specific document or references a document ID."""
+        return await lookup_document(document_id, tenant_id, get_document_fn, query=query)
 
     return document_lookup_tool
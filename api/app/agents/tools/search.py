@@ -1,10 +1,22 @@
-"""Search tool for the agent - DuckDuckGo (default) or Tavily."""
+"""Search tool for the agent - DuckDuckGo (default) or Tavily.
+
+`asearch_web` is the event-loop-safe entry point: Tavily is called through its async
+client and the synchronous DuckDuckGo client runs on a small bounded thread pool. Both
+honour a per-provider timeout, and formatted results are cached per
+(provider, region, max_results, query) for `SEARCH_CACHE_TTL_SECONDS`.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import nullcontext
+from typing import Any
 
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 
 _MAX_TITLE_CHARS = 160
 _MAX_SNIPPET_CHARS = 400
@@ -63,6 +75,59 @@ def _format_results(
     return out
 
 
+class _TTLCache:
+    """Small LRU cache whose entries expire after `ttl_seconds`."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: tuple, value: str, *, ttl_seconds: float, max_entries: int) -> None:
+        if ttl_seconds <= 0 or max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _TTLCache()
+_executor: ThreadPoolExecutor | None = None
+_tavily_clients: dict[tuple[str | None, int], Any] = {}
+
+
+def clear_search_cache() -> None:
+    """Drop cached results and reusable clients (tests, key rotation)."""
+    _cache.clear()
+    _tavily_clients.clear()
+
+
+def _search_executor(max_workers: int) -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="web-search"
+        )
+    return _executor
+
+
 def _search_duckduckgo(query: str, max_results: int = 5, region: str = "us-en") -> str:
     """Perform web search via DuckDuckGo (free, no API key)."""
     try:
@@ -86,8 +151,8 @@ def _search_duckduckgo(query: str, max_results: int = 5, region: str = "us-en")
         raise SearchToolError(str(e)) from e
 
 
-def _search_tavily(query: str, max_results: int = 5) -> str:
-    """Perform web search via Tavily (better quality, requires TAVILY_API_KEY)."""
+def _tavily_client(max_results: int) -> Any:
+    """Reused `TavilySearch` per (API key, max_results); constructing one per call is slow."""
     import os
 
     from app.core.config import get_settings
@@ -95,44 +160,139 @@ def _search_tavily(query: str, max_results: int = 5) -> str:
     settings = get_settings()
     if settings.tavily_api_key and not os.environ.get("TAVILY_API_KEY"):
         os.environ["TAVILY_API_KEY"] = settings.tavily_api_key
-    try:
+    key = (settings.tavily_api_key, max_results)
+    client = _tavily_clients.get(key)
+    if client is None:
         from langchain_tavily import TavilySearch
 
-        tool = TavilySearch(max_results=max_results, topic="general")
-        result = tool.invoke({"query": query})
-        results = []
-        if isinstance(result, dict):
-            results = result.get("results") or []
-        return _format_results(
-            query=query,
-            results=results,
-            title_key="title",
-            snippet_key="content",
-            url_key="url",
+        client = TavilySearch(max_results=max_results, topic="general")
+        _tavily_clients[key] = client
+    return client
+
+
+def _format_tavily(query: str, result: Any) -> str:
+    results = []
+    if isinstance(result, dict):
+        results = result.get("results") or []
+    return _format_results(
+        query=query,
+        results=results,
+        title_key="title",
+        snippet_key="content",
+        url_key="url",
+    )
+
+
+def _search_tavily(query: str, max_results: int = 5) -> str:
+    """Perform web search via Tavily (better quality, requires TAVILY_API_KEY)."""
+    try:
+        result = _tavily_client(max_results).invoke({"query": query})
+        return _format_tavily(query, result)
+    except SearchToolNoResults:
+        raise
+    except Exception as e:
+        raise SearchToolError(str(e)) from e
+
+
+async def _asearch_tavily(query: str, max_results: int, timeout: float) -> str:
+    try:
+        result = await asyncio.wait_for(
+            _tavily_client(max_results).ainvoke({"query": query}), timeout
         )
+        return _format_tavily(query, result)
     except SearchToolNoResults:
         raise
+    except asyncio.TimeoutError as e:
+        raise SearchToolError(f"Tavily search timed out after {timeout:g}s") from e
     except Exception as e:
         raise SearchToolError(str(e)) from e
 
 
-def search_web(query: str, max_results: int = 5) -> str:
-    """Search the web using the configured provider."""
-    from app.core.config import get_settings
+async def _asearch_duckduckgo(
+    query: str, max_results: int, region: str, timeout: float, max_workers: int
+) -> str:
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        _search_executor(max_workers),
+        lambda: _search_duckduckgo(query, max_results, region=region),
+    )
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError as e:
+        # The worker thread finishes in the background; the pool size bounds the damage.
+        raise SearchToolError(f"DuckDuckGo search timed out after {timeout:g}s") from e
 
-    settings = get_settings()
+
+def _search_params(settings: Any, max_results: Any) -> tuple[str, str, int]:
     try:
         max_results = max(1, min(int(max_results), _MAX_RESULTS_LIMIT))
     except Exception:
         max_results = 5
     region = settings.search_region or "us-en"
-    if settings.search_provider == "tavily" and settings.tavily_api_key:
-        return _search_tavily(query, max_results)
-    return _search_duckduckgo(query, max_results, region=region)
+    provider = (
+        "tavily"
+        if settings.search_provider == "tavily" and settings.tavily_api_key
+        else "duckduckgo"
+    )
+    return provider, region, max_results
+
+
+def _cache_key(provider: str, region: str, max_results: int, query: str) -> tuple:
+    return (provider, region, max_results, " ".join(query.lower().split()))
+
+
+def _cache_result(settings: Any, key: tuple, value: str) -> None:
+    _cache.set(
+        key,
+        value,
+        ttl_seconds=settings.search_cache_ttl_seconds,
+        max_entries=settings.search_cache_max_entries,
+    )
+
+
+def search_web(query: str, max_results: int = 5) -> str:
+    """Search the web using the configured provider (blocking; prefer `asearch_web`)."""
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    provider, region, max_results = _search_params(settings, max_results)
+    key = _cache_key(provider, region, max_results, query)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    if provider == "tavily":
+        result = _search_tavily(query, max_results)
+    else:
+        result = _search_duckduckgo(query, max_results, region=region)
+    _cache_result(settings, key, result)
+    return result
 
 
-@tool
-def search_tool(query: str, max_results: int = 5) -> str:
+async def asearch_web(query: str, max_results: int = 5) -> str:
+    """Search the web without blocking the event loop, with per-provider timeouts."""
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    provider, region, max_results = _search_params(settings, max_results)
+    key = _cache_key(provider, region, max_results, query)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    if provider == "tavily":
+        result = await _asearch_tavily(query, max_results, settings.search_tavily_timeout_seconds)
+    else:
+        result = await _asearch_duckduckgo(
+            query,
+            max_results,
+            region,
+            settings.search_duckduckgo_timeout_seconds,
+            settings.search_max_concurrency,
+        )
+    _cache_result(settings, key, result)
+    return result
+
+
+def _search_tool(query: str, max_results: int = 5) -> str:
     """Web search. Prefer specific, distinctive terms; avoid generic words."""
     try:
         return search_web(query, max_results=max_results)
@@ -140,3 +300,19 @@ def search_tool(query: str, max_results: int = 5) -> str:
         return f"No web results found for: {query}"
     except SearchToolError as e:
         return f"Search failed: {e}. Try rephrasing your question."
+
+
+async def _asearch_tool(query: str, max_results: int = 5) -> str:
+    """Web search. Prefer specific, distinctive terms; avoid generic words."""
+    try:
+        return await asearch_web(query, max_results=max_results)
+    except SearchToolNoResults:
+        return f"No web results found for: {query}"
+    except SearchToolError as e:
+        return f"Search failed: {e}. Try rephrasing your question."
+
+
+# Sync and async implementations: the agent's ToolNode awaits the async one.
+search_tool = StructuredTool.from_function(
+    func=_search_tool, coroutine=_asearch_tool, name="search_tool"
+)
@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import time
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
 
 from .core.logging import get_logger
 
+if TYPE_CHECKING:
+    from .core.config import Settings
+
 logger = get_logger(__name__)
 
 
@@ -38,6 +42,7 @@ class CircuitBreakerConfig:
     recovery_timeout: float = 60.0  # Seconds before attempting recovery
     success_threshold: int = 2  # Successful calls needed to close from half-open
     timeout_seconds: float = 60.0  # Request timeout
+    half_open_max_calls: int = 1  # Concurrent probes allowed while half-open (shared breaker)
 
 
 class CircuitBreaker:
@@ -148,6 +153,26 @@ class CircuitBreaker:
             self.state = CircuitState.OPEN
             self._update_metrics()
 
+    def release(self) -> None:
+        """End an admitted call without recording an outcome (cancelled, out of deadline).
+
+        Breakers that cap half-open probes give the call's slot back; this one does not
+        cap them, so there is nothing to release.
+        """
+
+    async def acan_execute(self) -> tuple[bool, str | None]:
+        """Async form of `can_execute`; shared breakers override the async methods."""
+        return self.can_execute()
+
+    async def arecord_success(self, duration_seconds: float | None = None) -> None:
+        self.record_success()
+
+    async def arecord_failure(self, duration_seconds: float | None = None) -> None:
+        self.record_failure()
+
+    async def arelease(self) -> None:
+        self.release()
+
     def get_state(self) -> dict[str, Any]:
         """Get current circuit breaker state for monitoring."""
         return {
@@ -159,6 +184,439 @@ class CircuitBreaker:
         }
 
 
+@dataclass
+class SlidingWindowConfig(CircuitBreakerConfig):
+    """Configuration for the rate-based breaker policy."""
+
+    window_seconds: float = 60.0  # Calls older than this leave the window
+    window_size: int = 100  # At most this many recent calls are kept
+    minimum_calls: int = 10  # Rates are not evaluated below this many calls
+    failure_rate_threshold: float = 0.5  # Open when this share of calls failed
+    slow_call_threshold_seconds: float = 30.0  # Calls at least this long count as slow
+    slow_call_rate_threshold: float = 0.5  # Open when this share of calls was slow
+
+
+class SlidingWindowCircuitBreaker(CircuitBreaker):
+    """Breaker that opens on failure rate or slow-call rate over a rolling window.
+
+    Unlike the consecutive-failure policy, a success does not reset the count, so an
+    upstream failing half of its calls, or answering just under the client timeout,
+    still trips it. Half-open admits at most `half_open_max_calls` concurrent probes;
+    any failed or slow probe reopens the circuit.
+    """
+
+    config: SlidingWindowConfig
+
+    def __init__(
+        self,
+        name: str,
+        config: SlidingWindowConfig | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        # (finished_at, failed, slow) for each call in the window.
+        self._calls: deque[tuple[float, bool, bool]] = deque()
+        self._opened_at: float | None = None
+        self._probe_started: deque[float] = deque()
+        super().__init__(name, config or SlidingWindowConfig())
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.config.window_seconds
+        while self._calls and (
+            self._calls[0][0] < horizon or len(self._calls) > self.config.window_size
+        ):
+            self._calls.popleft()
+
+    def rates(self) -> tuple[float, float, int]:
+        """(failure_rate, slow_call_rate, calls) over the current window."""
+        self._prune(self._clock())
+        total = len(self._calls)
+        if not total:
+            return 0.0, 0.0, 0
+        failures = sum(1 for _, failed, _ in self._calls if failed)
+        slow = sum(1 for _, _, is_slow in self._calls if is_slow)
+        return failures / total, slow / total, total
+
+    def _is_slow(self, duration_seconds: float | None) -> bool:
+        return (
+            duration_seconds is not None
+            and duration_seconds >= self.config.slow_call_threshold_seconds
+        )
+
+    def _open(self, reason: str) -> None:
+        failure_rate, slow_rate, total = self.rates()
+        logger.error(
+            "circuit_breaker.opened",
+            name=self.name,
+            reason=reason,
+            failure_rate=round(failure_rate, 3),
+            slow_call_rate=round(slow_rate, 3),
+            calls=total,
+        )
+        self.state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._probe_started.clear()
+        self._update_metrics()
+
+    def _close(self) -> None:
+        logger.info("circuit_breaker.closed", name=self.name, success_count=self.success_count)
+        self.state = CircuitState.CLOSED
+        self._calls.clear()
+        self._probe_started.clear()
+        self.failure_count = 0
+        self.success_count = 0
+        self._update_metrics()
+
+    def _release_probe(self) -> None:
+        if self._probe_started:
+            self._probe_started.popleft()
+
+    def release(self) -> None:
+        if self.state == CircuitState.HALF_OPEN:
+            self._release_probe()
+
+    def _record_call(self, *, failed: bool, slow: bool) -> None:
+        now = self._clock()
+        self._calls.append((now, failed, slow))
+        self._prune(now)
+        self.failure_count = sum(1 for _, f, _ in self._calls if f)
+        failure_rate, slow_rate, total = self.rates()
+        if total < self.config.minimum_calls:
+            return
+        if failure_rate >= self.config.failure_rate_threshold:
+            self._open("failure_rate")
+        elif slow_rate >= self.config.slow_call_rate_threshold:
+            self._open("slow_call_rate")
+
+    def can_execute(self) -> tuple[bool, str | None]:
+        if self.state == CircuitState.CLOSED:
+            return True, None
+
+        now = self._clock()
+        if self.state == CircuitState.OPEN:
+            if self._opened_at is not None and now - self._opened_at < self.config.recovery_timeout:
+                return False, f"Circuit {self.name} is OPEN"
+            logger.info("circuit_breaker.half_open", name=self.name)
+            self.state = CircuitState.HALF_OPEN
+            self.success_count = 0
+            self._probe_started.clear()
+            self._update_metrics()
+
+        # Backstop for probes that neither reported back nor called `release`.
+        while self._probe_started and now - self._probe_started[0] >= self.config.timeout_seconds:
+            self._probe_started.popleft()
+        if len(self._probe_started) >= self.config.half_open_max_calls:
+            return False, f"Circuit {self.name} is HALF_OPEN (probe in flight)"
+        self._probe_started.append(now)
+        return True, None
+
+    def record_success(self, duration_seconds: float | None = None) -> None:
+        slow = self._is_slow(duration_seconds)
+        if self.state == CircuitState.HALF_OPEN:
+            self._release_probe()
+            if slow:
+                self._open("slow_probe")
+                return
+            self.success_count += 1
+            if self.success_count >= self.config.success_threshold:
+                self._close()
+        elif self.state == CircuitState.CLOSED:
+            self._record_call(failed=False, slow=slow)
+
+    def record_failure(self, duration_seconds: float | None = None) -> None:
+        self.last_failure_time = time.time()
+        from .core.metrics import CIRCUIT_BREAKER_FAILURES
+
+        CIRCUIT_BREAKER_FAILURES.labels(circuit_name=self.name).inc()
+        if self.state == CircuitState.HALF_OPEN:
+            self._release_probe()
+            self._open("probe_failed")
+        elif self.state == CircuitState.CLOSED:
+            self._record_call(failed=True, slow=self._is_slow(duration_seconds))
+
+    async def arecord_success(self, duration_seconds: float | None = None) -> None:
+        self.record_success(duration_seconds)
+
+    async def arecord_failure(self, duration_seconds: float | None = None) -> None:
+        self.record_failure(duration_seconds)
+
+    def get_state(self) -> dict[str, Any]:
+        failure_rate, slow_rate, total = self.rates()
+        return {
+            **super().get_state(),
+            "failure_rate": failure_rate,
+            "slow_call_rate": slow_rate,
+            "window_calls": total,
+        }
+
+
+# Lua scripts keep each state transition atomic across replicas. State lives in one hash
+# per breaker: state, failures, successes, opened_at, probes, probe_started.
+_ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local recovery_timeout = tonumber(ARGV[2])
+local max_probes = tonumber(ARGV[3])
+local probe_ttl = tonumber(ARGV[4])
+local state = redis.call('HGET', key, 'state') or 'closed'
+if state == 'closed' then
+  return {1, state}
+end
+if state == 'open' then
+  local opened_at = tonumber(redis.call('HGET', key, 'opened_at') or '0')
+  if now - opened_at < recovery_timeout then
+    return {0, state}
+  end
+  state = 'half_open'
+  redis.call('HSET', key, 'state', state, 'successes', 0, 'probes', 0)
+end
+local probes = tonumber(redis.call('HGET', key, 'probes') or '0')
+local probe_started = tonumber(redis.call('HGET', key, 'probe_started') or '0')
+if probes >= max_probes and now - probe_started < probe_ttl then
+  return {0, state}
+end
+if probes >= max_probes then
+  probes = 0
+end
+redis.call('HSET', key, 'probes', probes + 1, 'probe_started', now)
+return {1, state}
+"""
+
+_SUCCESS_SCRIPT = """
+local key = KEYS[1]
+local success_threshold = tonumber(ARGV[1])
+local state = redis.call('HGET', key, 'state') or 'closed'
+if state == 'half_open' then
+  local successes = redis.call('HINCRBY', key, 'successes', 1)
+  local probes = tonumber(redis.call('HGET', key, 'probes') or '0')
+  if successes >= success_threshold then
+    redis.call('HSET', key, 'state', 'closed', 'failures', 0, 'successes', 0, 'probes', 0)
+    return 'closed'
+  end
+  redis.call('HSET', key, 'probes', math.max(0, probes - 1))
+  return state
+end
+if state == 'closed' and tonumber(redis.call('HGET', key, 'failures') or '0') > 0 then
+  redis.call('HSET', key, 'failures', 0)
+end
+return state
+"""
+
+_FAILURE_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local failure_threshold = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local state = redis.call('HGET', key, 'state') or 'closed'
+if state == 'half_open' then
+  state = 'open'
+  redis.call('HSET', key, 'state', state, 'opened_at', now, 'failures', failure_threshold,
+             'probes', 0)
+elseif state == 'open' then
+  redis.call('HSET', key, 'opened_at', now)
+else
+  local failures = redis.call('HINCRBY', key, 'failures', 1)
+  if failures >= failure_threshold then
+    state = 'open'
+    redis.call('HSET', key, 'state', state, 'opened_at', now)
+  end
+end
+redis.call('EXPIRE', key, ttl)
+return state
+"""
+
+
+_RELEASE_SCRIPT = """
+local key = KEYS[1]
+local state = redis.call('HGET', key, 'state') or 'closed'
+if state == 'half_open' then
+  local probes = tonumber(redis.call('HGET', key, 'probes') or '0')
+  redis.call('HSET', key, 'probes', math.max(0, probes - 1))
+end
+return state
+"""
+
+
+class RedisCircuitBreaker(CircuitBreaker):
+    """Circuit breaker whose state is shared by every replica through Redis.
+
+    Failure counts, state and half-open probe slots live in Redis and change only inside
+    Lua scripts, so N workers open the circuit after `failure_threshold` failures in total
+    rather than each. When Redis is not configured or unreachable, the inherited
+    per-process logic is used instead. The local fields mirror the last shared state seen.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: CircuitBreakerConfig | None = None,
+        *,
+        key_prefix: str = "cb",
+    ):
+        super().__init__(name, config)
+        self.key = f"{key_prefix}:{name}"
+        self._scripts: dict[str, Any] = {}
+        self._scripts_client: Any = None
+
+    async def _script(self, name: str) -> Any | None:
+        from .core.redis import get_redis
+
+        client = await get_redis()
+        if client is None:
+            return None
+        if client is not self._scripts_client:
+            self._scripts = {
+                "acquire": client.register_script(_ACQUIRE_SCRIPT),
+                "success": client.register_script(_SUCCESS_SCRIPT),
+                "failure": client.register_script(_FAILURE_SCRIPT),
+                "release": client.register_script(_RELEASE_SCRIPT),
+            }
+            self._scripts_client = client
+        return self._scripts[name]
+
+    def _mirror(self, state: str) -> None:
+        new_state = CircuitState(state)
+        if new_state != self.state:
+            logger.info("circuit_breaker.shared_state", name=self.name, state=new_state.value)
+            self.state = new_state
+            self._update_metrics()
+
+    def _redis_unavailable(self, exc: Exception) -> None:
+        logger.warning("circuit_breaker.redis_unavailable", name=self.name, error=str(exc))
+
+    async def acan_execute(self) -> tuple[bool, str | None]:
+        try:
+            script = await self._script("acquire")
+            if script is None:
+                return self.can_execute()
+            allowed, state = await script(
+                keys=[self.key],
+                args=[
+                    time.time(),
+                    self.config.recovery_timeout,
+                    self.config.half_open_max_calls,
+                    self.config.timeout_seconds,
+                ],
+            )
+        except Exception as exc:  # noqa: BLE001
+            self._redis_unavailable(exc)
+            return self.can_execute()
+        self._mirror(state)
+        if int(allowed):
+            return True, None
+        if state == CircuitState.HALF_OPEN.value:
+            return False, f"Circuit {self.name} is HALF_OPEN (probe in flight)"
+        return False, f"Circuit {self.name} is OPEN"
+
+    async def arecord_success(self, duration_seconds: float | None = None) -> None:
+        try:
+            script = await self._script("success")
+            if script is None:
+                self.record_success()
+                return
+            state = await script(keys=[self.key], args=[self.config.success_threshold])
+        except Exception as exc:  # noqa: BLE001
+            self._redis_unavailable(exc)
+            self.record_success()
+            return
+        if state == CircuitState.CLOSED.value:
+            self.failure_count = 0
+            self.success_count = 0
+        self._mirror(state)
+
+    async def arecord_failure(self, duration_seconds: float | None = None) -> None:
+        try:
+            script = await self._script("failure")
+            if script is None:
+                self.record_failure()
+                return
+            state = await script(
+                keys=[self.key],
+                args=[
+                    time.time(),
+                    self.config.failure_threshold,
+                    max(3600, int(self.config.recovery_timeout * 10)),
+                ],
+            )
+        except Exception as exc:  # noqa: BLE001
+            self._redis_unavailable(exc)
+            self.record_failure()
+            return
+        self.last_failure_time = time.time()
+        from .core.metrics import CIRCUIT_BREAKER_FAILURES
+
+        CIRCUIT_BREAKER_FAILURES.labels(circuit_name=self.name).inc()
+        self._mirror(state)
+
+    async def arelease(self) -> None:
+        try:
+            script = await self._script("release")
+            if script is None:
+                self.release()
+                return
+            state = await script(keys=[self.key], args=[])
+        except Exception as exc:  # noqa: BLE001
+            self._redis_unavailable(exc)
+            self.release()
+            return
+        self._mirror(state)
+
+
+def build_circuit_breaker(
+    name: str,
+    config: CircuitBreakerConfig | None = None,
+    *,
+    backend: str = "local",
+    policy: str = "consecutive",
+) -> CircuitBreaker:
+    """Create a breaker for `backend` ("local" per-process or "redis" shared).
+
+    `policy="sliding_window"` selects the rate-based breaker; it keeps per-process state,
+    so it ignores `backend`.
+    """
+    if policy == "sliding_window":
+        if isinstance(config, SlidingWindowConfig) or config is None:
+            return SlidingWindowCircuitBreaker(name, config)
+        raise TypeError("sliding_window policy requires a SlidingWindowConfig")
+    if backend == "redis":
+        return RedisCircuitBreaker(name, config)
+    return CircuitBreaker(name, config)
+
+
+def build_llm_circuit_breaker(settings: Settings, key: str, name: str) -> CircuitBreaker:
+    """Breaker for LLM calls; `CIRCUIT_BREAKER_POLICIES[key]` picks its policy.
+
+    `key` is the provider (`ollama`, `openai`, `litellm`); `name` labels the breaker, so
+    one provider can have several (LiteLLM keeps one per model).
+    """
+    policy = settings.circuit_breaker_policies.get(key)
+    if policy == "sliding_window":
+        return build_circuit_breaker(
+            name,
+            SlidingWindowConfig(
+                recovery_timeout=30.0,
+                timeout_seconds=settings.llm_timeout_seconds,
+                window_seconds=settings.circuit_breaker_window_seconds,
+                minimum_calls=settings.circuit_breaker_minimum_calls,
+                failure_rate_threshold=settings.circuit_breaker_failure_rate,
+                slow_call_threshold_seconds=settings.circuit_breaker_slow_call_seconds,
+                slow_call_rate_threshold=settings.circuit_breaker_slow_call_rate,
+                half_open_max_calls=settings.circuit_breaker_half_open_max_calls,
+            ),
+            policy="sliding_window",
+        )
+    return build_circuit_breaker(
+        name,
+        CircuitBreakerConfig(
+            failure_threshold=5,
+            recovery_timeout=30.0,
+            timeout_seconds=settings.llm_timeout_seconds,
+        ),
+        backend="redis" if settings.circuit_breaker_backend == "redis" else "local",
+    )
+
+
 class CircuitBreakerOpen(Exception):
     """Raised when circuit breaker is open."""
 
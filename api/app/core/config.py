@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Literal, Optional
+from typing import Any, Literal, Optional
 
 from pydantic import AnyHttpUrl, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -29,13 +29,101 @@ class Settings(BaseSettings):
         return s
 
     redis_url: Optional[str] = None
+    # "redis" shares LLM circuit-breaker state across workers/pods (needs REDIS_URL; falls
+    # back to per-process state while Redis is unreachable).
+    circuit_breaker_backend: Literal["local", "redis"] = "local"
+    # Per-provider breaker policy ("ollama"/"openai" -> "consecutive" | "sliding_window").
+    # The sliding-window policy trips on failure rate or slow-call rate in a rolling window.
+    circuit_breaker_policies: dict[str, Literal["consecutive", "sliding_window"]] = {}
+    circuit_breaker_window_seconds: float = 60.0
+    circuit_breaker_minimum_calls: int = 10
+    circuit_breaker_failure_rate: float = 0.5
+    circuit_breaker_slow_call_seconds: float = 30.0
+    circuit_breaker_slow_call_rate: float = 0.5
+    circuit_breaker_half_open_max_calls: int = 1
     rate_limit_per_minute: int = 120
-    llm_provider: Literal["ollama", "openai_compatible", ""] = ""
+    # Per-tenant LLM token quotas (prompt + completion tokens; 0 disables). Needs REDIS_URL.
+    # TOKEN_QUOTA_OVERRIDES sets limits per tenant, e.g. {"acme": {"per_minute": 50000}}.
+    token_quota_per_minute: int = 0
+    token_quota_per_day: int = 0
+    token_quota_overrides: dict[str, dict[str, int]] = {}
+    # Tenants with their own `tenant_id` label on the token metrics, besides the default
+    # tenant and TOKEN_QUOTA_OVERRIDES tenants. The tenant header is client-supplied, so
+    # every other tenant is counted under "other" to keep label cardinality bounded.
+    metrics_tenant_labels: list[str] = []
+    llm_provider: Literal["ollama", "openai_compatible", "litellm", ""] = ""
     llm_base_url: Optional[AnyHttpUrl] = None
     llm_api_key: Optional[str] = None
     llm_model: str = "llama3.2"
     llm_timeout_seconds: float = 60.0
     llm_max_retries: int = 2
+    # LLM_PROVIDER=litellm: ordered fallback chain of LiteLLM model names (defaults to
+    # [LLM_MODEL]), routed by "ordered", "latency" (moving average) or "cost" (per token).
+    llm_litellm_models: list[str] = []
+    llm_litellm_routing: Literal["ordered", "latency", "cost"] = "ordered"
+    llm_litellm_model_costs: dict[str, float] = {}
+    # Pooled HTTP client LiteLLM shares across calls (OpenAI-compatible backends).
+    llm_litellm_max_connections: int = 100
+    llm_litellm_max_keepalive_connections: int = 20
+    # Ollama residency: models are preloaded at startup and refreshed so they stay loaded.
+    llm_keep_alive: str = "30m"
+    llm_warmup_enabled: bool = True
+    llm_warmup_models: list[str] = []
+    llm_warmup_timeout_seconds: float = 120.0
+    llm_warmup_max_wait_seconds: float = 300.0
+    llm_warmup_refresh_seconds: float = 600.0
+    # Per-profile overrides of app/llm/profiles.py, e.g. {"classify": {"max_tokens": 4}}.
+    llm_generation_profiles: dict[str, dict[str, Any]] = {}
+    # Request hedging for short, idempotent flows (classify). Hedges go to
+    # LLM_HEDGE_BASE_URL, or to LLM_BASE_URL when unset (another replica behind the LB).
+    llm_hedge_enabled: bool = False
+    llm_hedge_base_url: Optional[AnyHttpUrl] = None
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_budget_percent: float = 10.0
+    llm_hedge_min_samples: int = 20
+    llm_hedge_min_delay_ms: float = 50.0
+    # End-to-end request deadlines. Clients may send a shorter budget (seconds) in the
+    # header; flows apply their default budget when none (or a longer one) is given.
+    request_deadline_header_name: str = "X-Request-Timeout"
+    request_deadline_max_seconds: float = 300.0
+    flow_deadline_seconds: dict[str, float] = {
+        "classify": 20.0,
+        "ask": 60.0,
+        "rag": 60.0,
+        "notary": 120.0,
+        "agent": 90.0,
+    }
+    # Agent tool calls from one model turn run concurrently, each bounded by its timeout.
+    agent_tool_timeout_seconds: float = 10.0
+    agent_tool_timeouts: dict[str, float] = {"search_tool": 8.0, "calculator_tool": 2.0}
+    # Deterministic intent routes answered without the agent loop (app.agents.intents).
+    agent_intent_routing_enabled: bool = True
+    agent_intent_thresholds: dict[str, float] = {}
+    agent_intent_document_id_pattern: str = r"(?=[\w.-]*[\d_-])[A-Za-z0-9][\w.-]{0,63}"
+    # Agent document lookup: "passages" returns title, outline and top-k passages for the
+    # question (RAG index, else keyword scoring); "full" the whole text. Both are capped.
+    agent_document_lookup_mode: Literal["passages", "full"] = "passages"
+    agent_document_lookup_top_k: int = 3
+    agent_document_lookup_max_chars: int = 3000
+    # Multi-turn agent conversations (request `conversation_id`), stored by a LangGraph
+    # checkpointer: "database" uses DATABASE_URL (SQLite/Postgres), "redis" REDIS_URL.
+    # Stored history is trimmed to AGENT_HISTORY_MAX_TOKENS; older turns become a summary.
+    agent_conversation_store: Literal["none", "memory", "database", "redis"] = "none"
+    # After a failed open, runs stay stateless this long before the store is tried again.
+    agent_conversation_store_retry_seconds: float = 30.0
+    agent_history_max_tokens: int = 2000
+    agent_history_summary_max_words: int = 150
+    # Per-run agent budget: model calls, tokens (0 disables) and wall-clock seconds.
+    agent_max_iterations: int = 6
+    agent_max_tokens: int = 8000
+    agent_max_seconds: float = 60.0
+    # Speculative web fallback: search alongside the graph for questions that look like
+    # they need the web, and race both summarizer prompts; capped at a share of agent runs.
+    agent_speculative_fallback_enabled: bool = False
+    agent_speculative_budget_percent: float = 20.0
+    # SSE token coalescing, used when a streaming client passes ?coalesce=true.
+    sse_coalesce_flush_ms: float = 50.0
+    sse_coalesce_max_bytes: int = 1024
     log_level: str = "INFO"
     enable_prometheus: bool = True
     api_key: Optional[str] = None
@@ -50,6 +138,12 @@ class Settings(BaseSettings):
         "us-en"  # DuckDuckGo region for English results (us-en, uk-en, wt-wt, etc.)
     )
     tavily_api_key: Optional[str] = None
+    # Web search runs off the event loop: DuckDuckGo on a bounded thread pool, Tavily async.
+    search_duckduckgo_timeout_seconds: float = 5.0
+    search_tavily_timeout_seconds: float = 10.0
+    search_max_concurrency: int = 4
+    search_cache_ttl_seconds: float = 300.0
+    search_cache_max_entries: int = 256
 
     @model_validator(mode="after")
     def require_api_key_in_prod(self: "Settings") -> "Settings":
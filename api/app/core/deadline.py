@@ -0,0 +1,97 @@
+"""Per-request deadlines carried through a context variable.
+
+The HTTP layer sets a deadline from the request header, and flows tighten it with
+their per-flow default. Everything downstream (LLM providers, retry policies, the agent
+graph) reads the remaining budget from here instead of using fixed timeouts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Awaitable, Iterator, TypeVar
+
+from .config import get_settings
+
+
+T = TypeVar("T")
+
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def get_deadline() -> float | None:
+    """Absolute deadline on the `time.monotonic()` clock, or None when unbounded."""
+    return _deadline.get()
+
+
+def remaining_seconds() -> float | None:
+    """Seconds left before the current deadline (may be negative), or None when unbounded."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def deadline_expired() -> bool:
+    remaining = remaining_seconds()
+    return remaining is not None and remaining <= 0
+
+
+def clamp_timeout(timeout_seconds: float) -> float:
+    """Shrink a per-call timeout so it never outlives the current deadline."""
+    remaining = remaining_seconds()
+    if remaining is None:
+        return timeout_seconds
+    return max(0.0, min(timeout_seconds, remaining))
+
+
+async def run_within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await `awaitable`, raising `asyncio.TimeoutError` if the current deadline passes first."""
+    remaining = remaining_seconds()
+    if remaining is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout=max(0.0, remaining))
+
+
+def set_deadline(seconds: float) -> Token:
+    """Start a deadline `seconds` from now, tightening any deadline already set."""
+    candidate = time.monotonic() + seconds
+    current = _deadline.get()
+    return _deadline.set(candidate if current is None else min(current, candidate))
+
+
+def reset_deadline(token: Token) -> None:
+    _deadline.reset(token)
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """Apply a deadline for the enclosed block. A scope can only tighten, never extend."""
+    if seconds is None or seconds <= 0:
+        yield
+        return
+    token = set_deadline(seconds)
+    try:
+        yield
+    finally:
+        reset_deadline(token)
+
+
+def flow_deadline_scope(flow: str):
+    """Deadline scope using the configured default budget for `flow`."""
+    return deadline_scope(get_settings().flow_deadline_seconds.get(flow))
+
+
+def parse_deadline_header(value: str | None, *, max_seconds: float) -> float | None:
+    """Parse a request-timeout header (seconds). Invalid or non-positive values are ignored."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    if seconds != seconds or seconds <= 0:
+        return None
+    return min(seconds, max_seconds) if max_seconds > 0 else seconds
@@ -29,6 +29,66 @@ LLM_ERRORS = Counter(
     ["provider", "error_type"],
 )
 
+LLM_HEDGES = Counter(
+    "ai_platform_llm_hedges_total",
+    "Hedged LLM requests",
+    ["provider", "outcome"],  # outcome: fired/won/budget_exhausted
+)
+
+# Streaming metrics
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "ai_platform_llm_time_to_first_token_seconds",
+    "Time from starting an LLM stream to its first token",
+    ["provider", "model", "flow"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0),
+)
+
+LLM_STREAM_DURATION = Histogram(
+    "ai_platform_llm_stream_duration_seconds",
+    "Total duration of LLM streams",
+    ["provider", "model", "flow"],
+    buckets=(0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+LLM_STREAM_TOKENS = Histogram(
+    "ai_platform_llm_stream_tokens",
+    "Chunks (approximate tokens) produced per LLM stream",
+    ["provider", "model", "flow"],
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2048),
+)
+
+LLM_TOKENS_PER_SECOND = Histogram(
+    "ai_platform_llm_stream_tokens_per_second",
+    "LLM stream throughput after the first token",
+    ["provider", "model", "flow"],
+    buckets=(1, 5, 10, 20, 40, 80, 160, 320),
+)
+
+SSE_STREAMS_ABORTED = Counter(
+    "ai_platform_sse_streams_aborted_total",
+    "SSE streams stopped because the client disconnected",
+    ["path"],
+)
+
+LLM_TOKENS_USED = Counter(
+    "ai_platform_llm_tokens_total",
+    "LLM tokens consumed per tenant (provider-reported or estimated)",
+    ["tenant_id", "flow", "token_type"],  # token_type: prompt/completion
+)
+
+TOKEN_QUOTA_REJECTIONS = Counter(
+    "ai_platform_token_quota_rejections_total",
+    "Requests rejected because the tenant exceeded its token quota",
+    ["tenant_id", "window"],  # window: minute/day
+)
+
+LLM_TOKENS_SAVED = Counter(
+    "ai_platform_llm_tokens_saved_total",
+    "Estimated LLM tokens not generated because the SSE client disconnected "
+    "(stream token limit minus the estimated tokens already sent)",
+    ["path"],
+)
+
 # Circuit breaker metrics
 CIRCUIT_BREAKER_STATE = Gauge(
     "ai_platform_circuit_breaker_state",
@@ -46,7 +106,7 @@ CIRCUIT_BREAKER_FAILURES = Counter(
 AGENT_EXECUTIONS = Counter(
     "ai_platform_agent_executions_total",
     "Total agent executions",
-    ["tenant_id", "status"],  # status: success/error/timeout
+    ["tenant_id", "status"],  # status: success/error/timeout/budget_exhausted/cancelled
 )
 
 AGENT_DURATION = Histogram(
@@ -59,7 +119,14 @@ AGENT_DURATION = Histogram(
 AGENT_TOOL_CALLS = Counter(
     "ai_platform_agent_tool_calls_total",
     "Total tool calls by agent",
-    ["tool_name", "status"],  # status: success/error
+    ["tool_name", "status"],  # status: success/error/timeout/cancelled
+)
+
+AGENT_TOOL_DURATION = Histogram(
+    "ai_platform_agent_tool_duration_seconds",
+    "Agent tool call duration in seconds",
+    ["tool_name", "status"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
 )
 
 AGENT_FALLBACKS = Counter(
@@ -68,6 +135,27 @@ AGENT_FALLBACKS = Counter(
     ["reason"],  # reason: malformed/empty/error
 )
 
+AGENT_INTENT_ROUTES = Counter(
+    "ai_platform_agent_intent_routes_total",
+    "Agent requests by deterministic intent route",
+    ["intent", "outcome"],  # outcome: hit/below_threshold/declined/failed/miss
+)
+
+AGENT_SPECULATION = Counter(
+    "ai_platform_agent_speculation_total",
+    "Speculative agent fallback work",
+    [
+        "kind",
+        "outcome",
+    ],  # kind: search/summarize, outcome: started/used/wasted/failed/budget_exhausted
+)
+
+AGENT_SPECULATION_SECONDS = Counter(
+    "ai_platform_agent_speculation_seconds_total",
+    "Fallback latency saved and work wasted by speculation",
+    ["kind", "outcome"],  # outcome: saved/wasted
+)
+
 # Security metrics
 SECURITY_VALIDATIONS = Counter(
     "ai_platform_security_validations_total",
@@ -8,8 +8,11 @@ from typing import AsyncGenerator
 from redis.asyncio import Redis
 
 from .config import get_settings
+from .logging import get_logger
 
 
+logger = get_logger(__name__)
+
 _redis: Redis | None = None
 
 
@@ -84,6 +87,53 @@ async def check_rate_limit(tenant_id: str, limit: int, window_seconds: int = 60)
         return True
 
 
+def _token_usage_keys(tenant_id: str, now: float) -> tuple[str, str]:
+    minute = int(now // 60)
+    day = int(now // 86400)
+    return f"tq:{tenant_id}:m:{minute}", f"tq:{tenant_id}:d:{day}"
+
+
+async def record_token_usage(tenant_id: str, tokens: int) -> None:
+    """Add `tokens` to the tenant's fixed-window minute and day counters."""
+    client = await get_redis()
+    if not client or tokens <= 0:
+        return
+    minute_key, day_key = _token_usage_keys(tenant_id, time.time())
+    try:
+        pipe = client.pipeline()
+        pipe.incrby(minute_key, tokens)
+        pipe.expire(minute_key, 120)
+        pipe.incrby(day_key, tokens)
+        pipe.expire(day_key, 86400 + 3600)
+        await pipe.execute()
+    except Exception as e:
+        # Usage goes unrecorded (and unenforced) for this call; the request still succeeds.
+        logger.warning(
+            "redis.token_usage_record_failed", tenant_id=tenant_id, tokens=tokens, error=str(e)
+        )
+
+
+async def check_token_quota(tenant_id: str, per_minute: int, per_day: int) -> str | None:
+    """Return the exhausted window ("minute" or "day"), or None when within quota.
+
+    A limit of 0 disables that window. Fails open when Redis is unavailable.
+    """
+    client = await get_redis()
+    if not client or (per_minute <= 0 and per_day <= 0):
+        return None
+    minute_key, day_key = _token_usage_keys(tenant_id, time.time())
+    try:
+        minute_used, day_used = await client.mget(minute_key, day_key)
+    except Exception as e:
+        logger.warning("redis.token_quota_check_failed", tenant_id=tenant_id, error=str(e))
+        return None
+    if per_minute > 0 and int(minute_used or 0) >= per_minute:
+        return "minute"
+    if per_day > 0 and int(day_used or 0) >= per_day:
+        return "day"
+    return None
+
+
 async def get_cached(key_prefix: str) -> str | None:
     client = await get_redis()
     if not client:
@@ -0,0 +1 @@
+"""Developer tooling that is not part of the served application."""
@@ -0,0 +1,361 @@
+"""Deterministic stand-in for an Ollama / OpenAI-compatible model server.
+
+Serves `/api/generate`, `/api/chat`, `/api/embed`, `/v1/chat/completions` and
+`/v1/embeddings` with
+configurable time-to-first-token, decode speed, error rate and a fixed number of
+concurrent generation slots (requests beyond that queue, like a real GPU server). Output
+is derived from a hash of the prompt, so the same prompt always yields the same text.
+
+Run it and point the platform at it:
+
+    python -m app.devtools.fake_llm --port 11500 --ttft-ms 300 --tokens-per-second 40
+    LLM_PROVIDER=ollama LLM_BASE_URL=http://localhost:11500 uvicorn app.main:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+import uuid
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+
+_WORDS = (
+    "the document describes a notarial deed between two parties concerning property "
+    "transfer with obligations payment terms signatures and registration in the public "
+    "register according to applicable law"
+).split()
+
+
+@dataclass
+class FakeLLMConfig:
+    model: str = "fake-llm"
+    ttft_ms: float = 200.0
+    tokens_per_second: float = 50.0
+    # Completion length when the request sets no lower limit.
+    max_tokens: int = 128
+    error_rate: float = 0.0
+    concurrency: int = 4
+    embedding_dimension: int = 768
+    seed: int = 0
+
+
+class FakeLLM:
+    """Response generation and pacing shared by the Ollama and OpenAI routes."""
+
+    def __init__(self, config: FakeLLMConfig) -> None:
+        self.config = config
+        self._slots = asyncio.Semaphore(max(1, config.concurrency))
+        self._errors = random.Random(config.seed)
+
+    def should_fail(self) -> bool:
+        return self.config.error_rate > 0 and self._errors.random() < self.config.error_rate
+
+    def tokens(self, prompt: str, limit: int | None) -> list[str]:
+        count = min(limit or self.config.max_tokens, self.config.max_tokens)
+        rng = random.Random(hashlib.sha256(prompt.encode()).digest())
+        return [("" if i == 0 else " ") + rng.choice(_WORDS) for i in range(max(1, count))]
+
+    def embedding(self, text: str) -> list[float]:
+        digest = hashlib.sha256(text.encode()).digest()
+        dim = self.config.embedding_dimension
+        return [(digest[i % len(digest)] - 128) / 128.0 for i in range(dim)]
+
+    async def generate(self, prompt: str, limit: int | None) -> list[str]:
+        """Whole completion, after the simulated prefill and decode time."""
+        tokens = self.tokens(prompt, limit)
+        async with self._slots:
+            await asyncio.sleep(self.config.ttft_ms / 1000)
+            await asyncio.sleep(len(tokens) / self.config.tokens_per_second)
+        return tokens
+
+    async def stream(self, prompt: str, limit: int | None) -> AsyncIterator[str]:
+        """Tokens paced at `tokens_per_second` after `ttft_ms`; holds a slot while streaming."""
+        tokens = self.tokens(prompt, limit)
+        async with self._slots:
+            await asyncio.sleep(self.config.ttft_ms / 1000)
+            interval = 1.0 / self.config.tokens_per_second
+            for i, token in enumerate(tokens):
+                if i:
+                    await asyncio.sleep(interval)
+                yield token
+
+
+def _error_response() -> ORJSONResponse:
+    return ORJSONResponse(status_code=500, content={"error": "injected failure"})
+
+
+def _chat_prompt(messages: Sequence[dict[str, Any]]) -> str:
+    return "\n".join(str(m.get("content") or "") for m in messages)
+
+
+def _tool_choice(
+    tools: Sequence[dict[str, Any]], messages: Sequence[dict[str, Any]]
+) -> tuple[str, dict[str, str]] | None:
+    """Call the first tool while the last message is from the user; answer after tool results."""
+    if not tools or not messages or messages[-1].get("role") != "user":
+        return None
+    function = tools[0].get("function", {})
+    properties = (function.get("parameters") or {}).get("properties") or {}
+    argument = next(iter(properties), "input")
+    return function.get("name", "tool"), {argument: str(messages[-1].get("content") or "")}
+
+
+def _tool_call(tools: Sequence[dict[str, Any]], messages: Sequence[dict[str, Any]]) -> dict | None:
+    """OpenAI-style tool call (arguments as a JSON string)."""
+    choice = _tool_choice(tools, messages)
+    if choice is None:
+        return None
+    name, arguments = choice
+    return {
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "function",
+        "function": {"name": name, "arguments": orjson.dumps(arguments).decode()},
+    }
+
+
+def create_app(config: FakeLLMConfig | None = None) -> FastAPI:
+    fake = FakeLLM(config or FakeLLMConfig())
+    app = FastAPI(title="Fake LLM server")
+    app.state.fake_llm = fake
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        body = await request.json()
+        model = body.get("model") or fake.config.model
+        prompt = str(body.get("prompt") or "")
+        if not prompt:
+            # Ollama loads the model and returns immediately for an empty prompt.
+            return ORJSONResponse({"model": model, "response": "", "done": True})
+        if fake.should_fail():
+            return _error_response()
+        limit = (body.get("options") or {}).get("num_predict")
+        prompt_tokens = len(prompt.split())
+
+        if not body.get("stream", True):
+            tokens = await fake.generate(prompt, limit)
+            return ORJSONResponse(
+                {
+                    "model": model,
+                    "response": "".join(tokens),
+                    "done": True,
+                    "prompt_eval_count": prompt_tokens,
+                    "eval_count": len(tokens),
+                }
+            )
+
+        async def ndjson() -> AsyncIterator[bytes]:
+            count = 0
+            async for token in fake.stream(prompt, limit):
+                count += 1
+                yield orjson.dumps({"model": model, "response": token, "done": False}) + b"\n"
+            yield (
+                orjson.dumps(
+                    {
+                        "model": model,
+                        "response": "",
+                        "done": True,
+                        "prompt_eval_count": prompt_tokens,
+                        "eval_count": count,
+                    }
+                )
+                + b"\n"
+            )
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        body = await request.json()
+        model = body.get("model") or fake.config.model
+        messages = body.get("messages") or []
+        if not messages:
+            return ORJSONResponse(
+                {"model": model, "message": {"role": "assistant", "content": ""}, "done": True}
+            )
+        if fake.should_fail():
+            return _error_response()
+        prompt = _chat_prompt(messages)
+        limit = (body.get("options") or {}).get("num_predict")
+        prompt_tokens = len(prompt.split())
+        choice = _tool_choice(body.get("tools") or [], messages)
+        # Ollama tool calls carry arguments as an object, not a JSON string.
+        tool_calls = [{"function": {"name": choice[0], "arguments": choice[1]}}] if choice else None
+
+        def final(content: str, count: int) -> dict[str, Any]:
+            message: dict[str, Any] = {"role": "assistant", "content": content}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            return {
+                "model": model,
+                "message": message,
+                "done": True,
+                "done_reason": "stop",
+                "prompt_eval_count": prompt_tokens,
+                "eval_count": count,
+            }
+
+        if not body.get("stream", True):
+            if tool_calls:
+                await fake.generate(prompt, 1)
+                return ORJSONResponse(final("", 1))
+            tokens = await fake.generate(prompt, limit)
+            return ORJSONResponse(final("".join(tokens), len(tokens)))
+
+        async def ndjson() -> AsyncIterator[bytes]:
+            if tool_calls:
+                async for _ in fake.stream(prompt, 1):
+                    pass
+                yield orjson.dumps(final("", 1)) + b"\n"
+                return
+            count = 0
+            async for token in fake.stream(prompt, limit):
+                count += 1
+                delta = {"role": "assistant", "content": token}
+                yield orjson.dumps({"model": model, "message": delta, "done": False}) + b"\n"
+            yield orjson.dumps(final("", count)) + b"\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    @app.post("/api/embed")
+    async def ollama_embed(request: Request):
+        body = await request.json()
+        inputs = body.get("input") or ""
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        if fake.should_fail():
+            return _error_response()
+        return ORJSONResponse(
+            {
+                "model": body.get("model") or fake.config.model,
+                "embeddings": [fake.embedding(t) for t in texts],
+            }
+        )
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        body = await request.json()
+        model = body.get("model") or fake.config.model
+        messages = body.get("messages") or []
+        if fake.should_fail():
+            return _error_response()
+        prompt = _chat_prompt(messages)
+        limit = body.get("max_tokens")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        tool_call = _tool_call(body.get("tools") or [], messages)
+
+        if not body.get("stream"):
+            if tool_call is not None:
+                await fake.generate(prompt, 1)
+                message: dict[str, Any] = {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [tool_call],
+                }
+                finish_reason, completion_tokens = "tool_calls", 1
+            else:
+                tokens = await fake.generate(prompt, limit)
+                message = {"role": "assistant", "content": "".join(tokens)}
+                finish_reason, completion_tokens = "stop", len(tokens)
+            prompt_tokens = len(prompt.split())
+            return ORJSONResponse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                }
+            )
+
+        def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> bytes:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+        async def sse() -> AsyncIterator[bytes]:
+            if tool_call is not None:
+                async for _ in fake.stream(prompt, 1):
+                    yield chunk({"role": "assistant", "tool_calls": [{"index": 0, **tool_call}]})
+                yield chunk({}, "tool_calls")
+            else:
+                async for token in fake.stream(prompt, limit):
+                    yield chunk({"content": token})
+                yield chunk({}, "stop")
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(sse(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def openai_embeddings(request: Request):
+        body = await request.json()
+        inputs = body.get("input") or ""
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        if fake.should_fail():
+            return _error_response()
+        return ORJSONResponse(
+            {
+                "object": "list",
+                "model": body.get("model") or fake.config.model,
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": fake.embedding(t)}
+                    for i, t in enumerate(texts)
+                ],
+                "usage": {"prompt_tokens": sum(len(t.split()) for t in texts), "total_tokens": 0},
+            }
+        )
+
+    return app
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    defaults = FakeLLMConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--model", default=defaults.model)
+    parser.add_argument("--ttft-ms", type=float, default=defaults.ttft_ms)
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--max-tokens", type=int, default=defaults.max_tokens)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--concurrency", type=int, default=defaults.concurrency)
+    parser.add_argument("--embedding-dimension", type=int, default=defaults.embedding_dimension)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    config = FakeLLMConfig(
+        model=args.model,
+        ttft_ms=args.ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+        max_tokens=args.max_tokens,
+        error_rate=args.error_rate,
+        concurrency=args.concurrency,
+        embedding_dimension=args.embedding_dimension,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
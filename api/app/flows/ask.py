@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+from contextlib import aclosing
 from typing import AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.deadline import flow_deadline_scope
 from app.core.logging import get_logger
 from app.core.metrics import LLM_CALLS
 from app.llm.errors import LLMNotConfiguredError
+from app.llm.profiles import get_profile
 from app.schemas import AskRequest, AskResponse
 
 from .common import (
@@ -53,11 +56,14 @@ async def run_ask_flow(
     prompt = build_ask_prompt(question, context)
     source = "llm"
     try:
-        result = await llm.complete(
-            prompt,
-            system_prompt=ASK_SYSTEM_PROMPT,
-            tenant_id=tenant_id,
-        )
+        with flow_deadline_scope("ask"):
+            result = await llm.complete(
+                prompt,
+                system_prompt=ASK_SYSTEM_PROMPT,
+                tenant_id=tenant_id,
+                flow="ask",
+                profile=get_profile("ask"),
+            )
         response = AskResponse(
             answer=result.raw_text,
             model=result.model,
@@ -102,12 +108,17 @@ async def run_ask_flow_stream(
 
     prompt = build_ask_prompt(payload.question, payload.context)
     try:
-        async for chunk in llm.stream_complete(
-            prompt,
-            system_prompt=ASK_SYSTEM_PROMPT,
-            tenant_id=tenant_id,
-        ):
-            yield chunk
+        async with aclosing(
+            llm.stream_complete(
+                prompt,
+                system_prompt=ASK_SYSTEM_PROMPT,
+                tenant_id=tenant_id,
+                flow="ask_stream",
+                profile=get_profile("ask"),
+            )
+        ) as stream:
+            async for chunk in stream:
+                yield chunk
         LLM_CALLS.labels(flow="ask_stream", source="llm").inc()
     except LLMNotConfiguredError:
         raise AiFlowError(LLM_NOT_CONFIGURED_MESSAGE)
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.deadline import flow_deadline_scope
 from app.core.logging import get_logger
 from app.core.metrics import LLM_CALLS
 from app.llm.errors import LLMNotConfiguredError
+from app.llm.profiles import get_profile
 from app.schemas import ClassifyRequest, ClassifyResponse
 
 from .common import (
@@ -45,15 +47,19 @@ async def run_classify_flow(
 
     source = "llm"
     try:
-        result = await llm.complete(
-            prompt,
-            system_prompt=(
-                "You are a document classifier. "
-                "Classify the given text into one of the provided document-type labels. "
-                "Output only the exact label word, nothing else."
-            ),
-            tenant_id=tenant_id,
-        )
+        with flow_deadline_scope("classify"):
+            result = await llm.complete(
+                prompt,
+                system_prompt=(
+                    "You are a document classifier. "
+                    "Classify the given text into one of the provided document-type labels. "
+                    "Output only the exact label word, nothing else."
+                ),
+                tenant_id=tenant_id,
+                hedge=True,
+                flow="classify",
+                profile=get_profile("classify"),
+            )
         raw = (result.raw_text or "").strip().lower()
         first_word = raw.split()[0] if raw else "other"
         labels_lower = [candidate.lower() for candidate in payload.candidate_labels]
@@ -4,6 +4,7 @@ from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.deadline import flow_deadline_scope
 from app.core.logging import get_logger
 from app.core.metrics import LLM_CALLS
 from app.documents import fetch_document
@@ -21,6 +22,19 @@ from .common import (
 logger = get_logger(__name__)
 
 
+def notary_prompt(text: str, language: str) -> str:
+    return (
+        "You are an assistant for Dutch notarial offices. "
+        "Summarize the following document in a structured, neutral way. "
+        "Only summarize; do not give legal advice or speculate. "
+        "Output MUST contain: title; bullet points of key points; parties involved; "
+        "any explicit risks or warnings mentioned.\n\n"
+        f"LANGUAGE: {language.upper()}\n"
+        "DOCUMENT:\n"
+        f"{text}"
+    )
+
+
 async def run_notary_summarization_flow(
     *,
     tenant_id: str,
@@ -41,23 +55,15 @@ async def run_notary_summarization_flow(
         log_event="notary.input_validation_failed",
     )
 
-    prompt = (
-        "You are an assistant for Dutch notarial offices. "
-        "Summarize the following document in a structured, neutral way. "
-        "Only summarize; do not give legal advice or speculate. "
-        "Output MUST contain: title; bullet points of key points; parties involved; "
-        "any explicit risks or warnings mentioned.\n\n"
-        f"LANGUAGE: {payload.language.upper()}\n"
-        "DOCUMENT:\n"
-        f"{text}"
-    )
+    prompt = notary_prompt(text, payload.language)
 
     source: str
     raw_summary: str
     metadata: dict[str, Any] = {}
 
     try:
-        llm_result = await llm.generate_notary_summary(prompt, tenant_id=tenant_id)
+        with flow_deadline_scope("notary"):
+            llm_result = await llm.generate_notary_summary(prompt, tenant_id=tenant_id)
         raw_summary = llm_result.raw_text
         source = "llm"
         LLM_CALLS.labels(flow="notary_summarize", source="llm").inc()
@@ -7,6 +7,7 @@ from fastapi import APIRouter, FastAPI
 from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
+from app.agents.conversations import close_checkpointer
 from app.core.config import get_settings
 from app.core.logging import configure_logging, get_logger
 from app.core.metrics import get_metrics, metrics_content_type
@@ -20,7 +21,9 @@ from app.http.routers.documents import build_documents_router
 from app.http.routers.health import build_health_router
 from app.http.routers.rag import build_rag_router
 from app.http.routers.workflows import build_workflow_router
+from app.llm.warmup import ModelWarmer
 from app.models import Base
+from app.services_litellm_gateway import litellm_gateway
 
 
 logger = get_logger(__name__)
@@ -34,10 +37,16 @@ async def _init_db() -> None:
 
 def _build_lifespan():
     @asynccontextmanager
-    async def lifespan(_: FastAPI):
+    async def lifespan(app: FastAPI):
         await _init_db()
+        warmer = ModelWarmer(get_settings())
+        app.state.model_warmer = warmer
+        warmer.start()
         logger.info("app.startup")
         yield
+        await warmer.stop()
+        await close_checkpointer()
+        await litellm_gateway.aclose()
         await close_redis()
         logger.info("app.shutdown")
 
@@ -1,20 +1,37 @@
+"""HTTP middleware, written as pure ASGI classes.
+
+`BaseHTTPMiddleware` (`@app.middleware("http")`) runs the app in a separate task and
+relays the response body through a memory stream. That costs a task plus a channel hop
+per request and per body chunk, which adds up on long SSE streams. These classes
+instead wrap `send` and change only the `http.response.start` message, so body chunks
+pass straight through.
+
+`install_http_middleware` registers them in the order the decorator stack used, from
+innermost to outermost: request context, CORS, security headers, metrics, rate limit,
+then API key. So a 401 or 429 rejection still skips the inner layers, exactly as before.
+"""
+
 from __future__ import annotations
 
 import time
 import uuid
 
 import structlog.contextvars
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import Settings
-from app.core.metrics import REQUEST_COUNT, REQUEST_LATENCY
-from app.core.redis import check_rate_limit
+from app.core.deadline import parse_deadline_header, reset_deadline, set_deadline
+from app.core.metrics import REQUEST_COUNT, REQUEST_LATENCY, TOKEN_QUOTA_REJECTIONS
+from app.core.redis import check_rate_limit, check_token_quota
+from app.llm.usage import tenant_label, token_quota_limits
 
 
 def install_http_middleware(app: FastAPI, settings: Settings) -> None:
-    _install_request_context_middleware(app)
+    _install_request_context_middleware(app, settings)
     _install_cors(app, settings)
     _install_security_headers_middleware(app, settings)
 
@@ -28,19 +45,47 @@ def install_http_middleware(app: FastAPI, settings: Settings) -> None:
         _install_api_key_middleware(app, settings)
 
 
-def _install_request_context_middleware(app: FastAPI) -> None:
-    @app.middleware("http")
-    async def request_id_middleware(request: Request, call_next):
-        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+class RequestContextMiddleware:
+    """Binds the request id and the client's deadline for the whole request.
+
+    The response echoes the id as `X-Request-ID`.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Settings) -> None:
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_id = headers.get("X-Request-ID") or uuid.uuid4().hex
         structlog.contextvars.bind_contextvars(request_id=request_id)
+        deadline_seconds = parse_deadline_header(
+            headers.get(self.settings.request_deadline_header_name),
+            max_seconds=self.settings.request_deadline_max_seconds,
+        )
+        deadline_token = set_deadline(deadline_seconds) if deadline_seconds else None
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
         try:
-            response = await call_next(request)
-            response.headers["X-Request-ID"] = request_id
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
+            if deadline_token is not None:
+                reset_deadline(deadline_token)
             structlog.contextvars.clear_contextvars()
 
 
+def _install_request_context_middleware(app: FastAPI, settings: Settings) -> None:
+    app.add_middleware(RequestContextMiddleware, settings=settings)
+
+
 def _install_cors(app: FastAPI, settings: Settings) -> None:
     origins = (
         [origin.strip() for origin in settings.cors_allowed_origins.split(",") if origin.strip()]
@@ -56,64 +101,140 @@ def _install_cors(app: FastAPI, settings: Settings) -> None:
     )
 
 
-def _install_security_headers_middleware(app: FastAPI, settings: Settings) -> None:
-    @app.middleware("http")
-    async def security_headers_middleware(request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+class SecurityHeadersMiddleware:
+    def __init__(self, app: ASGIApp, settings: Settings) -> None:
+        self.app = app
+        self.headers = {
+            "X-Content-Type-Options": "nosniff",
+            "X-Frame-Options": "DENY",
+            "Referrer-Policy": "strict-origin-when-cross-origin",
+        }
         if settings.environment == "prod":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        return response
+            self.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self.headers.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def _install_security_headers_middleware(app: FastAPI, settings: Settings) -> None:
+    app.add_middleware(SecurityHeadersMiddleware, settings=settings)
+
+
+class MetricsMiddleware:
+    """Request count and latency; latency runs until the response headers are sent."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-def _install_metrics_middleware(app: FastAPI) -> None:
-    @app.middleware("http")
-    async def metrics_middleware(request: Request, call_next):
         started = time.perf_counter()
-        response = await call_next(request)
-        elapsed = time.perf_counter() - started
-        path = request.scope.get("path", "")
-        method = request.method
-        REQUEST_LATENCY.labels(method=method, path=path).observe(elapsed)
-        REQUEST_COUNT.labels(method=method, path=path, status=response.status_code).inc()
-        return response
 
+        async def send_with_metrics(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                path = scope.get("path", "")
+                method = scope["method"]
+                REQUEST_LATENCY.labels(method=method, path=path).observe(elapsed)
+                REQUEST_COUNT.labels(method=method, path=path, status=message["status"]).inc()
+            await send(message)
+
+        await self.app(scope, receive, send_with_metrics)
+
+
+def _install_metrics_middleware(app: FastAPI) -> None:
+    app.add_middleware(MetricsMiddleware)
 
-def _install_rate_limit_middleware(app: FastAPI, settings: Settings) -> None:
-    @app.middleware("http")
-    async def rate_limit_middleware(request: Request, call_next):
-        if not request.url.path.startswith(f"{settings.api_v1_prefix}/"):
-            return await call_next(request)
 
-        tenant_id = request.headers.get(settings.tenant_header_name) or settings.default_tenant_id
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, settings: Settings) -> None:
+        self.app = app
+        self.settings = settings
+        self.prefix = f"{settings.api_v1_prefix}/"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        settings = self.settings
+        headers = Headers(scope=scope)
+        tenant_id = headers.get(settings.tenant_header_name) or settings.default_tenant_id
         limit = getattr(settings, "rate_limit_per_minute", 120)
         if not await check_rate_limit(tenant_id, limit=limit, window_seconds=60):
-            return ORJSONResponse(
+            response = ORJSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={"detail": "Rate limit exceeded. Try again later."},
             )
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
+        # Admission is checked against tokens already used; a request that starts under
+        # quota is allowed to finish, so a window can overshoot by one request's usage.
+        per_minute, per_day = token_quota_limits(settings, tenant_id)
+        exhausted = await check_token_quota(tenant_id, per_minute=per_minute, per_day=per_day)
+        if exhausted:
+            TOKEN_QUOTA_REJECTIONS.labels(
+                tenant_id=tenant_label(settings, tenant_id), window=exhausted
+            ).inc()
+            response = ORJSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": f"Token quota per {exhausted} exceeded. Try again later."},
+                headers={"Retry-After": str(_seconds_until_window_reset(exhausted))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
 
 
-def _install_api_key_middleware(app: FastAPI, settings: Settings) -> None:
-    exempt_paths = {f"{settings.api_v1_prefix}/health"}
+def _install_rate_limit_middleware(app: FastAPI, settings: Settings) -> None:
+    app.add_middleware(RateLimitMiddleware, settings=settings)
+
+
+def _seconds_until_window_reset(window: str) -> int:
+    period = 60 if window == "minute" else 86400
+    return period - int(time.time()) % period
+
+
+class ApiKeyMiddleware:
+    def __init__(self, app: ASGIApp, settings: Settings) -> None:
+        self.app = app
+        self.api_key = settings.api_key
+        self.prefix = f"{settings.api_v1_prefix}/"
+        self.exempt_paths = {
+            f"{settings.api_v1_prefix}/health",
+            f"{settings.api_v1_prefix}/health/ready",
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        require_auth = path.startswith(self.prefix) or path == "/metrics"
+        if require_auth and Headers(scope=scope).get("X-API-Key") != self.api_key:
+            response = ORJSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Invalid or missing API key"},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
 
-    @app.middleware("http")
-    async def api_key_middleware(request: Request, call_next):
-        if request.url.path in exempt_paths:
-            return await call_next(request)
 
-        require_auth = (
-            request.url.path.startswith(f"{settings.api_v1_prefix}/")
-            or request.url.path == "/metrics"
-        )
-        if require_auth:
-            key = request.headers.get("X-API-Key")
-            if key != settings.api_key:
-                return ORJSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Invalid or missing API key"},
-                )
-        return await call_next(request)
+def _install_api_key_middleware(app: FastAPI, settings: Settings) -> None:
+    app.add_middleware(ApiKeyMiddleware, settings=settings)
@@ -1,16 +1,46 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import asyncio
+
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agents import run_agent, run_agent_stream
+from app.agents import run_agent, run_agent_events, run_agent_stream
 from app.db import get_db_session
 from app.documents import fetch_document_payload
-from app.http.sse import stream_text_tokens
+from app.rag import rag_pipeline
+from app.http.sse import stream_events, stream_text_tokens
 from app.schemas import AgentChatRequest, AgentChatResponse
 
 
+def _document_fns(db: AsyncSession):
+    """Document fetcher and RAG passage search for one request's session.
+
+    The agent runs tool calls concurrently, and an `AsyncSession` allows one operation at
+    a time, so the lock serializes them.
+    """
+    lock = asyncio.Lock()
+
+    async def get_document(document_id: str, request_tenant_id: str) -> dict | None:
+        async with lock:
+            return await fetch_document_payload(db, request_tenant_id, document_id)
+
+    async def search_passages(
+        document_id: str, request_tenant_id: str, query: str, top_k: int
+    ) -> list[dict]:
+        async with lock:
+            return await rag_pipeline.retrieve(
+                tenant_id=request_tenant_id,
+                query=query,
+                top_k=top_k,
+                document_ids=[document_id],
+                db=db,
+            )
+
+    return get_document, search_passages
+
+
 def build_agent_router(get_tenant_id) -> APIRouter:
     router = APIRouter(tags=["agents"])
 
@@ -20,33 +50,42 @@ def build_agent_router(get_tenant_id) -> APIRouter:
         tenant_id: str = Depends(get_tenant_id),
         db: AsyncSession = Depends(get_db_session),
     ) -> AgentChatResponse:
-        async def get_document(document_id: str, request_tenant_id: str) -> dict | None:
-            return await fetch_document_payload(db, request_tenant_id, document_id)
-
+        get_document, search_passages = _document_fns(db)
         result = await run_agent(
             tenant_id=tenant_id,
             message=payload.message,
             get_document_fn=get_document,
+            conversation_id=payload.conversation_id,
+            search_passages_fn=search_passages,
         )
-        return AgentChatResponse(**result)
+        return AgentChatResponse(**result, conversation_id=payload.conversation_id)
 
     @router.post("/ai/agents/chat/stream")
     async def agent_chat_stream(
         payload: AgentChatRequest,
+        request: Request,
+        coalesce: bool = False,
+        events: bool = False,
         tenant_id: str = Depends(get_tenant_id),
         db: AsyncSession = Depends(get_db_session),
     ) -> StreamingResponse:
-        async def get_document(document_id: str, request_tenant_id: str) -> dict | None:
-            return await fetch_document_payload(db, request_tenant_id, document_id)
-
+        get_document, search_passages = _document_fns(db)
+        kwargs = {
+            "tenant_id": tenant_id,
+            "message": payload.message,
+            "get_document_fn": get_document,
+            "conversation_id": payload.conversation_id,
+            "search_passages_fn": search_passages,
+        }
+        # ?events=true streams typed node/tool/token/done events instead of bare tokens.
+        if events:
+            body = stream_events(run_agent_events(**kwargs), request=request)
+        else:
+            body = stream_text_tokens(
+                run_agent_stream(**kwargs), request=request, coalesce=coalesce
+            )
         return StreamingResponse(
-            stream_text_tokens(
-                run_agent_stream(
-                    tenant_id=tenant_id,
-                    message=payload.message,
-                    get_document_fn=get_document,
-                ),
-            ),
+            body,
             media_type="text/event-stream",
             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -17,11 +18,17 @@ from app.services_llm import llm_client
 logger = get_logger(__name__)
 
 
+def _models_ready(request: Request) -> bool:
+    """True once model warm-up has finished (or when no warmer is running)."""
+    warmer = getattr(request.app.state, "model_warmer", None)
+    return warmer is None or warmer.ready
+
+
 def build_health_router(settings: Settings) -> APIRouter:
     router = APIRouter(tags=["platform"])
 
     @router.get("/health", response_model=HealthStatus)
-    async def health(db: AsyncSession = Depends(get_db_session)) -> HealthStatus:
+    async def health(request: Request, db: AsyncSession = Depends(get_db_session)) -> HealthStatus:
         db_ok: bool | None = None
         try:
             await db.execute(text("SELECT 1"))
@@ -37,6 +44,14 @@ def build_health_router(settings: Settings) -> APIRouter:
             db_ok=db_ok,
             redis_ok=await ping_redis(),
             llm_ok=llm_client.is_configured(),
+            ready=_models_ready(request),
         )
 
+    @router.get("/health/ready", include_in_schema=False)
+    async def readiness(request: Request) -> Response:
+        """Readiness probe: 503 until the configured models have been warmed up."""
+        if not _models_ready(request):
+            return ORJSONResponse({"ready": False}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return ORJSONResponse({"ready": True})
+
     return router
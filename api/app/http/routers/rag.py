@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -27,12 +27,16 @@ def build_rag_router(get_tenant_id) -> APIRouter:
     @router.post("/ai/rag/query/stream")
     async def rag_query_stream(
         payload: RAGQueryRequest,
+        request: Request,
+        coalesce: bool = False,
         tenant_id: str = Depends(get_tenant_id),
         db: AsyncSession = Depends(get_db_session),
     ) -> StreamingResponse:
         return StreamingResponse(
             stream_text_tokens(
                 run_rag_query_flow_stream(tenant_id=tenant_id, db=db, payload=payload),
+                request=request,
+                coalesce=coalesce,
             ),
             media_type="text/event-stream",
             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
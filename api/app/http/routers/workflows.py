@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -58,6 +58,8 @@ def build_workflow_router(get_tenant_id) -> APIRouter:
     @router.post("/ai/ask/stream")
     async def ask_stream(
         payload: AskRequest,
+        request: Request,
+        coalesce: bool = False,
         tenant_id: str = Depends(get_tenant_id),
         db: AsyncSession = Depends(get_db_session),
     ) -> StreamingResponse:
@@ -69,6 +71,8 @@ def build_workflow_router(get_tenant_id) -> APIRouter:
         return StreamingResponse(
             stream_text_tokens(
                 run_ask_flow_stream(tenant_id=tenant_id, db=db, payload=payload),
+                request=request,
+                coalesce=coalesce,
             ),
             media_type="text/event-stream",
             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
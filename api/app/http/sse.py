@@ -1,21 +1,241 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from collections.abc import AsyncIterable, AsyncIterator, Mapping
 from typing import Any
 
+import anyio
 import orjson
+from starlette.requests import Request
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import LLM_TOKENS_SAVED, SSE_STREAMS_ABORTED
+from app.llm.providers import STREAM_MAX_TOKENS
+from app.llm.usage import estimate_tokens
+
+
+logger = get_logger(__name__)
+
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+
+# How often the client connection is polled while streaming. Polling before every event
+# costs a receive() round trip per token; a late check wastes at most this long.
+DISCONNECT_CHECK_SECONDS = 0.25
 
 
 def sse_event(payload: Mapping[str, Any]) -> bytes:
-    return f"data: {orjson.dumps(dict(payload)).decode()}\n\n".encode()
+    return _SSE_PREFIX + orjson.dumps(dict(payload)) + _SSE_SUFFIX
+
+
+class _DisconnectPoller:
+    """`request.is_disconnected()`, asked at most once per `interval` seconds."""
+
+    def __init__(self, request: Request | None, interval: float) -> None:
+        self._request = request
+        self._interval = interval
+        self._next_check = 0.0
+
+    async def __call__(self) -> bool:
+        if self._request is None:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self._interval
+        return await self._request.is_disconnected()
+
+
+def _record_abort(request: Request | None, max_tokens: int, sent: list[str]) -> None:
+    path = request.url.path if request is not None else ""
+    # Tokens are estimated from the text already sent; chunks and coalesced batches do
+    # not map one-to-one to model tokens.
+    tokens_sent = estimate_tokens("".join(sent))
+    SSE_STREAMS_ABORTED.labels(path=path).inc()
+    LLM_TOKENS_SAVED.labels(path=path).inc(max(0, max_tokens - tokens_sent))
+    logger.info("sse.client_disconnected", path=path, tokens_sent=tokens_sent)
+
+
+async def _close_source(source: AsyncIterable[Any]) -> None:
+    """Close the upstream generator so the provider's HTTP stream is released now."""
+    aclose = getattr(source, "aclose", None)
+    if aclose is None:
+        return
+    # Shielded: the surrounding task may already be cancelled by the disconnect.
+    with anyio.CancelScope(shield=True):
+        await aclose()
+
+
+async def _single_chunks(source: AsyncIterable[str]) -> AsyncIterator[list[str]]:
+    async for chunk in source:
+        yield [chunk]
+
+
+# Queue items that are not chunks: the end of the source, and "no chunk before the
+# flush deadline".
+_END = object()
+_FLUSH = object()
+# Chunks the pump may read ahead of the consumer; beyond this the upstream waits.
+_COALESCE_QUEUE_SIZE = 256
 
 
-async def stream_text_tokens(source: AsyncIterable[str]) -> AsyncIterator[bytes]:
+async def _pump(source: AsyncIterable[str], queue: asyncio.Queue[Any]) -> None:
+    """Read the whole source in this one task; a failure is queued for the consumer."""
     try:
         async for chunk in source:
-            yield sse_event({"token": chunk})
+            await queue.put(chunk)
+    except Exception as exc:  # noqa: BLE001 - re-raised by the consumer
+        await queue.put(exc)
+    else:
+        await queue.put(_END)
+    finally:
+        # Close from the task that iterated the source, as generators holding cancel
+        # scopes (LangGraph streams) require.
+        await _close_source(source)
+
+
+async def _coalesced_chunks(
+    source: AsyncIterable[str],
+    *,
+    flush_interval: float,
+    max_bytes: int,
+) -> AsyncIterator[list[str]]:
+    """Group chunks into batches flushed every `flush_interval` seconds or `max_bytes`.
+
+    A single pump task reads the source into a queue and batching happens here, on the
+    consumer side, so a quiet upstream cannot hold back a partial batch past its flush
+    time and the source is never stepped from more than one task.
+    """
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=_COALESCE_QUEUE_SIZE)
+    pump = asyncio.create_task(_pump(source, queue))
+    batch: list[str] = []
+    batch_bytes = 0
+    flush_at = 0.0
+    try:
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                if batch:
+                    item = _FLUSH
+                    with anyio.move_on_after(flush_at - time.monotonic()):
+                        item = await queue.get()
+                else:
+                    item = await queue.get()
+
+            if item is _FLUSH:
+                yield batch
+                batch, batch_bytes = [], 0
+                continue
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                if batch:
+                    yield batch
+                raise item
+
+            if not batch:
+                flush_at = time.monotonic() + flush_interval
+            batch.append(item)
+            batch_bytes += len(item.encode())
+            if batch_bytes >= max_bytes or time.monotonic() >= flush_at:
+                yield batch
+                batch, batch_bytes = [], 0
+        if batch:
+            yield batch
+    finally:
+        pump.cancel()
+        with anyio.CancelScope(shield=True):
+            await asyncio.gather(pump, return_exceptions=True)
+
+
+async def stream_text_tokens(
+    source: AsyncIterable[str],
+    *,
+    request: Request | None = None,
+    max_tokens: int = STREAM_MAX_TOKENS,
+    coalesce: bool = False,
+    disconnect_check_interval: float = DISCONNECT_CHECK_SECONDS,
+) -> AsyncIterator[bytes]:
+    """Encode text chunks as SSE events, stopping generation when the client goes away.
+
+    With `request`, the client connection is checked before an event is sent, at most
+    once per `disconnect_check_interval` seconds. On disconnect (or cancellation by the
+    server) the upstream source is closed, which cancels the provider stream instead of
+    letting it run to `max_tokens`.
+
+    With `coalesce`, consecutive chunks are merged into one `token` event, flushed every
+    `SSE_COALESCE_FLUSH_MS` or once `SSE_COALESCE_MAX_BYTES` are buffered.
+    """
+    if coalesce:
+        settings = get_settings()
+        batches = _coalesced_chunks(
+            source,
+            flush_interval=settings.sse_coalesce_flush_ms / 1000,
+            max_bytes=settings.sse_coalesce_max_bytes,
+        )
+    else:
+        batches = _single_chunks(source)
+
+    disconnected = _DisconnectPoller(request, disconnect_check_interval)
+    sent: list[str] = []
+    completed = False
+    aborted = False
+    try:
+        async for batch in batches:
+            if await disconnected():
+                aborted = True
+                return
+            text = "".join(batch)
+            sent.append(text)
+            yield sse_event({"token": text})
+        completed = True
+        yield sse_event({"done": True})
+    except (asyncio.CancelledError, GeneratorExit):
+        aborted = not completed
+        raise
     except Exception as exc:  # noqa: BLE001
         yield sse_event({"error": str(exc), "done": True})
-        return
+    finally:
+        if aborted:
+            _record_abort(request, max_tokens, sent)
+        await _close_source(batches)
+        await _close_source(source)
 
-    yield sse_event({"done": True})
+
+async def stream_events(
+    source: AsyncIterable[Mapping[str, Any]],
+    *,
+    request: Request | None = None,
+    max_tokens: int = STREAM_MAX_TOKENS,
+    disconnect_check_interval: float = DISCONNECT_CHECK_SECONDS,
+) -> AsyncIterator[bytes]:
+    """Encode typed event dicts as SSE events, one per event.
+
+    The source ends its own stream (e.g. with a `done` event); a failure becomes a final
+    `{"type": "error"}` event. Client disconnects are handled as in `stream_text_tokens`.
+    """
+    disconnected = _DisconnectPoller(request, disconnect_check_interval)
+    sent: list[str] = []
+    completed = False
+    aborted = False
+    try:
+        async for event in source:
+            if await disconnected():
+                aborted = True
+                return
+            if event.get("type") == "token":
+                sent.append(str(event.get("content") or ""))
+            yield sse_event(event)
+        completed = True
+    except (asyncio.CancelledError, GeneratorExit):
+        aborted = not completed
+        raise
+    except Exception as exc:  # noqa: BLE001
+        yield sse_event({"type": "error", "error": str(exc)})
+    finally:
+        if aborted:
+            _record_abort(request, max_tokens, sent)
+        await _close_source(source)
@@ -1,9 +1,16 @@
 """LLM provider abstractions and shared types."""
 
-from .errors import LLMError, LLMNotConfiguredError, LLMProviderError, LLMTimeoutError
+from .errors import (
+    LLMDeadlineExceededError,
+    LLMError,
+    LLMNotConfiguredError,
+    LLMProviderError,
+    LLMTimeoutError,
+)
 from .types import LLMResult
 
 __all__ = [
+    "LLMDeadlineExceededError",
     "LLMError",
     "LLMNotConfiguredError",
     "LLMProviderError",
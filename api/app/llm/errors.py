@@ -13,6 +13,10 @@ class LLMTimeoutError(LLMError):
     """Raised when LLM requests exceed the configured timeout."""
 
 
+class LLMDeadlineExceededError(LLMTimeoutError):
+    """Raised when the request's end-to-end deadline leaves no budget for an LLM call."""
+
+
 class LLMProviderError(LLMError):
     """Raised when the backing LLM provider returns an invalid or failed response."""
 
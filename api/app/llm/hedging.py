@@ -0,0 +1,201 @@
+"""Request hedging for short, idempotent LLM calls.
+
+A hedged call starts the primary request and, if it has not answered by a percentile of
+recently observed latency, fires a duplicate at a second endpoint. The first successful
+response wins and the loser is cancelled. A budget caps hedges at a fraction of requests
+so that a slow upstream cannot double the load on the model servers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from app.core.logging import get_logger
+from app.core.metrics import LLM_HEDGES
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Keeps the most recent latency samples and answers percentile queries."""
+
+    def __init__(self, window_size: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=max(1, int(window_size)))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        """Nearest-rank percentile of the current window, or None when empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = math.ceil(min(max(pct, 0.0), 100.0) / 100.0 * len(ordered))
+        return ordered[max(rank, 1) - 1]
+
+
+class HedgeBudget:
+    """Caps hedges at `max_ratio` of the requests seen in a sliding time window."""
+
+    def __init__(
+        self,
+        max_ratio: float,
+        *,
+        window_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_ratio = max(0.0, float(max_ratio))
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._requests: deque[float] = deque()
+        self._hedges: deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for samples in (self._requests, self._hedges):
+            while samples and samples[0] < cutoff:
+                samples.popleft()
+
+    def record_request(self) -> None:
+        now = self._clock()
+        self._prune(now)
+        self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+        """Reserve a hedge if doing so keeps hedges within the budget."""
+        now = self._clock()
+        self._prune(now)
+        if len(self._hedges) + 1 > self.max_ratio * len(self._requests):
+            return False
+        self._hedges.append(now)
+        return True
+
+
+@dataclass
+class HedgeOutcome(Generic[T]):
+    result: T
+    hedged: bool
+    winner: str  # "primary" or "hedge"
+
+
+async def _cancel_and_drain(tasks: list[asyncio.Future]) -> None:
+    pending = [task for task in tasks if not task.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def run_hedged(
+    primary: Callable[[], Awaitable[T]],
+    secondary: Callable[[], Awaitable[T]],
+    *,
+    delay: float,
+    allow_hedge: Callable[[], bool],
+) -> HedgeOutcome[T]:
+    """Run `primary`; after `delay` seconds also run `secondary` and return the first success.
+
+    `allow_hedge` is consulted only when the delay expires, so budget is spent only on
+    requests that are actually slow. If both calls fail, the primary's error is raised.
+    """
+    primary_task = asyncio.ensure_future(primary())
+    tasks: list[asyncio.Future] = [primary_task]
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=max(0.0, delay))
+        if done or not allow_hedge():
+            return HedgeOutcome(result=await primary_task, hedged=False, winner="primary")
+
+        hedge_task = asyncio.ensure_future(secondary())
+        tasks.append(hedge_task)
+        errors: dict[asyncio.Future, BaseException] = {}
+        pending: set[asyncio.Future] = {primary_task, hedge_task}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in (primary_task, hedge_task):
+                if task not in done:
+                    continue
+                error = task.exception()
+                if error is None:
+                    winner = "primary" if task is primary_task else "hedge"
+                    return HedgeOutcome(result=task.result(), hedged=True, winner=winner)
+                errors[task] = error
+        raise errors.get(primary_task) or errors[hedge_task]
+    finally:
+        await _cancel_and_drain(tasks)
+
+
+class Hedger:
+    """Per-provider hedging policy: latency window, hedge delay and budget."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        percentile: float = 95.0,
+        budget_percent: float = 10.0,
+        min_samples: int = 20,
+        min_delay_seconds: float = 0.05,
+        window_size: int = 200,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.percentile = percentile
+        self.min_samples = max(1, int(min_samples))
+        self.min_delay_seconds = max(0.0, float(min_delay_seconds))
+        self.latencies = LatencyTracker(window_size)
+        self.budget = HedgeBudget(budget_percent / 100.0, clock=clock)
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before hedging, or None until enough latency is observed."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        observed = self.latencies.percentile(self.percentile)
+        if observed is None:
+            return None
+        return max(observed, self.min_delay_seconds)
+
+    def _allow_hedge(self) -> bool:
+        if self.budget.try_acquire():
+            LLM_HEDGES.labels(provider=self.name, outcome="fired").inc()
+            return True
+        LLM_HEDGES.labels(provider=self.name, outcome="budget_exhausted").inc()
+        return False
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        secondary: Callable[[], Awaitable[T]],
+    ) -> T:
+        self.budget.record_request()
+        delay = self.hedge_delay()
+        started = time.perf_counter()
+        if delay is None:
+            result = await primary()
+            self.latencies.record(time.perf_counter() - started)
+            return result
+
+        outcome = await run_hedged(primary, secondary, delay=delay, allow_hedge=self._allow_hedge)
+        elapsed = time.perf_counter() - started
+        self.latencies.record(elapsed)
+        if outcome.hedged:
+            if outcome.winner == "hedge":
+                LLM_HEDGES.labels(provider=self.name, outcome="won").inc()
+            logger.info(
+                "llm.hedge_completed",
+                provider=self.name,
+                winner=outcome.winner,
+                delay_ms=round(delay * 1000, 2),
+                latency_ms=round(elapsed * 1000, 2),
+            )
+        return outcome.result
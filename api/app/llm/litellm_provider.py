@@ -0,0 +1,309 @@
+"""LiteLLM-backed provider with a routed fallback chain of models.
+
+Selected with `LLM_PROVIDER=litellm`. Models use LiteLLM's `provider/model` names
+(e.g. `ollama/llama3.2`, `openai/gpt-4o-mini`). Each call tries the models from
+`LLM_LITELLM_MODELS` in routing order and falls back to the next one on failure.
+Models that keep failing are skipped by a per-model circuit breaker, built from the
+same `CIRCUIT_BREAKER_*` settings as the other providers' breakers. Calls go through
+`LiteLLMGateway` (`app.services_litellm_gateway`), which imports LiteLLM lazily and
+pools its HTTP connections.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, AsyncIterator
+
+import anyio
+
+from app.circuit_breaker import CircuitBreaker, build_llm_circuit_breaker
+from app.core.config import Settings
+from app.core.logging import get_logger
+from app.core.metrics import LLM_ERRORS, LLM_LATENCY
+from app.services_litellm_gateway import LiteLLMGateway, litellm_gateway
+
+from .errors import LLMDeadlineExceededError, LLMProviderError, LLMTimeoutError
+from .profiles import GenerationProfile, openai_params
+from .providers import (
+    STREAM_MAX_TOKENS,
+    _attempt_timeout,
+    _build_openai_messages,
+    _profile_timeout,
+    _raise_if_deadline_timeout,
+    _within_deadline,
+)
+from .streaming import StreamObserver
+from .types import LLMResult
+
+
+logger = get_logger(__name__)
+
+# Weight of the newest sample in the per-model latency moving average.
+_LATENCY_EWMA_ALPHA = 0.2
+
+
+def _is_timeout(exc: Exception) -> bool:
+    return "timeout" in type(exc).__name__.lower()
+
+
+def _all_open() -> LLMProviderError:
+    return LLMProviderError("All LiteLLM models are circuit-open", provider="litellm")
+
+
+def _field(obj: Any, name: str) -> Any:
+    """Read `name` from a LiteLLM response object or plain dict."""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+class LiteLLMProvider:
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        base_url: str | None = None,
+        gateway: LiteLLMGateway | None = None,
+    ) -> None:
+        self._settings = settings
+        self._base_url_override = base_url
+        self._gateway = gateway or litellm_gateway
+        self._latency_ewma: dict[str, float] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def models(self) -> list[str]:
+        """Fallback chain in routing order (`ordered`, `latency` or `cost`)."""
+        models = list(self._settings.llm_litellm_models) or [self._settings.llm_model]
+        routing = self._settings.llm_litellm_routing
+        if routing == "latency":
+            # Unmeasured models sort first so they get a latency sample.
+            return sorted(models, key=lambda m: self._latency_ewma.get(m, 0.0))
+        if routing == "cost":
+            return sorted(models, key=self._cost_per_token)
+        return models
+
+    def _cost_per_token(self, model: str) -> float:
+        configured = self._settings.llm_litellm_model_costs.get(model)
+        if configured is not None:
+            return float(configured)
+        try:
+            import litellm
+
+            info = litellm.model_cost.get(model) or litellm.model_cost.get(model.split("/", 1)[-1])
+        except Exception:  # noqa: BLE001
+            info = None
+        if not info:
+            return math.inf
+        return float(info.get("input_cost_per_token", 0)) + float(
+            info.get("output_cost_per_token", 0)
+        )
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = build_llm_circuit_breaker(self._settings, "litellm", f"llm_litellm_{model}")
+            self._breakers[model] = breaker
+        return breaker
+
+    def _record_latency(self, model: str, seconds: float) -> None:
+        previous = self._latency_ewma.get(model)
+        self._latency_ewma[model] = (
+            seconds if previous is None else previous + _LATENCY_EWMA_ALPHA * (seconds - previous)
+        )
+
+    def _request_kwargs(
+        self,
+        model: str,
+        prompt: str,
+        system_prompt: str | None,
+        profile: GenerationProfile | None,
+        *,
+        default_max_tokens: int,
+        timeout_seconds: float,
+    ) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {
+            "model": model,
+            "messages": _build_openai_messages(prompt, system_prompt),
+            "timeout": timeout_seconds,
+            # Fallback and retries are handled here, across models.
+            "num_retries": 0,
+            **openai_params(profile, default_max_tokens=default_max_tokens),
+        }
+        base_url = self._base_url_override or self._settings.llm_base_url
+        if base_url:
+            kwargs["api_base"] = str(base_url).rstrip("/")
+        if self._settings.llm_api_key:
+            kwargs["api_key"] = self._settings.llm_api_key
+        return kwargs
+
+    async def _admit(self, model: str) -> bool:
+        """Ask the model's breaker right before trying it.
+
+        A half-open breaker hands out a probe slot here, so breakers of models an
+        earlier success never reaches are not asked at all.
+        """
+        allowed, _ = await self._breaker(model).acan_execute()
+        return allowed
+
+    async def _release(self, model: str) -> None:
+        """Give back an admitted call that ended without an outcome (deadline, cancel)."""
+        with anyio.CancelScope(shield=True):
+            await self._breaker(model).arelease()
+
+    async def _record_error(self, model: str, exc: Exception, duration: float) -> None:
+        error_type = "timeout" if _is_timeout(exc) else "provider_error"
+        LLM_ERRORS.labels(provider="litellm", error_type=error_type).inc()
+        await self._breaker(model).arecord_failure(duration)
+        logger.warning("llm.litellm_model_failed", model=model, error=str(exc))
+
+    async def complete(
+        self,
+        prompt: str,
+        *,
+        system_prompt: str | None = None,
+        timeout: float | None = None,
+        flow: str = "generic",
+        profile: GenerationProfile | None = None,
+    ) -> LLMResult:
+        timeout_seconds = _profile_timeout(timeout, profile, self._settings)
+        last_error: Exception | None = None
+        admitted = False
+        for index, model in enumerate(self.models()):
+            if not await self._admit(model):
+                continue
+            admitted = True
+            recorded = False
+            started = time.perf_counter()
+            try:
+                attempt_timeout = _attempt_timeout(timeout_seconds)
+                try:
+                    response = await _within_deadline(
+                        self._gateway.acompletion(
+                            **self._request_kwargs(
+                                model,
+                                prompt,
+                                system_prompt,
+                                profile,
+                                default_max_tokens=2048,
+                                timeout_seconds=attempt_timeout,
+                            )
+                        )
+                    )
+                    choices = _field(response, "choices") or []
+                    message = _field(choices[0], "message") if choices else None
+                    text = _field(message, "content") if message is not None else None
+                    if not isinstance(text, str) or not text.strip():
+                        raise LLMProviderError("LiteLLM returned empty content", provider="litellm")
+                except LLMDeadlineExceededError:
+                    raise
+                except Exception as exc:  # noqa: BLE001
+                    if _is_timeout(exc):
+                        _raise_if_deadline_timeout(exc, attempt_timeout, timeout_seconds)
+                    await self._record_error(model, exc, time.perf_counter() - started)
+                    recorded = True
+                    last_error = exc
+                    continue
+
+                elapsed = time.perf_counter() - started
+                await self._breaker(model).arecord_success(elapsed)
+                recorded = True
+            finally:
+                if not recorded:
+                    await self._release(model)
+
+            self._record_latency(model, elapsed)
+            LLM_LATENCY.labels(provider="litellm", flow=flow).observe(elapsed)
+            usage = _field(response, "usage")
+            logger.info("llm.litellm_success", model=model, latency_ms=round(elapsed * 1000, 2))
+            return LLMResult(
+                raw_text=text.strip(),
+                model=_field(response, "model") or model,
+                latency_ms=round(elapsed * 1000, 2),
+                used_fallback=index > 0,
+                prompt_tokens=_field(usage, "prompt_tokens") if usage else None,
+                completion_tokens=_field(usage, "completion_tokens") if usage else None,
+            )
+
+        if not admitted:
+            raise _all_open()
+        if last_error is not None and _is_timeout(last_error):
+            raise LLMTimeoutError(f"LiteLLM request timed out: {last_error}") from last_error
+        raise LLMProviderError(
+            f"All LiteLLM models failed: {last_error}", provider="litellm"
+        ) from last_error
+
+    async def stream_complete(
+        self,
+        prompt: str,
+        *,
+        system_prompt: str | None = None,
+        flow: str = "generic",
+        profile: GenerationProfile | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream from the first model that starts answering; no fallback after the first token."""
+        timeout_seconds = _profile_timeout(None, profile, self._settings)
+        last_error: Exception | None = None
+        admitted = False
+        for model in self.models():
+            if not await self._admit(model):
+                continue
+            admitted = True
+            recorded = False
+            observer = StreamObserver(provider="litellm", model=model, flow=flow)
+            emitted = False
+            started = time.perf_counter()
+            try:
+                response = await _within_deadline(
+                    self._gateway.acompletion(
+                        **self._request_kwargs(
+                            model,
+                            prompt,
+                            system_prompt,
+                            profile,
+                            default_max_tokens=STREAM_MAX_TOKENS,
+                            timeout_seconds=_attempt_timeout(timeout_seconds),
+                        ),
+                        stream=True,
+                    )
+                )
+                try:
+                    async for chunk in response:
+                        for choice in _field(chunk, "choices") or []:
+                            content = _field(_field(choice, "delta"), "content")
+                            if isinstance(content, str) and content:
+                                emitted = True
+                                observer.on_token()
+                                yield content
+                finally:
+                    # Also runs on GeneratorExit when the client goes away, so the
+                    # provider's HTTP stream is released instead of left to finish.
+                    aclose = getattr(response, "aclose", None)
+                    if aclose is not None:
+                        await aclose()
+            except LLMDeadlineExceededError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                await self._record_error(model, exc, time.perf_counter() - started)
+                recorded = True
+                if emitted:
+                    raise LLMProviderError(
+                        "LiteLLM stream failed mid-response", provider="litellm"
+                    ) from exc
+                last_error = exc
+                continue
+            else:
+                # Stream length reflects the answer, not provider latency; no slow-call sample.
+                await self._breaker(model).arecord_success()
+                recorded = True
+                return
+            finally:
+                observer.finish()
+                if not recorded:
+                    await self._release(model)
+
+        if not admitted:
+            raise _all_open()
+        raise LLMProviderError(
+            f"All LiteLLM models failed: {last_error}", provider="litellm"
+        ) from last_error
@@ -0,0 +1,79 @@
+"""Named generation profiles (token limits, stop sequences, sampling, timeouts) per flow.
+
+Flows pick a profile by name so short tasks such as classification stop early instead of
+generating up to a provider-wide limit. Defaults can be overridden per profile through
+`LLM_GENERATION_PROFILES`, e.g. `{"classify": {"max_tokens": 4}}`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, replace
+from typing import Any
+
+from app.core.config import get_settings
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """Generation limits for one kind of call. `None` leaves the provider default."""
+
+    name: str
+    max_tokens: int | None = None
+    stop: tuple[str, ...] = ()
+    temperature: float | None = None
+    # Ollama reloads the model whenever num_ctx changes, so leave this unset unless
+    # every flow sharing the model server uses the same value.
+    num_ctx: int | None = None
+    timeout_seconds: float | None = None
+
+
+DEFAULT_PROFILES: dict[str, GenerationProfile] = {
+    # No "\n" stop: models often open with a newline, which would end the completion
+    # before the label. The token cap keeps it short; the flow reads the first word.
+    "classify": GenerationProfile("classify", max_tokens=8, temperature=0.0, timeout_seconds=15.0),
+    "ask": GenerationProfile("ask", max_tokens=1024, temperature=0.2),
+    "rag": GenerationProfile("rag", max_tokens=1024, temperature=0.1),
+    "notary": GenerationProfile("notary", max_tokens=1024, temperature=0.1),
+    "agent": GenerationProfile("agent", max_tokens=512, temperature=0.0, num_ctx=2048),
+    "summarizer": GenerationProfile("summarizer", max_tokens=512, temperature=0.0, num_ctx=2048),
+}
+
+_FIELD_NAMES = {f.name for f in fields(GenerationProfile)} - {"name"}
+
+
+def get_profile(name: str) -> GenerationProfile:
+    """Return the named profile with any `LLM_GENERATION_PROFILES` overrides applied."""
+    profile = DEFAULT_PROFILES.get(name) or GenerationProfile(name)
+    overrides = get_settings().llm_generation_profiles.get(name)
+    if not overrides:
+        return profile
+    changes: dict[str, Any] = {k: v for k, v in overrides.items() if k in _FIELD_NAMES}
+    if "stop" in changes:
+        changes["stop"] = tuple(changes["stop"] or ())
+    return replace(profile, **changes)
+
+
+def ollama_options(profile: GenerationProfile | None, *, default_max_tokens: int) -> dict[str, Any]:
+    """`options` for Ollama's /api/generate."""
+    if profile is None:
+        return {"num_predict": default_max_tokens}
+    options: dict[str, Any] = {"num_predict": profile.max_tokens or default_max_tokens}
+    if profile.stop:
+        options["stop"] = list(profile.stop)
+    if profile.temperature is not None:
+        options["temperature"] = profile.temperature
+    if profile.num_ctx is not None:
+        options["num_ctx"] = profile.num_ctx
+    return options
+
+
+def openai_params(profile: GenerationProfile | None, *, default_max_tokens: int) -> dict[str, Any]:
+    """Sampling fields for an OpenAI-compatible chat completion payload."""
+    if profile is None:
+        return {"max_tokens": default_max_tokens}
+    params: dict[str, Any] = {"max_tokens": profile.max_tokens or default_max_tokens}
+    if profile.stop:
+        params["stop"] = list(profile.stop)
+    if profile.temperature is not None:
+        params["temperature"] = profile.temperature
+    return params
@@ -1,23 +1,98 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import time
-from typing import Any, AsyncIterator
+from typing import Any, AsyncIterator, Awaitable, TypeVar
 
 import httpx
-from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+from tenacity.stop import stop_base
 
 from app.core.config import Settings
+from app.core.deadline import (
+    clamp_timeout,
+    deadline_expired,
+    remaining_seconds,
+    run_within_deadline,
+)
 from app.core.logging import get_logger
 from app.core.metrics import LLM_ERRORS, LLM_LATENCY
 from app.security import sanitize_for_logging
 
-from .errors import LLMError, LLMProviderError, LLMTimeoutError
+from .errors import LLMDeadlineExceededError, LLMError, LLMProviderError, LLMTimeoutError
+from .profiles import GenerationProfile, ollama_options, openai_params
+from .streaming import StreamObserver
 from .types import LLMResult
 
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Upper bound on generated tokens for streaming calls; also used to estimate the tokens
+# saved when a client disconnects mid-stream.
+STREAM_MAX_TOKENS = 2048
+
+# Retrying is pointless when less than this much budget would remain for the attempt.
+_MIN_ATTEMPT_SECONDS = 1.0
+
+
+class _stop_when_deadline_cannot_fit(stop_base):
+    """Stop retrying when the backoff sleep would leave no room for another attempt."""
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        remaining = remaining_seconds()
+        if remaining is None:
+            return False
+        upcoming_sleep = retry_state.upcoming_sleep or 0.0
+        return remaining - upcoming_sleep < _MIN_ATTEMPT_SECONDS
+
+
+def _attempt_timeout(timeout_seconds: float) -> float:
+    """Per-attempt timeout shrunk to the remaining request budget."""
+    attempt_timeout = clamp_timeout(timeout_seconds)
+    if attempt_timeout <= 0:
+        raise LLMDeadlineExceededError("Request deadline exceeded before the LLM call")
+    return attempt_timeout
+
+
+def _raise_if_deadline_timeout(
+    exc: Exception, attempt_timeout: float, timeout_seconds: float
+) -> None:
+    """A timeout of an attempt shortened to fit the deadline is the deadline's doing.
+
+    It is raised as `LLMDeadlineExceededError` so it does not count against the
+    provider's circuit breaker; only the configured timeout says the provider is slow.
+    """
+    if attempt_timeout < timeout_seconds:
+        raise LLMDeadlineExceededError("Request deadline exceeded during the LLM call") from exc
+
+
+async def _within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await `awaitable`, bounding its total duration by the remaining request budget."""
+    try:
+        return await run_within_deadline(awaitable)
+    except asyncio.TimeoutError as exc:
+        raise LLMDeadlineExceededError("Request deadline exceeded during the LLM call") from exc
+
+
+def _profile_timeout(
+    timeout: float | None, profile: GenerationProfile | None, settings: Settings
+) -> float:
+    """Explicit timeout, else the profile's, else `LLM_TIMEOUT_SECONDS`."""
+    if timeout is not None:
+        return timeout
+    if profile is not None and profile.timeout_seconds is not None:
+        return profile.timeout_seconds
+    return settings.llm_timeout_seconds
+
 
 async def _post_with_retries(
     *,
@@ -29,13 +104,20 @@ async def _post_with_retries(
 ):
     async for attempt in AsyncRetrying(
         wait=wait_exponential(min=1, max=10),
-        stop=stop_after_attempt(max(1, int(max_retries))),
+        stop=(stop_after_attempt(max(1, int(max_retries))) | _stop_when_deadline_cannot_fit()),
         retry=retry_if_exception_type((httpx.RequestError, httpx.TimeoutException)),
         reraise=True,
     ):
         with attempt:
-            async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-                return await client.post(url, json=json_payload, headers=headers)
+            attempt_timeout = _attempt_timeout(timeout_seconds)
+            try:
+                async with httpx.AsyncClient(timeout=attempt_timeout) as client:
+                    return await _within_deadline(
+                        client.post(url, json=json_payload, headers=headers)
+                    )
+            except httpx.TimeoutException as exc:
+                _raise_if_deadline_timeout(exc, attempt_timeout, timeout_seconds)
+                raise
 
 
 def _build_openai_messages(prompt: str, system_prompt: str | None) -> list[dict[str, str]]:
@@ -54,8 +136,12 @@ def _build_openai_headers(settings: Settings) -> dict[str, str]:
 
 
 class OllamaProvider:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(self, settings: Settings, *, base_url: str | None = None) -> None:
         self._settings = settings
+        self._base_url_override = base_url
+
+    def _base_url(self) -> str:
+        return str(self._base_url_override or self._settings.llm_base_url).rstrip("/")
 
     async def complete(
         self,
@@ -63,19 +149,21 @@ class OllamaProvider:
         *,
         system_prompt: str | None = None,
         timeout: float | None = None,
+        flow: str = "generic",
+        profile: GenerationProfile | None = None,
     ) -> LLMResult:
-        base_url = str(self._settings.llm_base_url).rstrip("/")
-        url = f"{base_url}/api/generate"
+        url = f"{self._base_url()}/api/generate"
         payload: dict[str, Any] = {
             "model": self._settings.llm_model,
             "prompt": prompt,
             "stream": False,
-            "options": {"num_predict": 512},
+            "options": ollama_options(profile, default_max_tokens=512),
+            "keep_alive": self._settings.llm_keep_alive,
         }
         if system_prompt:
             payload["system"] = system_prompt
 
-        timeout_seconds = timeout if timeout is not None else self._settings.llm_timeout_seconds
+        timeout_seconds = _profile_timeout(timeout, profile, self._settings)
         started = time.perf_counter()
 
         try:
@@ -125,7 +213,7 @@ class OllamaProvider:
             raise LLMProviderError("Ollama returned empty response", provider="ollama")
 
         latency_ms = (time.perf_counter() - started) * 1000
-        LLM_LATENCY.labels(provider="ollama", flow="generic").observe(latency_ms / 1000.0)
+        LLM_LATENCY.labels(provider="ollama", flow=flow).observe(latency_ms / 1000.0)
         logger.info(
             "llm.ollama_success",
             latency_ms=round(latency_ms, 2),
@@ -136,6 +224,8 @@ class OllamaProvider:
             raw_text=text.strip(),
             model=data.get("model", self._settings.llm_model),
             latency_ms=round(latency_ms, 2),
+            prompt_tokens=data.get("prompt_eval_count"),
+            completion_tokens=data.get("eval_count"),
         )
 
     async def stream_complete(
@@ -143,18 +233,24 @@ class OllamaProvider:
         prompt: str,
         *,
         system_prompt: str | None = None,
+        flow: str = "generic",
+        profile: GenerationProfile | None = None,
     ) -> AsyncIterator[str]:
-        base_url = str(self._settings.llm_base_url).rstrip("/")
-        url = f"{base_url}/api/generate"
+        url = f"{self._base_url()}/api/generate"
         payload: dict[str, Any] = {
             "model": self._settings.llm_model,
             "prompt": prompt,
             "stream": True,
+            "options": ollama_options(profile, default_max_tokens=STREAM_MAX_TOKENS),
+            "keep_alive": self._settings.llm_keep_alive,
         }
         if system_prompt:
             payload["system"] = system_prompt
 
-        async with httpx.AsyncClient(timeout=self._settings.llm_timeout_seconds) as client:
+        configured_timeout = _profile_timeout(None, profile, self._settings)
+        timeout_seconds = _attempt_timeout(configured_timeout)
+        observer = StreamObserver(provider="ollama", model=self._settings.llm_model, flow=flow)
+        async with httpx.AsyncClient(timeout=timeout_seconds) as client:
             try:
                 async with client.stream("POST", url, json=payload) as response:
                     if response.status_code != 200:
@@ -163,6 +259,8 @@ class OllamaProvider:
                             f"Ollama returned {response.status_code}: {body.decode()[:500]}"
                         )
                     async for line in response.aiter_lines():
+                        if deadline_expired():
+                            raise LLMDeadlineExceededError("Request deadline exceeded mid-stream")
                         if not line:
                             continue
                         try:
@@ -171,15 +269,24 @@ class OllamaProvider:
                             continue
                         chunk = data.get("response") or data.get("text") or ""
                         if isinstance(chunk, str) and chunk:
+                            observer.on_token()
                             yield chunk
             except httpx.RequestError as exc:
+                if isinstance(exc, httpx.TimeoutException):
+                    _raise_if_deadline_timeout(exc, timeout_seconds, configured_timeout)
                 logger.warning("llm.ollama_stream_error", error=str(exc))
                 raise LLMError("Ollama stream request failed") from exc
+            finally:
+                observer.finish()
 
 
 class OpenAICompatibleProvider:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(self, settings: Settings, *, base_url: str | None = None) -> None:
         self._settings = settings
+        self._base_url_override = base_url
+
+    def _base_url(self) -> str:
+        return str(self._base_url_override or self._settings.llm_base_url).rstrip("/")
 
     async def complete(
         self,
@@ -187,15 +294,16 @@ class OpenAICompatibleProvider:
         *,
         system_prompt: str | None = None,
         timeout: float | None = None,
+        flow: str = "generic",
+        profile: GenerationProfile | None = None,
     ) -> LLMResult:
-        base_url = str(self._settings.llm_base_url).rstrip("/")
-        url = f"{base_url}/v1/chat/completions"
+        url = f"{self._base_url()}/v1/chat/completions"
         payload: dict[str, Any] = {
             "model": self._settings.llm_model,
             "messages": _build_openai_messages(prompt, system_prompt),
-            "max_tokens": 2048,
+            **openai_params(profile, default_max_tokens=2048),
         }
-        timeout_seconds = timeout if timeout is not None else self._settings.llm_timeout_seconds
+        timeout_seconds = _profile_timeout(timeout, profile, self._settings)
         started = time.perf_counter()
 
         try:
@@ -251,17 +359,20 @@ class OpenAICompatibleProvider:
             raise LLMProviderError("OpenAI-compatible returned empty content", provider="openai")
 
         latency_ms = (time.perf_counter() - started) * 1000
-        LLM_LATENCY.labels(provider="openai", flow="generic").observe(latency_ms / 1000.0)
+        LLM_LATENCY.labels(provider="openai", flow=flow).observe(latency_ms / 1000.0)
         logger.info(
             "llm.openai_success",
             latency_ms=round(latency_ms, 2),
             response_length=len(text),
             model=data.get("model", self._settings.llm_model),
         )
+        usage = data.get("usage") or {}
         return LLMResult(
             raw_text=text.strip(),
             model=data.get("model", self._settings.llm_model),
             latency_ms=round(latency_ms, 2),
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
         )
 
     async def stream_complete(
@@ -269,17 +380,21 @@ class OpenAICompatibleProvider:
         prompt: str,
         *,
         system_prompt: str | None = None,
+        flow: str = "generic",
+        profile: GenerationProfile | None = None,
     ) -> AsyncIterator[str]:
-        base_url = str(self._settings.llm_base_url).rstrip("/")
-        url = f"{base_url}/v1/chat/completions"
+        url = f"{self._base_url()}/v1/chat/completions"
         payload: dict[str, Any] = {
             "model": self._settings.llm_model,
             "messages": _build_openai_messages(prompt, system_prompt),
-            "max_tokens": 2048,
+            **openai_params(profile, default_max_tokens=STREAM_MAX_TOKENS),
             "stream": True,
         }
 
-        async with httpx.AsyncClient(timeout=self._settings.llm_timeout_seconds) as client:
+        configured_timeout = _profile_timeout(None, profile, self._settings)
+        timeout_seconds = _attempt_timeout(configured_timeout)
+        observer = StreamObserver(provider="openai", model=self._settings.llm_model, flow=flow)
+        async with httpx.AsyncClient(timeout=timeout_seconds) as client:
             try:
                 async with client.stream(
                     "POST",
@@ -293,6 +408,8 @@ class OpenAICompatibleProvider:
                             f"OpenAI-compatible returned {response.status_code}: {body.decode()[:500]}"
                         )
                     async for line in response.aiter_lines():
+                        if deadline_expired():
+                            raise LLMDeadlineExceededError("Request deadline exceeded mid-stream")
                         if not line or not line.startswith("data: "):
                             continue
                         data_str = line[6:].strip()
@@ -306,7 +423,12 @@ class OpenAICompatibleProvider:
                             delta = choice.get("delta", {})
                             content = delta.get("content")
                             if isinstance(content, str) and content:
+                                observer.on_token()
                                 yield content
             except httpx.RequestError as exc:
+                if isinstance(exc, httpx.TimeoutException):
+                    _raise_if_deadline_timeout(exc, timeout_seconds, configured_timeout)
                 logger.warning("llm.openai_stream_error", error=str(exc))
                 raise LLMError("OpenAI-compatible stream request failed") from exc
+            finally:
+                observer.finish()
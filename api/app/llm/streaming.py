@@ -0,0 +1,59 @@
+"""Latency and throughput instrumentation for streamed LLM responses."""
+
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+from app.core.metrics import (
+    LLM_STREAM_DURATION,
+    LLM_STREAM_TOKENS,
+    LLM_TIME_TO_FIRST_TOKEN,
+    LLM_TOKENS_PER_SECOND,
+)
+
+
+class StreamObserver:
+    """Record TTFT, duration, token count and tokens/sec for one stream.
+
+    Create it just before the upstream request is sent, call `on_token()` for each chunk
+    yielded and `finish()` once the stream ends (including on error or cancellation).
+    Chunks are counted as tokens: both providers emit roughly one token per chunk.
+    """
+
+    def __init__(
+        self,
+        *,
+        provider: str,
+        model: str,
+        flow: str,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._labels = {"provider": provider, "model": model, "flow": flow}
+        self._clock = clock
+        self._started = clock()
+        self._first_token_at: float | None = None
+        self._finished = False
+        self.tokens = 0
+
+    def on_token(self) -> None:
+        if self._first_token_at is None:
+            self._first_token_at = self._clock()
+            LLM_TIME_TO_FIRST_TOKEN.labels(**self._labels).observe(
+                self._first_token_at - self._started
+            )
+        self.tokens += 1
+
+    def finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        now = self._clock()
+        LLM_STREAM_DURATION.labels(**self._labels).observe(now - self._started)
+        LLM_STREAM_TOKENS.labels(**self._labels).observe(self.tokens)
+        if self._first_token_at is not None and self.tokens > 1:
+            generation_seconds = now - self._first_token_at
+            if generation_seconds > 0:
+                LLM_TOKENS_PER_SECOND.labels(**self._labels).observe(
+                    (self.tokens - 1) / generation_seconds
+                )
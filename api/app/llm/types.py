@@ -9,3 +9,6 @@ class LLMResult:
     model: str
     latency_ms: float
     used_fallback: bool = False
+    # Token usage as reported by the provider; None when it was not reported.
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
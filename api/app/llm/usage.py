@@ -0,0 +1,96 @@
+"""Per-tenant LLM token accounting and quota limits.
+
+Every LLM call records its prompt and completion tokens against the tenant, using the
+provider-reported usage when available and a character-based estimate otherwise. The
+counts feed Prometheus and the Redis fixed-window counters that the rate-limit
+middleware checks against `TOKEN_QUOTA_PER_MINUTE` / `TOKEN_QUOTA_PER_DAY`.
+"""
+
+from __future__ import annotations
+
+import math
+
+from app.core.config import Settings
+from app.core.metrics import LLM_TOKENS_USED
+from app.core.redis import record_token_usage
+
+from .types import LLMResult
+
+
+# Rough average for English text with BPE tokenizers; only used when the provider
+# does not report usage.
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str | None) -> int:
+    if not text:
+        return 0
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+def token_quota_limits(settings: Settings, tenant_id: str) -> tuple[int, int]:
+    """(per_minute, per_day) token limits for a tenant; 0 means unlimited."""
+    override = settings.token_quota_overrides.get(tenant_id, {})
+    return (
+        override.get("per_minute", settings.token_quota_per_minute),
+        override.get("per_day", settings.token_quota_per_day),
+    )
+
+
+# Metric label for tenants that are not configured (see `tenant_label`).
+OTHER_TENANT_LABEL = "other"
+
+
+def tenant_label(settings: Settings, tenant_id: str) -> str:
+    """`tenant_id` label for token metrics; unconfigured tenants share one bucket.
+
+    Tenant IDs come from a client-supplied header, so labelling them as-is would let
+    clients create unbounded metric series.
+    """
+    if (
+        tenant_id == settings.default_tenant_id
+        or tenant_id in settings.token_quota_overrides
+        or tenant_id in settings.metrics_tenant_labels
+    ):
+        return tenant_id
+    return OTHER_TENANT_LABEL
+
+
+async def record_usage(
+    tenant_id: str,
+    *,
+    flow: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+) -> None:
+    from app.core.config import get_settings
+
+    label = tenant_label(get_settings(), tenant_id)
+    LLM_TOKENS_USED.labels(tenant_id=label, flow=flow, token_type="prompt").inc(prompt_tokens)
+    LLM_TOKENS_USED.labels(tenant_id=label, flow=flow, token_type="completion").inc(
+        completion_tokens
+    )
+    await record_token_usage(tenant_id, prompt_tokens + completion_tokens)
+
+
+async def record_result_usage(
+    tenant_id: str,
+    result: LLMResult,
+    *,
+    flow: str,
+    prompt: str,
+    system_prompt: str | None,
+) -> None:
+    """Record a completed call, estimating whichever counts the provider left out."""
+    prompt_tokens = result.prompt_tokens
+    if prompt_tokens is None:
+        prompt_tokens = estimate_tokens(prompt) + estimate_tokens(system_prompt)
+    completion_tokens = result.completion_tokens
+    if completion_tokens is None:
+        completion_tokens = estimate_tokens(result.raw_text)
+    await record_usage(
+        tenant_id,
+        flow=flow,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+    )
@@ -0,0 +1,129 @@
+"""Ollama model preloading and residency keeper.
+
+Ollama loads a model on its first request and unloads it after `keep_alive` of idleness,
+so the first call after a deploy or a quiet period pays the full load time. The warmer
+preloads the configured models at startup with an empty-prompt generate (loads the model
+without producing tokens) and repeats it on a schedule to keep them resident. Embedding
+models reject generate calls; they are loaded with an empty `/api/embed` instead.
+
+Readiness waits for `LLM_MODEL` only. An auxiliary model from `LLM_WARMUP_MODELS` that
+fails to load is logged and retried on refresh, but does not hold the API out of rotation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from app.core.config import Settings
+from app.core.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+_RETRY_DELAY_SECONDS = 5.0
+
+
+class ModelWarmer:
+    """Preload Ollama models and keep them resident; exposes readiness for health checks."""
+
+    def __init__(self, settings: Settings) -> None:
+        self._settings = settings
+        self._task: asyncio.Task[None] | None = None
+        self._ready = asyncio.Event()
+        self.warmed_models: set[str] = set()
+        self._embedding_models: set[str] = set()
+        self.last_error: str | None = None
+        if not self.enabled:
+            self._ready.set()
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            self._settings.llm_warmup_enabled
+            and self._settings.llm_provider == "ollama"
+            and bool(self._settings.llm_base_url)
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def models(self) -> list[str]:
+        return list(dict.fromkeys([self._settings.llm_model, *self._settings.llm_warmup_models]))
+
+    async def _load(self, client: httpx.AsyncClient, base_url: str, model: str) -> None:
+        keep_alive = self._settings.llm_keep_alive
+        if model not in self._embedding_models:
+            response = await client.post(
+                f"{base_url}/api/generate",
+                json={"model": model, "prompt": "", "stream": False, "keep_alive": keep_alive},
+            )
+            # Ollama answers 400 "does not support generate" for embedding models.
+            if response.status_code != 400:
+                response.raise_for_status()
+                return
+        response = await client.post(
+            f"{base_url}/api/embed",
+            json={"model": model, "input": "", "keep_alive": keep_alive},
+        )
+        response.raise_for_status()
+        self._embedding_models.add(model)
+
+    async def warm_once(self) -> bool:
+        """Load every configured model once. Returns True when all of them loaded."""
+        base_url = str(self._settings.llm_base_url).rstrip("/")
+        all_ok = True
+        async with httpx.AsyncClient(timeout=self._settings.llm_warmup_timeout_seconds) as client:
+            for model in self.models():
+                started = time.perf_counter()
+                try:
+                    await self._load(client, base_url, model)
+                except httpx.HTTPError as exc:
+                    all_ok = False
+                    self.last_error = f"{model}: {exc}"
+                    logger.warning("llm.warmup_failed", model=model, error=str(exc))
+                    continue
+                self.warmed_models.add(model)
+                logger.info(
+                    "llm.warmup_done",
+                    model=model,
+                    load_ms=round((time.perf_counter() - started) * 1000, 2),
+                )
+        if all_ok:
+            self.last_error = None
+        return all_ok
+
+    async def _run(self) -> None:
+        started = time.monotonic()
+        while not await self.warm_once() and self._settings.llm_model not in self.warmed_models:
+            waited = time.monotonic() - started
+            if waited >= self._settings.llm_warmup_max_wait_seconds:
+                # Don't hold non-LLM endpoints out of rotation because the model server is down.
+                logger.warning("llm.warmup_gave_up", waited_seconds=round(waited, 1))
+                break
+            await asyncio.sleep(_RETRY_DELAY_SECONDS)
+        self._ready.set()
+
+        refresh = self._settings.llm_warmup_refresh_seconds
+        if refresh <= 0:
+            return
+        while True:
+            await asyncio.sleep(refresh)
+            await self.warm_once()
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="llm-model-warmer")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
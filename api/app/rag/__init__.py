@@ -2,6 +2,7 @@
 
 from .chunking import chunk_text
 from .embeddings import embedding_service
+from .passages import keyword_passages, outline
 from .pipeline import rag_pipeline
 
-__all__ = ["chunk_text", "embedding_service", "rag_pipeline"]
+__all__ = ["chunk_text", "embedding_service", "keyword_passages", "outline", "rag_pipeline"]
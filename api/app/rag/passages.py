@@ -0,0 +1,83 @@
+"""On-the-fly passage selection for documents that are not in the RAG index."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+
+from .chunking import chunk_text
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOP_WORDS = frozenset(
+    "the a an and or of in to for on with at by from as is are was were be been this that "
+    "what which who how when where why does do did about into it its de het een en van in op "
+    "te voor met is zijn".split()
+)
+# BM25 parameters (the usual defaults).
+_K1 = 1.2
+_B = 0.75
+
+_HEADING_RE = re.compile(
+    r"^(?:#{1,6}\s+.+|(?:\d+(?:\.\d+)*\.?|[IVXLC]+\.)\s+\S.{0,80}"
+    r"|(?:artikel|article|section|chapter|hoofdstuk)\s+\S.{0,80})$",
+    re.IGNORECASE,
+)
+
+
+def _terms(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 2 and t not in _STOP_WORDS]
+
+
+def keyword_passages(
+    text: str, query: str, *, top_k: int, chunk_size: int = 500
+) -> list[dict[str, object]]:
+    """Top `top_k` chunks of `text` for `query` by BM25, in document order.
+
+    Without query terms that occur in the document, returns the opening chunks.
+    """
+    chunks = chunk_text(text, chunk_size=chunk_size, chunk_overlap=50)
+    if not chunks:
+        return []
+    query_terms = set(_terms(query))
+    chunk_terms = [Counter(_terms(c)) for c in chunks]
+    avg_len = sum(sum(c.values()) for c in chunk_terms) / len(chunks) or 1.0
+
+    scored: list[tuple[float, int]] = []
+    for term in query_terms:
+        df = sum(1 for c in chunk_terms if term in c)
+        if df == 0:
+            continue
+        idf = math.log(1 + (len(chunks) - df + 0.5) / (df + 0.5))
+        for i, counts in enumerate(chunk_terms):
+            tf = counts.get(term, 0)
+            if tf:
+                length = sum(counts.values())
+                norm = tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * length / avg_len))
+                scored.append((idf * norm, i))
+
+    totals: dict[int, float] = {}
+    for score, i in scored:
+        totals[i] = totals.get(i, 0.0) + score
+    if totals:
+        best = sorted(totals, key=lambda i: (-totals[i], i))[:top_k]
+    else:
+        best = list(range(min(top_k, len(chunks))))
+    return [
+        {"chunk_index": i, "text": chunks[i], "score": round(totals.get(i, 0.0), 4)}
+        for i in sorted(best)
+    ]
+
+
+def outline(text: str, *, max_items: int = 8, max_chars: int = 80) -> list[str]:
+    """Heading-like lines (markdown, numbered, "Artikel 3") in document order."""
+    items: list[str] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or len(line) > max_chars + 10 or not _HEADING_RE.match(line):
+            continue
+        items.append(line.lstrip("#").strip()[:max_chars])
+        if len(items) >= max_items:
+            break
+    return items
@@ -93,12 +93,17 @@ class RAGIndexResponse(BaseModel):
 
 class AgentChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=4000)
+    # Resume a stored conversation; only the new message needs to be sent.
+    conversation_id: Optional[str] = Field(
+        None, min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_.:-]+$"
+    )
 
 
 class AgentChatResponse(BaseModel):
     answer: str
     tools_used: list[str] = Field(default_factory=list)
     error: Optional[str] = None
+    conversation_id: Optional[str] = None
 
 
 class HealthStatus(BaseModel):
@@ -108,3 +113,4 @@ class HealthStatus(BaseModel):
     db_ok: Optional[bool] = None
     redis_ok: Optional[bool] = None
     llm_ok: Optional[bool] = None
+    ready: Optional[bool] = None
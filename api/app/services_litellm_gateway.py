@@ -1,64 +1,60 @@
-"""LiteLLM gateway for multi-provider LLM routing."""
+"""LiteLLM gateway: the one place that calls `litellm.acompletion`.
 
-from __future__ import annotations
-
-from dataclasses import dataclass
-from typing import Optional
+`LiteLLMProvider` (`app.llm.litellm_provider`) routes, falls back and reads responses;
+this module owns the transport. LiteLLM is imported lazily because importing it is
+slow. On first use the gateway installs one pooled `httpx.AsyncClient` as
+`litellm.aclient_session`, so OpenAI-compatible backends reuse keep-alive connections
+across calls (`LLM_LITELLM_MAX_CONNECTIONS`, `LLM_LITELLM_MAX_KEEPALIVE_CONNECTIONS`).
+LiteLLM's native handlers, such as Ollama's, keep their own cached clients.
+"""
 
-from litellm import acompletion
+from __future__ import annotations
 
+from types import ModuleType
+from typing import Any, Optional
 
-class LiteLLMGatewayError(Exception):
-    """Raised when LiteLLM completion fails."""
+import httpx
 
-    pass
+from app.core.config import get_settings
 
 
-@dataclass
-class LiteLLMResult:
-    """Result from LiteLLM completion."""
+def _litellm() -> ModuleType:
+    import litellm
 
-    raw_text: str
-    model: str
-    total_tokens: int = 0
+    return litellm
 
 
 class LiteLLMGateway:
-    """Gateway for LLM completion via LiteLLM (supports OpenAI, Anthropic, Ollama, etc.)."""
-
-    async def complete(
-        self,
-        prompt: str,
-        *,
-        model: str,
-        system_prompt: Optional[str] = None,
-    ) -> LiteLLMResult:
-        """Complete a prompt using the specified model (e.g. ollama/llama3.2, openai/gpt-4)."""
-        messages: list[dict[str, str]] = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
-        try:
-            response = await acompletion(model=model, messages=messages)
-        except Exception as e:
-            raise LiteLLMGatewayError(str(e)) from e
-        choices = getattr(response, "choices", []) or []
-        if not choices:
-            raise LiteLLMGatewayError("LiteLLM returned no choices")
-        msg = getattr(choices[0], "message", None) or choices[0].get("message", {})
-        content = (
-            getattr(msg, "content", None)
-            or (msg.get("content") if isinstance(msg, dict) else None)
-            or ""
-        )
-        model_name = getattr(response, "model", None) or str(model)
-        usage = getattr(response, "usage", None)
-        total_tokens = getattr(usage, "total_tokens", 0) if usage else 0
-        return LiteLLMResult(
-            raw_text=str(content).strip() if content else "",
-            model=model_name,
-            total_tokens=total_tokens,
-        )
+    """Calls LiteLLM over a pooled HTTP client shared by every model in the chain."""
+
+    def __init__(self) -> None:
+        self._session: Optional[httpx.AsyncClient] = None
+
+    def _pooled_session(self) -> httpx.AsyncClient:
+        if self._session is None or self._session.is_closed:
+            settings = get_settings()
+            self._session = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.llm_litellm_max_connections,
+                    max_keepalive_connections=settings.llm_litellm_max_keepalive_connections,
+                ),
+                timeout=settings.llm_timeout_seconds,
+            )
+        return self._session
+
+    async def acompletion(self, **kwargs: Any) -> Any:
+        """`litellm.acompletion(**kwargs)`; with `stream=True` the result is async-iterable."""
+        litellm = _litellm()
+        current = litellm.aclient_session
+        # A session installed by someone else is left alone.
+        if current is None or current is self._session:
+            litellm.aclient_session = self._pooled_session()
+        return await litellm.acompletion(**kwargs)
+
+    async def aclose(self) -> None:
+        """Close the pooled client (application shutdown); the next call opens a new one."""
+        if self._session is not None:
+            await self._session.aclose()
 
 
 litellm_gateway = LiteLLMGateway()
@@ -1,21 +1,37 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from contextlib import aclosing
 from typing import Any, AsyncIterator, Optional
 
+import anyio
 import httpx
 
-from .circuit_breaker import CircuitBreaker, CircuitBreakerConfig, CircuitBreakerOpen
+from .circuit_breaker import CircuitBreaker, CircuitBreakerOpen, build_llm_circuit_breaker
 from .core.config import get_settings
+from .core.deadline import deadline_expired
 from .core.logging import get_logger
-from .llm.errors import LLMError, LLMNotConfiguredError, LLMProviderError, LLMTimeoutError
+from .core.metrics import LLM_ERRORS
+from .llm.errors import (
+    LLMDeadlineExceededError,
+    LLMError,
+    LLMNotConfiguredError,
+    LLMProviderError,
+    LLMTimeoutError,
+)
+from .llm.hedging import Hedger
+from .llm.litellm_provider import LiteLLMProvider
+from .llm.profiles import GenerationProfile, get_profile
 from .llm.providers import OllamaProvider, OpenAICompatibleProvider
 from .llm.types import LLMResult
+from .llm.usage import estimate_tokens, record_result_usage, record_usage
 
 
 logger = get_logger(__name__)
 __all__ = [
     "LLMClient",
+    "LLMDeadlineExceededError",
     "LLMError",
     "LLMNotConfiguredError",
     "LLMProviderError",
@@ -31,27 +47,24 @@ class LLMClient:
         self._providers = {
             "ollama": OllamaProvider(self._settings),
             "openai_compatible": OpenAICompatibleProvider(self._settings),
+            "litellm": LiteLLMProvider(self._settings),
         }
         self._circuit_breakers: dict[str, CircuitBreaker] = {
-            "ollama": CircuitBreaker(
-                "llm_ollama",
-                CircuitBreakerConfig(
-                    failure_threshold=5,
-                    recovery_timeout=30.0,
-                    timeout_seconds=self._settings.llm_timeout_seconds,
-                ),
-            ),
-            "openai": CircuitBreaker(
-                "llm_openai",
-                CircuitBreakerConfig(
-                    failure_threshold=5,
-                    recovery_timeout=30.0,
-                    timeout_seconds=self._settings.llm_timeout_seconds,
-                ),
-            ),
+            "ollama": self._build_circuit_breaker("ollama"),
+            "openai": self._build_circuit_breaker("openai"),
+            "litellm": self._build_circuit_breaker("litellm"),
         }
+        self._hedgers: dict[str, Hedger] = {}
+        self._hedge_providers: dict[str, Any] = {}
+
+    def _build_circuit_breaker(self, key: str) -> CircuitBreaker:
+        """Breaker for one provider; `CIRCUIT_BREAKER_POLICIES` picks its policy."""
+        return build_llm_circuit_breaker(self._settings, key, f"llm_{key}")
 
     def is_configured(self) -> bool:
+        if self._settings.llm_provider == "litellm":
+            # LiteLLM reaches hosted providers directly; a base URL is optional.
+            return bool(self._settings.llm_litellm_models or self._settings.llm_model)
         return bool(self._settings.llm_base_url and self._settings.llm_provider)
 
     def get_circuit_breaker_status(self) -> dict[str, Any]:
@@ -59,10 +72,65 @@ class LLMClient:
         return {provider: cb.get_state() for provider, cb in self._circuit_breakers.items()}
 
     def _provider_key(self) -> str:
-        return "ollama" if self._settings.llm_provider == "ollama" else "openai_compatible"
+        if self._settings.llm_provider in ("ollama", "litellm"):
+            return self._settings.llm_provider
+        return "openai_compatible"
 
     def _circuit_breaker_key(self) -> str:
-        return "ollama" if self._settings.llm_provider == "ollama" else "openai"
+        if self._settings.llm_provider in ("ollama", "litellm"):
+            return self._settings.llm_provider
+        return "openai"
+
+    def _hedger(self, provider_key: str) -> Hedger:
+        hedger = self._hedgers.get(provider_key)
+        if hedger is None:
+            hedger = Hedger(
+                self._circuit_breaker_key(),
+                percentile=self._settings.llm_hedge_percentile,
+                budget_percent=self._settings.llm_hedge_budget_percent,
+                min_samples=self._settings.llm_hedge_min_samples,
+                min_delay_seconds=self._settings.llm_hedge_min_delay_ms / 1000.0,
+            )
+            self._hedgers[provider_key] = hedger
+        return hedger
+
+    def _hedge_provider(self, provider_key: str) -> Any:
+        provider = self._hedge_providers.get(provider_key)
+        if provider is None:
+            provider_cls = type(self._providers[provider_key])
+            base_url = self._settings.llm_hedge_base_url
+            provider = provider_cls(self._settings, base_url=str(base_url) if base_url else None)
+            self._hedge_providers[provider_key] = provider
+        return provider
+
+    async def _hedged_complete(
+        self,
+        provider_key: str,
+        prompt: str,
+        *,
+        system_prompt: Optional[str],
+        timeout: Optional[float],
+        flow: str,
+        profile: Optional[GenerationProfile],
+    ) -> LLMResult:
+        primary = self._providers[provider_key]
+        secondary = self._hedge_provider(provider_key)
+        return await self._hedger(provider_key).run(
+            lambda: primary.complete(
+                prompt,
+                system_prompt=system_prompt,
+                timeout=timeout,
+                flow=flow,
+                profile=profile,
+            ),
+            lambda: secondary.complete(
+                prompt,
+                system_prompt=system_prompt,
+                timeout=timeout,
+                flow=flow,
+                profile=profile,
+            ),
+        )
 
     async def complete(
         self,
@@ -71,15 +139,25 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         tenant_id: str = "default",
         timeout: Optional[float] = None,
+        hedge: bool = False,
+        flow: str = "generic",
+        profile: Optional[GenerationProfile] = None,
     ) -> LLMResult:
+        """Complete a prompt. `hedge=True` opts short, idempotent calls into request hedging.
+
+        `profile` sets token limits, stop sequences and sampling (see `app.llm.profiles`).
+        """
         if not self.is_configured():
             raise LLMNotConfiguredError(
                 "LLM not configured. Set LLM_PROVIDER and LLM_BASE_URL (e.g. ollama + http://localhost:11434)."
             )
 
         provider_key = self._provider_key()
+        if deadline_expired():
+            raise LLMDeadlineExceededError("Request deadline exceeded before the LLM call")
+
         circuit_breaker = self._circuit_breakers[self._circuit_breaker_key()]
-        can_execute, reason = circuit_breaker.can_execute()
+        can_execute, reason = await circuit_breaker.acan_execute()
         if not can_execute:
             logger.error(
                 "llm.circuit_breaker_open",
@@ -89,23 +167,58 @@ class LLMClient:
             )
             raise CircuitBreakerOpen(reason or "Circuit breaker is open")
 
+        started = time.perf_counter()
+        # Set once the breaker has an outcome; otherwise the call's probe slot is released.
+        recorded = False
         try:
-            result = await self._providers[provider_key].complete(
-                prompt,
-                system_prompt=system_prompt,
-                timeout=timeout,
-            )
-            circuit_breaker.record_success()
-            return result
+            if hedge and self._settings.llm_hedge_enabled:
+                result = await self._hedged_complete(
+                    provider_key,
+                    prompt,
+                    system_prompt=system_prompt,
+                    timeout=timeout,
+                    flow=flow,
+                    profile=profile,
+                )
+            else:
+                result = await self._providers[provider_key].complete(
+                    prompt,
+                    system_prompt=system_prompt,
+                    timeout=timeout,
+                    flow=flow,
+                    profile=profile,
+                )
+            await circuit_breaker.arecord_success(time.perf_counter() - started)
+            recorded = True
+        except LLMDeadlineExceededError:
+            # The caller's budget ran out; that says nothing about provider health.
+            LLM_ERRORS.labels(
+                provider=self._circuit_breaker_key(), error_type="deadline_exceeded"
+            ).inc()
+            raise
         except (LLMError, httpx.RequestError, asyncio.TimeoutError):
-            circuit_breaker.record_failure()
+            await circuit_breaker.arecord_failure(time.perf_counter() - started)
+            recorded = True
             raise
+        finally:
+            if not recorded:
+                # Cancelled, out of deadline or an unexpected error: no verdict on the
+                # provider, but a half-open probe slot must not stay taken.
+                with anyio.CancelScope(shield=True):
+                    await circuit_breaker.arelease()
+
+        await record_result_usage(
+            tenant_id, result, flow=flow, prompt=prompt, system_prompt=system_prompt
+        )
+        return result
 
     async def generate_notary_summary(self, prompt: str, *, tenant_id: str) -> LLMResult:
         return await self.complete(
             prompt,
             system_prompt="You are a concise assistant for notarial document summarization. Reply only with the summary, no preamble.",
             tenant_id=tenant_id,
+            flow="notary_summarize",
+            profile=get_profile("notary"),
         )
 
     async def stream_complete(
@@ -114,17 +227,35 @@ class LLMClient:
         *,
         system_prompt: Optional[str] = None,
         tenant_id: str = "default",
+        flow: str = "generic",
+        profile: Optional[GenerationProfile] = None,
     ) -> AsyncIterator[str]:
         """Stream LLM tokens one chunk at a time. Raises LLMNotConfiguredError if not configured."""
         if not self.is_configured():
             raise LLMNotConfiguredError(
                 "LLM not configured. Set LLM_PROVIDER and LLM_BASE_URL (e.g. ollama + http://localhost:11434)."
             )
-        async for chunk in self._providers[self._provider_key()].stream_complete(
-            prompt,
-            system_prompt=system_prompt,
-        ):
-            yield chunk
+        provider = self._providers[self._provider_key()]
+        streamed: list[str] = []
+        try:
+            async with aclosing(
+                provider.stream_complete(
+                    prompt, system_prompt=system_prompt, flow=flow, profile=profile
+                )
+            ) as stream:
+                async for chunk in stream:
+                    streamed.append(chunk)
+                    yield chunk
+        finally:
+            # Streams carry no usage block; estimate, including tokens generated before
+            # a disconnect.
+            if streamed:
+                await record_usage(
+                    tenant_id,
+                    flow=flow,
+                    prompt_tokens=estimate_tokens(prompt) + estimate_tokens(system_prompt),
+                    completion_tokens=estimate_tokens("".join(streamed)),
+                )
 
 
 llm_client = LLMClient()
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+from contextlib import aclosing
 from typing import Any, AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .core.deadline import flow_deadline_scope
+from .llm.profiles import get_profile
 from .rag.pipeline import rag_pipeline
 from .schemas import RAGQueryRequest
 from .services_llm import LLMError, llm_client
@@ -47,11 +50,14 @@ async def run_rag_query_flow(
         }
 
     try:
-        result = await llm_client.complete(
-            prompt,
-            system_prompt="You are a helpful assistant. Answer concisely based only on the given context.",
-            tenant_id=tenant_id,
-        )
+        with flow_deadline_scope("rag"):
+            result = await llm_client.complete(
+                prompt,
+                system_prompt="You are a helpful assistant. Answer concisely based only on the given context.",
+                tenant_id=tenant_id,
+                flow="rag",
+                profile=get_profile("rag"),
+            )
         return {
             "answer": result.raw_text,
             "sources": [
@@ -102,11 +108,16 @@ async def run_rag_query_flow_stream(
         return
 
     try:
-        async for token in llm_client.stream_complete(
-            prompt,
-            system_prompt="You are a helpful assistant. Answer concisely based only on the given context.",
-            tenant_id=tenant_id,
-        ):
-            yield token
+        async with aclosing(
+            llm_client.stream_complete(
+                prompt,
+                system_prompt="You are a helpful assistant. Answer concisely based only on the given context.",
+                tenant_id=tenant_id,
+                flow="rag_stream",
+                profile=get_profile("rag"),
+            )
+        ) as stream:
+            async for token in stream:
+                yield token
     except (LLMError, Exception):
         yield "Answer unavailable (model error)."
@@ -0,0 +1 @@
+"""Performance benchmarks run against a live API (not part of the test suite)."""
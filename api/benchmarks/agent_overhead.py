@@ -0,0 +1,180 @@
+"""Benchmark: agent framework overhead with a scripted, zero-latency chat model.
+
+    cd api
+    python -m benchmarks.agent_overhead --tool-steps 2 --sessions 1,10,100 --runs 5
+
+`ScriptedChatModel` is a real LangChain chat model that answers instantly. Each turn it
+returns `--tool-steps` calculator tool calls and then a final answer. Everything timed
+is therefore `run_agent` itself: input checks, LangChain message handling and
+callbacks, the `add_messages` reducer, the compiled graph and `ToolExecutor`. No model
+server is contacted.
+
+For each concurrency level, `--sessions` sessions each run `--runs` chats back to
+back. The report has:
+
+- throughput in runs per second
+- p50/p95 run latency
+- per-step overhead: event-loop time per model call (one agent turn plus its tool
+  calls), i.e. wall time divided by all steps run. Queueing does not inflate it.
+- peak traced memory per session, from a second, traced pass
+
+The same runs are available to `pytest-benchmark` through
+`benchmarks/test_agent_overhead.py`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Iterator, Sequence
+from unittest.mock import patch
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from benchmarks.load.report import percentile
+
+
+MESSAGE = "Work out the running total for the quarterly figures."
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Answers instantly: `tool_steps` calculator calls per turn, then a final answer."""
+
+    tool_steps: int = 2
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> ScriptedChatModel:
+        return self
+
+    def _reply(self, messages: list[BaseMessage]) -> AIMessage:
+        done = 0
+        for m in reversed(messages):
+            if isinstance(m, HumanMessage):
+                break
+            if isinstance(m, ToolMessage):
+                done += 1
+        usage = {"input_tokens": 50 * (done + 1), "output_tokens": 10, "total_tokens": 0}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        if done < self.tool_steps:
+            call = {
+                "name": "calculator_tool",
+                "args": {"expression": f"{done}+1"},
+                "id": f"call-{done}",
+            }
+            return AIMessage(content="", tool_calls=[call], usage_metadata=usage)
+        return AIMessage(content="The running total is 42.", usage_metadata=usage)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._generate(messages, stop, run_manager, **kwargs)
+
+
+@contextmanager
+def scripted_agent(tool_steps: int) -> Iterator[ScriptedChatModel]:
+    """Route `run_agent` to a shared scripted model, as a configured LLM would be."""
+    model = ScriptedChatModel(tool_steps=tool_steps)
+    with patch("app.agents.react_agent.create_chat_model", return_value=model):
+        yield model
+
+
+async def _no_document(document_id: str, tenant_id: str) -> None:
+    return None
+
+
+async def one_run(session: int = 0) -> float:
+    from app.agents import run_agent
+
+    started = time.perf_counter()
+    result = await run_agent(f"bench-{session}", MESSAGE, _no_document)
+    elapsed = time.perf_counter() - started
+    if result.get("error"):
+        raise RuntimeError(f"agent run failed: {result['error']}")
+    return elapsed
+
+
+async def run_sessions(sessions: int, runs: int) -> list[float]:
+    """`sessions` concurrent sessions, each running `runs` chats back to back."""
+
+    async def session(i: int) -> list[float]:
+        return [await one_run(i) for _ in range(runs)]
+
+    per_session = await asyncio.gather(*(session(i) for i in range(sessions)))
+    return [t for timings in per_session for t in timings]
+
+
+async def _measure_level(sessions: int, runs: int, tool_steps: int) -> dict[str, float]:
+    await run_sessions(1, 1)  # warm graph compilation and imports
+    started = time.perf_counter()
+    timings = await run_sessions(sessions, runs)
+    wall = time.perf_counter() - started
+
+    # Memory is measured separately; tracing slows the timed pass down.
+    tracemalloc.start()
+    await run_sessions(sessions, 1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "sessions": sessions,
+        "runs": len(timings),
+        "throughput_rps": len(timings) / wall,
+        "p50_ms": percentile(timings, 50) * 1e3,
+        "p95_ms": percentile(timings, 95) * 1e3,
+        "per_step_us": wall / (len(timings) * (tool_steps + 1)) * 1e6,
+        "kib_per_session": peak / 1024 / sessions,
+    }
+
+
+async def measure(
+    concurrency: Sequence[int], *, runs: int, tool_steps: int
+) -> list[dict[str, float]]:
+    with scripted_agent(tool_steps):
+        return [await _measure_level(c, runs, tool_steps) for c in concurrency]
+
+
+def _print_table(results: list[dict[str, float]], tool_steps: int) -> None:
+    print(f"{tool_steps} tool steps + 1 answer per run (model latency 0)\n")
+    columns = ("sessions", "runs/s", "p50 ms", "p95 ms", "µs/step", "KiB/session")
+    print("".join(f"{c:>13}" for c in columns))
+    for r in results:
+        print(
+            f"{r['sessions']:>13}{r['throughput_rps']:>13.1f}{r['p50_ms']:>13.2f}"
+            f"{r['p95_ms']:>13.2f}{r['per_step_us']:>13.0f}{r['kib_per_session']:>13.1f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Agent framework overhead per step.")
+    parser.add_argument("--sessions", default="1,10,100", help="concurrency levels")
+    parser.add_argument("--runs", type=int, default=5, help="chats per session")
+    parser.add_argument("--tool-steps", type=int, default=2, help="tool calls per chat")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    # Per-run info logs would dominate the zero-latency runs being timed.
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from app.core.logging import configure_logging
+
+    configure_logging()
+    concurrency = [int(c) for c in args.sessions.split(",") if c.strip()]
+    results = asyncio.run(measure(concurrency, runs=args.runs, tool_steps=args.tool_steps))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results, args.tool_steps)
+
+
+if __name__ == "__main__":
+    main()
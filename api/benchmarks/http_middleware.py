@@ -0,0 +1,125 @@
+"""Micro-benchmark: HTTP middleware overhead per request and on SSE streams.
+
+    cd api
+    python -m benchmarks.http_middleware --requests 2000 --events 5000
+
+It builds two apps. "bare" has no middleware; "stack" has the full
+`install_http_middleware` chain: request context, CORS, security headers, metrics, rate
+limit and API key. Redis is replaced by in-process allow-all checks. Requests go
+through httpx's ASGI transport, so no sockets are involved, and the difference between
+the two apps is the middleware's cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Any
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+
+API_KEY = "bench-key"
+
+
+async def _allow(*args: Any, **kwargs: Any) -> Any:
+    return True
+
+
+async def _no_quota_exhausted(*args: Any, **kwargs: Any) -> None:
+    return None
+
+
+def build_app(*, middleware: bool, events: int) -> FastAPI:
+    from app.core.config import Settings
+    from app.http.middleware import install_http_middleware
+    from app.http.sse import sse_event
+
+    settings = Settings(api_key=API_KEY, redis_url="redis://bench:6379/0", enable_prometheus=True)
+    app = FastAPI()
+    if middleware:
+        install_http_middleware(app, settings)
+
+    @app.get(f"{settings.api_v1_prefix}/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    @app.get(f"{settings.api_v1_prefix}/stream")
+    async def stream() -> StreamingResponse:
+        async def body():
+            for i in range(events):
+                yield sse_event({"token": "x"})
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    return app
+
+
+async def _per_request(client: AsyncClient, requests: int) -> dict[str, float]:
+    for _ in range(50):
+        await client.get("/api/v1/ping")
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        r = await client.get("/api/v1/ping")
+        timings.append(time.perf_counter() - started)
+        r.raise_for_status()
+    timings.sort()
+    return {
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "p95_us": timings[int(0.95 * (len(timings) - 1))] * 1e6,
+    }
+
+
+async def _sse_rate(client: AsyncClient, events: int, rounds: int = 3) -> float:
+    best = 0.0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        received = 0
+        async with client.stream("GET", "/api/v1/stream") as r:
+            async for chunk in r.aiter_raw():
+                received += chunk.count(b"data: ")
+        assert received == events, received
+        best = max(best, events / (time.perf_counter() - started))
+    return best
+
+
+async def measure(requests: int, events: int) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    with (
+        patch("app.http.middleware.check_rate_limit", _allow),
+        patch("app.http.middleware.check_token_quota", _no_quota_exhausted),
+    ):
+        for name, middleware in (("bare", False), ("stack", True)):
+            app = build_app(middleware=middleware, events=events)
+            transport = ASGITransport(app=app)
+            headers = {"X-API-Key": API_KEY, "X-Tenant-ID": "bench"}
+            async with AsyncClient(transport=transport, base_url="http://b", headers=headers) as c:
+                results[name] = await _per_request(c, requests)
+                results[name]["sse_events_per_s"] = await _sse_rate(c, events)
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="HTTP middleware overhead.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=5000, help="SSE events per stream")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = asyncio.run(measure(args.requests, args.events))
+    print(f"{'':8}{'mean µs':>12}{'p95 µs':>12}{'SSE ev/s':>14}")
+    for name, r in results.items():
+        print(f"{name:8}{r['mean_us']:12.1f}{r['p95_us']:12.1f}{r['sse_events_per_s']:14.0f}")
+    overhead = results["stack"]["mean_us"] - results["bare"]["mean_us"]
+    print(f"\nmiddleware overhead: {overhead:.1f} µs per request")
+
+
+if __name__ == "__main__":
+    main()
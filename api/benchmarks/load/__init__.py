@@ -0,0 +1 @@
+"""Open-loop async load harness: weighted request mix, latency percentiles, saturation."""
@@ -0,0 +1,104 @@
+"""Run the load harness against a running API.
+
+    cd api
+    python -m benchmarks.load --base-url http://localhost:8000 --rates 2,5,10,20 \
+        --duration 30 --out-dir benchmarks/results/$(git rev-parse --short HEAD)
+
+Writes `report.json` and `report.md`. Run two commits with the same arguments and diff the
+JSON (or compare the tables) to see the change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from .report import build_report, to_markdown
+from .runner import run
+from .scenarios import select_mix
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Open-loop load test for the AI platform API.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--rates", default="2,5,10", help="Offered requests/second per stage")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per stage")
+    parser.add_argument("--scenarios", default="", help="Comma-separated subset of the mix")
+    parser.add_argument("--tenant", default="bench")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-seed-data", action="store_true")
+    parser.add_argument("--out-dir", default="benchmarks/results/latest")
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    mix = select_mix([s for s in args.scenarios.split(",") if s])
+    rates = [float(r) for r in args.rates.split(",") if r]
+    headers = {"X-Tenant-ID": args.tenant}
+    if args.api_key:
+        headers["X-API-Key"] = args.api_key
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=100)
+    async with httpx.AsyncClient(
+        base_url=args.base_url.rstrip("/") + args.api_prefix,
+        headers=headers,
+        timeout=args.timeout,
+        limits=limits,
+    ) as client:
+        results = await run(
+            client,
+            mix,
+            rates=rates,
+            duration=args.duration,
+            seed_data=not args.no_seed_data,
+            seed_value=args.seed,
+            max_in_flight=args.max_in_flight,
+        )
+    return build_report(
+        results,
+        metadata={
+            "commit": _git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "base_url": args.base_url,
+            "scenarios": ",".join(s.name for s in mix),
+            "duration_s": args.duration,
+            "seed": args.seed,
+        },
+        max_error_rate=args.max_error_rate,
+        max_p95_ms=args.max_p95_ms,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    report = asyncio.run(_main(args))
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "report.json").write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    markdown = to_markdown(report)
+    (out_dir / "report.md").write_text(markdown)
+    print(markdown)
+
+
+if __name__ == "__main__":
+    main()
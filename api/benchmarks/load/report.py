@@ -0,0 +1,134 @@
+"""Latency percentiles, error rates and saturation detection for load-test results."""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from typing import Any, Sequence
+
+from .runner import Sample, StageResult
+
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: Sequence[float], pct: float) -> float | None:
+    """Nearest-rank percentile; None for an empty sequence."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _ms(value: float | None) -> float | None:
+    return None if value is None else round(value * 1000, 2)
+
+
+def summarize_samples(samples: Sequence[Sample], duration_s: float) -> dict[str, Any]:
+    latencies = [s.latency_s for s in samples if s.ok]
+    ttfts = [s.ttft_s for s in samples if s.ok and s.ttft_s is not None]
+    errors = sum(1 for s in samples if not s.ok)
+    summary: dict[str, Any] = {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(latencies) / duration_s, 2) if duration_s > 0 else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = _ms(percentile(latencies, pct))
+    if ttfts:
+        for pct in PERCENTILES:
+            summary[f"ttft_p{pct}_ms"] = _ms(percentile(ttfts, pct))
+    return summary
+
+
+def summarize_stage(stage: StageResult) -> dict[str, Any]:
+    by_scenario: dict[str, list[Sample]] = defaultdict(list)
+    for sample in stage.samples:
+        by_scenario[sample.scenario].append(sample)
+    return {
+        "offered_rps": stage.offered_rps,
+        "arrival_rps": round(stage.arrival_rps, 2),
+        "duration_s": round(stage.duration_s, 2),
+        "dropped": stage.dropped,
+        "overall": summarize_samples(stage.samples, stage.duration_s),
+        "scenarios": {
+            name: summarize_samples(samples, stage.duration_s)
+            for name, samples in sorted(by_scenario.items())
+        },
+    }
+
+
+def saturation_point(
+    stages: Sequence[dict[str, Any]],
+    *,
+    max_error_rate: float = 0.01,
+    max_p95_ms: float | None = None,
+    min_goodput_ratio: float = 0.9,
+) -> float | None:
+    """First offered rate at which the system no longer keeps up, or None.
+
+    A stage is saturated when its error rate exceeds `max_error_rate`, its overall p95
+    exceeds `max_p95_ms`, or successful throughput (measured over the stage including its
+    drain) falls below `min_goodput_ratio` of the actual arrival rate, i.e. a queue built up.
+    """
+    for stage in stages:
+        overall = stage["overall"]
+        p95 = overall["p95_ms"]
+        if (
+            overall["error_rate"] > max_error_rate
+            or (max_p95_ms is not None and p95 is not None and p95 > max_p95_ms)
+            or overall["throughput_rps"]
+            < min_goodput_ratio * stage.get("arrival_rps", stage["offered_rps"])
+        ):
+            return stage["offered_rps"]
+    return None
+
+
+def build_report(
+    results: Sequence[StageResult],
+    *,
+    metadata: dict[str, Any] | None = None,
+    max_error_rate: float = 0.01,
+    max_p95_ms: float | None = None,
+) -> dict[str, Any]:
+    stages = [summarize_stage(stage) for stage in results]
+    return {
+        "metadata": metadata or {},
+        "stages": stages,
+        "saturation_rps": saturation_point(
+            stages, max_error_rate=max_error_rate, max_p95_ms=max_p95_ms
+        ),
+    }
+
+
+def _cell(value: Any) -> str:
+    return "-" if value is None else str(value)
+
+
+def to_markdown(report: dict[str, Any]) -> str:
+    lines = ["# Load test report", ""]
+    for key, value in report["metadata"].items():
+        lines.append(f"- **{key}**: {value}")
+    saturation = report["saturation_rps"]
+    lines.append(
+        f"- **saturation**: {f'{saturation} rps' if saturation is not None else 'not reached'}"
+    )
+    columns = ("requests", "error_rate", "throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+    ttft_columns = ("ttft_p50_ms", "ttft_p95_ms", "ttft_p99_ms")
+    header = ("scenario", *columns, *ttft_columns)
+    for stage in report["stages"]:
+        lines += [
+            "",
+            f"## {stage['offered_rps']} rps offered "
+            f"({stage['arrival_rps']} arrived, {stage['dropped']} dropped)",
+            "",
+            "| " + " | ".join(header) + " |",
+            "|" + "---|" * len(header),
+        ]
+        rows = [("all", stage["overall"]), *stage["scenarios"].items()]
+        for name, summary in rows:
+            cells = [name, *(_cell(summary.get(c)) for c in (*columns, *ttft_columns))]
+            lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
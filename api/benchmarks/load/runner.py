@@ -0,0 +1,150 @@
+"""Open-loop load generator.
+
+Requests are launched on a Poisson arrival schedule at the offered rate regardless of how
+many are still in flight, so a slow server shows up as growing latency and errors rather
+than as a quietly reduced request rate (the coordinated-omission problem of closed-loop
+tools).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Sequence
+
+import httpx
+
+from .scenarios import Scenario, seed_requests
+
+
+@dataclass
+class Sample:
+    scenario: str
+    offered_rps: float
+    latency_s: float
+    status: int | None
+    ttft_s: float | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and self.status < 400
+
+
+@dataclass
+class StageResult:
+    offered_rps: float
+    # Wall time including the drain of requests still in flight after the last arrival.
+    duration_s: float
+    samples: list[Sample]
+    # Arrivals skipped because `max_in_flight` requests were already outstanding.
+    dropped: int = 0
+    arrival_window_s: float = 0.0
+
+    @property
+    def arrival_rps(self) -> float:
+        """Rate actually offered (Poisson arrivals vary around `offered_rps`)."""
+        if self.arrival_window_s <= 0:
+            return self.offered_rps
+        return (len(self.samples) + self.dropped) / self.arrival_window_s
+
+
+async def _send(client: httpx.AsyncClient, scenario: Scenario, rng: random.Random, rate: float):
+    payload = scenario.payload(rng)
+    started = time.perf_counter()
+    ttft: float | None = None
+    error: str | None = None
+    try:
+        if scenario.stream:
+            async with client.stream(scenario.method, scenario.path, json=payload) as response:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    if ttft is None and '"token"' in line:
+                        ttft = time.perf_counter() - started
+                    if '"error"' in line:
+                        error = "stream_error"
+                status = response.status_code
+        else:
+            response = await client.request(scenario.method, scenario.path, json=payload)
+            status = response.status_code
+    except Exception as exc:  # noqa: BLE001 - every failure is a data point
+        return Sample(
+            scenario.name, rate, time.perf_counter() - started, None, error=type(exc).__name__
+        )
+    return Sample(scenario.name, rate, time.perf_counter() - started, status, ttft, error)
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    mix: Sequence[Scenario],
+    *,
+    rate: float,
+    duration: float,
+    seed: int = 0,
+    max_in_flight: int = 1000,
+) -> StageResult:
+    """Offer `rate` requests/second drawn from `mix` for `duration` seconds."""
+    rng = random.Random(seed)
+    weights = [s.weight for s in mix]
+    tasks: set[asyncio.Task[Sample]] = set()
+    samples: list[Sample] = []
+    dropped = 0
+
+    def collect(task: asyncio.Task[Sample]) -> None:
+        tasks.discard(task)
+        samples.append(task.result())
+
+    started = time.perf_counter()
+    next_arrival = started
+    while next_arrival - started < duration:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_in_flight:
+            dropped += 1
+        else:
+            scenario = rng.choices(mix, weights)[0]
+            task = asyncio.create_task(_send(client, scenario, rng, rate))
+            tasks.add(task)
+            task.add_done_callback(collect)
+        next_arrival += rng.expovariate(rate)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return StageResult(rate, time.perf_counter() - started, samples, dropped, duration)
+
+
+async def seed(client: httpx.AsyncClient) -> None:
+    """Create the seed document and its RAG index; existing data (409) is fine."""
+    for method, path, payload in seed_requests():
+        response = await client.request(method, path, json=payload)
+        if response.status_code >= 400 and response.status_code != 409:
+            raise RuntimeError(f"Seeding {path} failed: {response.status_code} {response.text}")
+
+
+async def run(
+    client: httpx.AsyncClient,
+    mix: Sequence[Scenario],
+    *,
+    rates: Sequence[float],
+    duration: float,
+    seed_data: bool = True,
+    seed_value: int = 0,
+    max_in_flight: int = 1000,
+) -> list[StageResult]:
+    """Run one stage per offered rate, in increasing order, to find the saturation point."""
+    if seed_data:
+        await seed(client)
+    return [
+        await run_stage(
+            client,
+            mix,
+            rate=rate,
+            duration=duration,
+            seed=seed_value + i,
+            max_in_flight=max_in_flight,
+        )
+        for i, rate in enumerate(sorted(rates))
+    ]
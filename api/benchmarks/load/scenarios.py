@@ -0,0 +1,90 @@
+"""Request mix replayed by the load harness."""
+
+from __future__ import annotations
+
+import random
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+SEED_DOCUMENT_ID = "bench-doc"
+
+_SEED_TEXT = (
+    "Koopovereenkomst tussen partij A en partij B betreffende het appartementsrecht aan de "
+    "Herengracht 1 te Amsterdam. De koopprijs bedraagt EUR 450.000, te voldoen bij de "
+    "notariële akte van levering op 1 maart. De koper aanvaardt de bestaande erfdienstbaarheden "
+    "en de splitsingsakte. Ontbindende voorwaarden: financiering en bouwkundige keuring."
+)
+
+_QUESTIONS = (
+    "What is the purchase price?",
+    "When is the transfer of ownership?",
+    "Which conditions allow the buyer to cancel?",
+    "Who are the parties to the agreement?",
+)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    path: str
+    weight: float
+    payload: Callable[[random.Random], dict[str, Any] | None]
+    # Streaming endpoints are read as SSE and report time to first token.
+    stream: bool = False
+
+
+def _document(rng: random.Random) -> dict[str, Any]:
+    return {"id": f"bench-{uuid.uuid4().hex[:16]}", "title": "Load test", "text": _SEED_TEXT}
+
+
+def _classify(rng: random.Random) -> dict[str, Any]:
+    return {"text": _SEED_TEXT}
+
+
+def _ask(rng: random.Random) -> dict[str, Any]:
+    return {"question": rng.choice(_QUESTIONS), "context": _SEED_TEXT}
+
+
+def _rag(rng: random.Random) -> dict[str, Any]:
+    return {"query": rng.choice(_QUESTIONS), "document_ids": [SEED_DOCUMENT_ID], "top_k": 3}
+
+
+def _agent(rng: random.Random) -> dict[str, Any]:
+    return {"message": f"What is 17 * {rng.randint(2, 99)}?"}
+
+
+DEFAULT_MIX: tuple[Scenario, ...] = (
+    Scenario("documents_create", "POST", "/documents", 1.0, _document),
+    Scenario("documents_get", "GET", f"/documents/{SEED_DOCUMENT_ID}", 2.0, lambda rng: None),
+    Scenario("classify", "POST", "/ai/classify", 3.0, _classify),
+    Scenario("ask", "POST", "/ai/ask", 2.0, _ask),
+    Scenario("ask_stream", "POST", "/ai/ask/stream", 2.0, _ask, stream=True),
+    Scenario("rag_query", "POST", "/ai/rag/query", 2.0, _rag),
+    Scenario("rag_query_stream", "POST", "/ai/rag/query/stream", 1.0, _rag, stream=True),
+    Scenario("agent_chat", "POST", "/ai/agents/chat", 1.0, _agent),
+)
+
+
+def select_mix(names: list[str] | None) -> tuple[Scenario, ...]:
+    """Subset of `DEFAULT_MIX` by name, in mix order; all scenarios when `names` is empty."""
+    if not names:
+        return DEFAULT_MIX
+    unknown = set(names) - {s.name for s in DEFAULT_MIX}
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return tuple(s for s in DEFAULT_MIX if s.name in names)
+
+
+def seed_requests() -> list[tuple[str, str, dict[str, Any]]]:
+    """Requests sent once before a run so the read and RAG scenarios have data."""
+    return [
+        (
+            "POST",
+            "/documents",
+            {"id": SEED_DOCUMENT_ID, "title": "Load test seed", "text": _SEED_TEXT},
+        ),
+        ("POST", "/ai/rag/index", {"document_id": SEED_DOCUMENT_ID}),
+    ]
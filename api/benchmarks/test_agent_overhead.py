@@ -0,0 +1,34 @@
+"""pytest-benchmark entry point for the agent overhead benchmark.
+
+    cd api
+    pytest benchmarks/test_agent_overhead.py --benchmark-only -p no:cacheprovider --no-cov
+
+Not collected by the regular suite; skipped when pytest-benchmark is not installed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from benchmarks.agent_overhead import run_sessions, scripted_agent
+
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.mark.parametrize("sessions", [1, 10, 100])
+def test_agent_sessions(benchmark, loop, sessions):
+    with scripted_agent(tool_steps=2):
+        loop.run_until_complete(run_sessions(1, 1))  # warm graph compilation
+        benchmark.extra_info["model_calls_per_session"] = 3
+        timings = benchmark(lambda: loop.run_until_complete(run_sessions(sessions, 1)))
+    assert len(timings) == sessions
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
 from app.agents import run_agent, run_agent_stream
 from app.agents.react_agent import agent_graph
@@ -426,8 +428,8 @@ async def test_run_agent_stream_yields_tokens_when_configured():
     """run_agent_stream yields tokens when LLM configured."""
 
     async def mock_astream(*args, stream_mode=None, **kwargs):
-        yield (AIMessage(content="The answer is "), {})
-        yield (AIMessage(content="4."), {})
+        yield ("messages", (AIMessage(content="The answer is "), {}))
+        yield ("messages", (AIMessage(content="4."), {}))
 
     mock_graph = AsyncMock()
     mock_graph.astream = mock_astream
@@ -451,7 +453,7 @@ async def test_run_agent_stream_yields_friendly_error_when_graph_stream_throws()
 
     async def mock_astream(*args, stream_mode=None, **kwargs):
         raise RuntimeError("boom")
-        yield ({"content": "unreachable"}, {})  # pragma: no cover
+        yield ("messages", ({"content": "unreachable"}, {}))  # pragma: no cover
 
     mock_graph = AsyncMock()
     mock_graph.astream = mock_astream
@@ -541,18 +543,50 @@ def test_agent_graph_returns_compiled_graph_when_configured():
             return_value=mock_model,
         ),
     ):
-        graph = agent_graph("t1", AsyncMock(return_value=None))
+        graph = agent_graph()
     assert graph is not None
     assert hasattr(graph, "ainvoke")
 
 
+def test_agent_graph_is_compiled_once_per_model():
+    """agent_graph reuses the compiled graph while the chat model is unchanged."""
+    mock_model = MagicMock()
+    mock_model.bind_tools.return_value = mock_model
+    other_model = MagicMock()
+    other_model.bind_tools.return_value = other_model
+
+    with patch("app.agents.react_agent.create_chat_model", return_value=mock_model):
+        first = agent_graph()
+        second = agent_graph()
+    with patch("app.agents.react_agent.create_chat_model", return_value=other_model):
+        third = agent_graph()
+
+    assert first is second
+    assert third is not first
+    mock_model.bind_tools.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_run_agent_passes_tenant_through_run_config():
+    """run_agent hands tenant and document fetcher to the shared graph via RunnableConfig."""
+    get_doc = AsyncMock(return_value=None)
+    mock_graph = AsyncMock()
+    mock_graph.ainvoke = AsyncMock(return_value={"messages": [AIMessage(content="ok")]})
+
+    with patch("app.agents.react_agent.agent_graph", return_value=mock_graph):
+        await run_agent(tenant_id="t9", message="Hello", get_document_fn=get_doc)
+
+    configurable = mock_graph.ainvoke.call_args.args[1]["configurable"]
+    assert configurable == {"tenant_id": "t9", "get_document_fn": get_doc, "question": "Hello"}
+
+
 @pytest.mark.asyncio
 async def test_run_agent_stream_yields_dict_content():
     """run_agent_stream yields content when message is dict with content key."""
 
     async def mock_astream(*args, stream_mode=None, **kwargs):
-        yield ({"content": "Hello "}, {})
-        yield ({"content": "world."}, {})
+        yield ("messages", ({"content": "Hello "}, {}))
+        yield ("messages", ({"content": "world."}, {}))
 
     mock_graph = AsyncMock()
     mock_graph.astream = mock_astream
@@ -623,8 +657,8 @@ async def test_run_agent_stream_logs_exception_when_calculator_fails_for_math_in
     """run_agent_stream logs exception when calculator fails during math intent translation."""
 
     async def mock_astream(*args, stream_mode=None, **kwargs):
-        yield ({"content": "Calculated "}, {})
-        yield ({"content": "result."}, {})
+        yield ("messages", ({"content": "Calculated "}, {}))
+        yield ("messages", ({"content": "result."}, {}))
 
     mock_graph = AsyncMock()
     mock_graph.astream = mock_astream
@@ -653,3 +687,47 @@ async def test_run_agent_stream_logs_exception_when_calculator_fails_for_math_in
         assert call_args[1]["intent"] == "sum"
         # Verify agent stream was called as fallback
         assert "".join(tokens) == "Calculated result."
+
+
+class _SlowAsyncChatModel:
+    """Chat model stand-in whose `ainvoke` waits like a network call; `invoke` must not run."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.threads: set[int] = set()
+
+    def bind_tools(self, tools):
+        return self
+
+    def invoke(self, *args, **kwargs):
+        raise AssertionError("agent node must not use the blocking invoke()")
+
+    async def ainvoke(self, messages, config=None):
+        import threading
+
+        self.threads.add(threading.get_ident())
+        await asyncio.sleep(self.delay)
+        return AIMessage(content="done")
+
+
+@pytest.mark.asyncio
+async def test_agent_model_node_runs_concurrent_sessions_as_coroutines():
+    """Concurrent agent runs overlap on the event loop instead of queueing on executor threads."""
+    import threading
+
+    from app.agents.react_agent import _create_agent_graph
+
+    model = _SlowAsyncChatModel(delay=0.2)
+    graph = _create_agent_graph(model, [])
+    sessions = 50
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(graph.ainvoke({"messages": [HumanMessage(content=f"q{i}")]}) for i in range(sessions))
+    )
+    elapsed = time.perf_counter() - started
+
+    assert all(r["messages"][-1].content == "done" for r in results)
+    # Serialised behind a thread pool this would take several multiples of the delay.
+    assert elapsed < 1.0
+    assert model.threads == {threading.get_ident()}
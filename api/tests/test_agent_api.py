@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -26,6 +27,28 @@ async def test_agent_chat_returns_200_with_answer(client, tenant_headers):
         assert "calculator_tool" in data["tools_used"]
 
 
+@pytest.mark.asyncio
+async def test_agent_chat_passes_conversation_id(client, tenant_headers):
+    """POST /ai/agents/chat forwards conversation_id and echoes it back."""
+    with patch("app.http.routers.agents.run_agent", new_callable=AsyncMock) as mock_run:
+        mock_run.return_value = {"answer": "Hi again.", "tools_used": []}
+        r = await client.post(
+            "/api/v1/ai/agents/chat",
+            headers=tenant_headers,
+            json={"message": "Hello", "conversation_id": "conv-1"},
+        )
+        assert r.status_code == 200
+        assert r.json()["conversation_id"] == "conv-1"
+        assert mock_run.call_args.kwargs["conversation_id"] == "conv-1"
+
+    r = await client.post(
+        "/api/v1/ai/agents/chat",
+        headers=tenant_headers,
+        json={"message": "Hello", "conversation_id": "bad id!"},
+    )
+    assert r.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_agent_chat_validates_payload(client, tenant_headers):
     """POST /ai/agents/chat returns 422 for empty message."""
@@ -72,6 +95,32 @@ async def test_agent_chat_stream_returns_sse(client, tenant_headers):
             assert "The answer." in body or "done" in body.lower()
 
 
+@pytest.mark.asyncio
+async def test_agent_chat_stream_events_returns_typed_events(client, tenant_headers):
+    """POST /ai/agents/chat/stream?events=true sends one SSE event per agent event."""
+    with patch("app.http.routers.agents.run_agent_events") as mock_events:
+
+        async def fake_events(*args, **kwargs):
+            yield {"type": "node_start", "node": "agent"}
+            yield {"type": "token", "content": "Hi."}
+            yield {"type": "done", "iterations": 1, "tokens_used": 12, "tools_used": []}
+
+        mock_events.return_value = fake_events()
+
+        async with client.stream(
+            "POST",
+            "/api/v1/ai/agents/chat/stream?events=true",
+            headers=tenant_headers,
+            json={"message": "Hi"},
+        ) as r:
+            assert r.status_code == 200
+            body = (await r.aread()).decode()
+
+    events = [json.loads(line[len("data: ") :]) for line in body.splitlines() if line]
+    assert [e["type"] for e in events] == ["node_start", "token", "done"]
+    assert events[-1]["tokens_used"] == 12
+
+
 @pytest.mark.asyncio
 async def test_agent_chat_returns_fallback_when_llm_not_configured(client, tenant_headers):
     """POST /ai/agents/chat returns 200 with fallback when LLM not configured."""
@@ -0,0 +1,30 @@
+"""Tests for the scripted-model agent benchmark (benchmarks/agent_overhead)."""
+
+from __future__ import annotations
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from benchmarks.agent_overhead import ScriptedChatModel, measure
+
+
+@pytest.mark.asyncio
+async def test_scripted_model_calls_tools_then_answers():
+    model = ScriptedChatModel(tool_steps=1)
+
+    first = await model.ainvoke([HumanMessage(content="go")])
+    assert first.tool_calls[0]["name"] == "calculator_tool"
+    assert first.usage_metadata["total_tokens"] == 60
+
+
+@pytest.mark.asyncio
+async def test_measure_reports_each_concurrency_level():
+    results = await measure([1, 3], runs=2, tool_steps=2)
+
+    assert [r["sessions"] for r in results] == [1, 3]
+    assert [r["runs"] for r in results] == [2, 6]
+    for r in results:
+        assert r["throughput_rps"] > 0
+        assert r["p95_ms"] >= r["p50_ms"] > 0
+        assert r["per_step_us"] > 0
+        assert r["kib_per_session"] > 0
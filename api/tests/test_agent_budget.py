@@ -0,0 +1,234 @@
+"""Tests for the agent's per-run step, token and wall-clock budgets."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+
+from app.agents import run_agent
+from app.agents.budget import AgentBudget, final_answer, message_tokens
+from app.agents.react_agent import _create_agent_graph, _summarize_search_results
+from app.core.config import get_settings
+from app.core.metrics import AGENT_EXECUTIONS, LLM_TOKENS_USED
+from app.llm.usage import record_usage
+
+
+@tool
+async def lookup_tool(query: str) -> str:
+    """Returns a canned fact."""
+    return f"fact about {query}"
+
+
+class _LoopingChatModel:
+    """Chat model that asks for another tool call on every turn and never answers."""
+
+    def __init__(self, delay: float = 0.0, usage: int | None = None) -> None:
+        self.delay = delay
+        self.usage = usage
+        self.calls = 0
+
+    def bind_tools(self, tools):
+        return self
+
+    async def ainvoke(self, messages, config=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        call = {"name": "lookup_tool", "args": {"query": f"q{self.calls}"}, "id": f"c{self.calls}"}
+        usage = None
+        if self.usage is not None:
+            usage = {"input_tokens": self.usage, "output_tokens": 0, "total_tokens": self.usage}
+        return AIMessage(content="", tool_calls=[call], usage_metadata=usage)
+
+
+def _settings(**update):
+    # Tenants outside the configured ones share the "other" metric label.
+    labels = {"metrics_tenant_labels": ["t-usage", "t-estimate", "t-summary"]}
+    return get_settings().model_copy(update={**labels, **update})
+
+
+def _inputs(text: str = "research this") -> dict:
+    return {"messages": [HumanMessage(content=text)]}
+
+
+def _tokens(tenant_id: str, flow: str, token_type: str) -> float:
+    return LLM_TOKENS_USED.labels(
+        tenant_id=tenant_id, flow=flow, token_type=token_type
+    )._value.get()
+
+
+def _executions(status: str) -> float:
+    return AGENT_EXECUTIONS.labels(tenant_id="t-budget", status=status)._value.get()
+
+
+@pytest.mark.asyncio
+async def test_iteration_budget_finalizes_with_gathered_results():
+    model = _LoopingChatModel()
+    graph = _create_agent_graph(model, [lookup_tool])
+
+    with patch("app.core.config.get_settings", return_value=_settings(agent_max_iterations=3)):
+        result = await graph.ainvoke(_inputs())
+
+    final = result["messages"][-1]
+    assert model.calls == 3
+    assert result["stop_reason"] == "max_iterations"
+    assert final.response_metadata["stop_reason"] == "max_iterations"
+    assert "fact about q1" in final.content and "fact about q3" in final.content
+
+
+@pytest.mark.asyncio
+async def test_token_budget_uses_reported_usage():
+    model = _LoopingChatModel(usage=400)
+    graph = _create_agent_graph(model, [lookup_tool])
+    settings = _settings(agent_max_iterations=10, agent_max_tokens=1000)
+
+    with patch("app.core.config.get_settings", return_value=settings):
+        result = await graph.ainvoke(_inputs())
+
+    assert model.calls == 3
+    assert result["stop_reason"] == "token_budget"
+
+
+@pytest.mark.asyncio
+async def test_model_calls_record_tenant_token_usage():
+    graph = _create_agent_graph(_LoopingChatModel(usage=400), [lookup_tool])
+    config = {"configurable": {"tenant_id": "t-usage"}}
+    before = _tokens("t-usage", "agent", "prompt")
+
+    with (
+        patch("app.core.config.get_settings", return_value=_settings(agent_max_iterations=2)),
+        patch("app.agents.budget.record_usage", wraps=record_usage) as recorded,
+    ):
+        await graph.ainvoke(_inputs(), config)
+
+    assert _tokens("t-usage", "agent", "prompt") == before + 800
+    assert all(c.args[0] == "t-usage" for c in recorded.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_model_calls_without_reported_usage_are_estimated():
+    graph = _create_agent_graph(_LoopingChatModel(), [lookup_tool])
+    config = {"configurable": {"tenant_id": "t-estimate"}}
+    before = _tokens("t-estimate", "agent", "prompt")
+
+    with patch("app.core.config.get_settings", return_value=_settings(agent_max_iterations=1)):
+        await graph.ainvoke(_inputs(), config)
+
+    assert _tokens("t-estimate", "agent", "prompt") > before
+
+
+@pytest.mark.asyncio
+async def test_search_summary_records_tenant_token_usage():
+    model = AsyncMock()
+    usage = {"input_tokens": 120, "output_tokens": 30, "total_tokens": 150}
+    model.ainvoke.return_value = AIMessage(content="It rained.", usage_metadata=usage)
+    before = _tokens("t-summary", "agent_search_summary", "completion")
+
+    with (
+        patch("app.core.config.get_settings", return_value=_settings()),
+        patch("app.agents.react_agent._get_model_without_tools", return_value=model),
+    ):
+        summary = await _summarize_search_results(
+            "weather?", search_content="rain", strict_english=False, tenant_id="t-summary"
+        )
+
+    assert summary == "It rained."
+    assert _tokens("t-summary", "agent_search_summary", "completion") == before + 30
+
+
+@pytest.mark.asyncio
+async def test_wall_clock_budget_cancels_slow_model_call():
+    model = _LoopingChatModel(delay=5.0)
+    graph = _create_agent_graph(model, [lookup_tool])
+    settings = _settings(agent_max_seconds=1.2)
+
+    with patch("app.core.config.get_settings", return_value=settings):
+        result = await asyncio.wait_for(graph.ainvoke(_inputs()), timeout=3.0)
+
+    assert result["stop_reason"] == "timeout"
+    assert "ran out of time" in result["messages"][-1].content
+
+
+@pytest.mark.asyncio
+async def test_run_agent_reports_budget_exhausted_and_records_metric():
+    model = _LoopingChatModel()
+    graph = _create_agent_graph(model, [lookup_tool])
+    before = _executions("budget_exhausted")
+
+    with (
+        patch("app.core.config.get_settings", return_value=_settings(agent_max_iterations=2)),
+        patch("app.agents.react_agent.agent_graph", return_value=graph),
+        patch("app.agents.react_agent._web_fallback_answer") as fallback,
+    ):
+        result = await run_agent("t-budget", "research this", AsyncMock())
+
+    assert result["error"] == "budget_exhausted"
+    assert result["tools_used"] == ["lookup_tool"]
+    assert "fact about q2" in result["answer"]
+    fallback.assert_not_called()
+    assert _executions("budget_exhausted") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_run_agent_records_success_metric():
+    graph = AsyncMock()
+    graph.ainvoke = AsyncMock(return_value={"messages": [AIMessage(content="All done.")]})
+    before = _executions("success")
+
+    with patch("app.agents.react_agent.agent_graph", return_value=graph):
+        result = await run_agent("t-budget", "Hello", AsyncMock())
+
+    assert "error" not in result
+    assert _executions("success") == before + 1
+    # Each run starts with fresh budget counters.
+    inputs = graph.ainvoke.call_args.args[0]
+    assert inputs["iterations"] == 0 and inputs["stop_reason"] is None
+
+
+def test_budget_stop_reasons_and_token_estimate():
+    budget = AgentBudget(max_iterations=2, max_tokens=0, max_seconds=60.0)
+    now = time.monotonic()
+    assert budget.stop_reason(iterations=1, tokens_used=10**6, started_at=now) is None
+    assert budget.stop_reason(iterations=2, tokens_used=0, started_at=now) == "max_iterations"
+    assert budget.stop_reason(iterations=0, tokens_used=0, started_at=now - 60) == "timeout"
+
+    prompt = [HumanMessage(content="x" * 40)]
+    assert message_tokens(prompt, AIMessage(content="y" * 8)) == 12
+
+
+def test_final_answer_skips_failed_tool_results():
+    messages = [
+        ToolMessage(content="good", name="a", tool_call_id="1"),
+        ToolMessage(content="Error: boom", name="b", tool_call_id="2", status="error"),
+    ]
+    answer = final_answer(messages, "max_iterations")
+    assert "- a: good" in answer.content
+    assert "boom" not in answer.content
+
+    empty = final_answer([], "timeout")
+    assert "ran out of time" in empty.content
+
+
+def test_final_answer_lead_names_the_exhausted_budget():
+    messages = [ToolMessage(content="good", name="a", tool_call_id="1")]
+    assert "step limit" in final_answer(messages, "max_iterations").content
+    tokens = final_answer(messages, "token_budget").content
+    assert "token budget" in tokens and "step limit" not in tokens
+    assert "- a: good" in tokens
+
+
+def test_final_answer_uses_only_the_current_turn():
+    messages = [
+        HumanMessage(content="first question"),
+        ToolMessage(content="old result", name="a", tool_call_id="1"),
+        AIMessage(content="first answer"),
+        HumanMessage(content="second question"),
+        ToolMessage(content="new result", name="b", tool_call_id="2"),
+    ]
+    answer = final_answer(messages, "max_iterations")
+    assert "- b: new result" in answer.content
+    assert "old result" not in answer.content
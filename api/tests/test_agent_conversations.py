@@ -0,0 +1,229 @@
+"""Tests for persistent agent conversations and bounded history."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.agents import run_agent, run_agent_stream
+from app.agents import conversations
+from app.agents.conversations import close_checkpointer, get_checkpointer, split_history
+from app.core.config import get_settings
+from app.core.metrics import LLM_TOKENS_USED
+
+
+class _RecordingChatModel:
+    """Answers every turn and records the prompts it was given."""
+
+    def __init__(self) -> None:
+        self.prompts: list[list] = []
+        self.summaries = 0
+
+    def bind_tools(self, tools):
+        return self
+
+    async def ainvoke(self, messages, config=None):
+        if "running summary" in str(messages[0].content):
+            self.summaries += 1
+            return AIMessage(content=f"summary #{self.summaries}")
+        self.prompts.append(list(messages))
+        return AIMessage(content=f"reply to {messages[-1].content}")
+
+
+@pytest.fixture(autouse=True)
+async def _reset_store():
+    await close_checkpointer()
+    yield
+    await close_checkpointer()
+
+
+def _settings(**update):
+    return get_settings().model_copy(
+        update={"agent_conversation_store": "memory", "metrics_tenant_labels": ["t1"], **update}
+    )
+
+
+def _patched(model, **settings):
+    return (
+        patch("app.core.config.get_settings", return_value=_settings(**settings)),
+        patch("app.agents.react_agent.create_chat_model", return_value=model),
+    )
+
+
+def test_thread_ids_do_not_collide_across_tenants():
+    assert conversations.thread_id("acme", "x:y") != conversations.thread_id("acme:x", "y")
+
+
+@pytest.mark.asyncio
+async def test_colliding_ids_do_not_share_history():
+    model = _RecordingChatModel()
+    settings_patch, model_patch = _patched(model)
+
+    with settings_patch, model_patch:
+        await run_agent("acme", "secret plan", AsyncMock(), conversation_id="x:y")
+        await run_agent("acme:x", "what did I say", AsyncMock(), conversation_id="y")
+
+    assert "secret plan" not in [m.content for m in model.prompts[1]]
+
+
+def test_split_history_keeps_latest_turns_whole():
+    messages = [
+        HumanMessage(content="a" * 400),
+        AIMessage(content="", tool_calls=[{"name": "t", "args": {}, "id": "1"}]),
+        ToolMessage(content="b" * 400, name="t", tool_call_id="1"),
+        AIMessage(content="c" * 40),
+        HumanMessage(content="d" * 40),
+        AIMessage(content="e" * 40),
+        HumanMessage(content="now"),
+    ]
+
+    older, recent = split_history(messages, max_tokens=50)
+    assert older == messages[:4]
+    assert recent == messages[4:]
+
+    older, recent = split_history(messages, max_tokens=10)
+    assert recent == messages[-1:]
+
+    assert split_history(messages, max_tokens=10_000) == ([], messages)
+
+
+@pytest.mark.asyncio
+async def test_conversation_resumes_from_checkpointer():
+    model = _RecordingChatModel()
+    settings_patch, model_patch = _patched(model)
+
+    with settings_patch, model_patch:
+        first = await run_agent("t1", "my name is Ada", AsyncMock(), conversation_id="c1")
+        second = await run_agent("t1", "what is my name", AsyncMock(), conversation_id="c1")
+        other_tenant = await run_agent("t2", "what is my name", AsyncMock(), conversation_id="c1")
+
+    assert first["answer"] == "reply to my name is Ada"
+    assert second["tools_used"] == []
+    seen = [m.content for m in model.prompts[1]]
+    assert "my name is Ada" in seen and "reply to my name is Ada" in seen
+    # Threads are keyed by tenant, so another tenant's "c1" starts empty.
+    assert "my name is Ada" not in [m.content for m in model.prompts[2]]
+    assert other_tenant["answer"] == "reply to what is my name"
+
+
+def _summary_tokens(tenant_id: str) -> float:
+    return LLM_TOKENS_USED.labels(
+        tenant_id=tenant_id, flow="agent_history_summary", token_type="prompt"
+    )._value.get()
+
+
+@pytest.mark.asyncio
+async def test_long_conversation_is_compacted_into_rolling_summary():
+    model = _RecordingChatModel()
+    settings_patch, model_patch = _patched(model, agent_history_max_tokens=60)
+    summary_tokens_before = _summary_tokens("t1")
+
+    with settings_patch, model_patch:
+        for i in range(12):
+            await run_agent("t1", f"question {i} " + "x" * 80, AsyncMock(), conversation_id="long")
+        graph_state = await _thread_state("t1", "long")
+
+    assert model.summaries >= 5
+    assert _summary_tokens("t1") > summary_tokens_before
+    assert graph_state.values["summary"] == f"summary #{model.summaries}"
+    assert len(graph_state.values["messages"]) <= 4
+    last_prompt = model.prompts[-1]
+    assert f"summary #{model.summaries}" in last_prompt[0].content
+    # Prompt size stays flat instead of growing with the number of turns.
+    assert len(last_prompt) == len(model.prompts[3])
+
+
+@pytest.mark.asyncio
+async def test_shortcut_answers_are_kept_in_the_conversation():
+    model = _RecordingChatModel()
+    settings_patch, model_patch = _patched(model)
+
+    with settings_patch, model_patch:
+        tokens = [
+            t
+            async for t in run_agent_stream(
+                "t1", "median of 1, 2, 9", AsyncMock(), conversation_id="c2"
+            )
+        ]
+        await run_agent("t1", "and why", AsyncMock(), conversation_id="c2")
+
+    assert tokens == ["The median is 2."]
+    assert "The median is 2." in [m.content for m in model.prompts[0]]
+
+
+@pytest.mark.asyncio
+async def test_without_conversation_id_runs_are_stateless():
+    model = _RecordingChatModel()
+    settings_patch, model_patch = _patched(model)
+
+    with settings_patch, model_patch:
+        await run_agent("t1", "first", AsyncMock())
+        await run_agent("t1", "second", AsyncMock())
+
+    assert [m.content for m in model.prompts[1][1:]] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_unavailable_store_falls_back_to_stateless():
+    settings = _settings(agent_conversation_store="database")
+    with (
+        patch("app.core.config.get_settings", return_value=settings),
+        patch.object(
+            conversations, "_open_database_store", AsyncMock(side_effect=ImportError("no pkg"))
+        ),
+    ):
+        assert await get_checkpointer() is None
+        assert await get_checkpointer() is None
+        conversations._open_database_store.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_store_is_retried_after_backoff():
+    saver = object()
+    settings = _settings(
+        agent_conversation_store="database", agent_conversation_store_retry_seconds=0.05
+    )
+    opener = AsyncMock(side_effect=[OSError("db down"), saver])
+    with (
+        patch("app.core.config.get_settings", return_value=settings),
+        patch.object(conversations, "_open_database_store", opener),
+    ):
+        assert await get_checkpointer() is None
+        assert await get_checkpointer() is None
+        assert opener.await_count == 1
+        await asyncio.sleep(0.06)
+        assert await get_checkpointer() is saver
+    assert opener.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_requests_open_the_store_once():
+    saver = object()
+
+    async def slow_open(stack, url):
+        await asyncio.sleep(0.02)
+        return saver
+
+    opener = AsyncMock(side_effect=slow_open)
+    with (
+        patch(
+            "app.core.config.get_settings",
+            return_value=_settings(agent_conversation_store="database"),
+        ),
+        patch.object(conversations, "_open_database_store", opener),
+    ):
+        results = await asyncio.gather(*(get_checkpointer() for _ in range(5)))
+
+    assert results == [saver] * 5
+    opener.assert_awaited_once()
+
+
+async def _thread_state(tenant_id: str, conversation_id: str):
+    from app.agents.react_agent import agent_graph
+
+    graph = agent_graph(await get_checkpointer())
+    config = {"configurable": {"thread_id": conversations.thread_id(tenant_id, conversation_id)}}
+    return await graph.aget_state(config)
@@ -0,0 +1,158 @@
+"""Tests for the agent's structured event stream."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from app.agents import run_agent_events, run_agent_stream
+from app.agents.react_agent import _create_agent_graph
+from app.core.deadline import remaining_seconds
+from app.core.metrics import AGENT_EXECUTIONS
+from app.http.sse import sse_event, stream_text_tokens
+
+
+@tool
+async def lookup_tool(query: str) -> str:
+    """Returns a canned fact."""
+    return f"fact about {query}"
+
+
+class _ToolThenAnswerModel:
+    """Calls `lookup_tool` once, then answers."""
+
+    def bind_tools(self, tools):
+        return self
+
+    async def ainvoke(self, messages, config=None):
+        if not any(getattr(m, "type", "") == "tool" for m in messages):
+            call = {"name": "lookup_tool", "args": {"query": "tides"}, "id": "call-1"}
+            usage = {"input_tokens": 40, "output_tokens": 5, "total_tokens": 45}
+            return AIMessage(content="", tool_calls=[call], usage_metadata=usage)
+        usage = {"input_tokens": 60, "output_tokens": 10, "total_tokens": 70}
+        return AIMessage(content="High tide is at noon.", usage_metadata=usage)
+
+
+class _StreamingModel(GenericFakeChatModel):
+    """Streams its answer word by word, like a real chat model."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+async def _events(message: str) -> list[dict]:
+    return [e async for e in run_agent_events("t1", message, AsyncMock())]
+
+
+@pytest.mark.asyncio
+async def test_events_trace_nodes_tools_tokens_and_summary():
+    graph = _create_agent_graph(_ToolThenAnswerModel(), [lookup_tool])
+
+    with patch("app.agents.react_agent.agent_graph", return_value=graph):
+        events = await _events("When is high tide?")
+
+    types = [e["type"] for e in events]
+    nodes = [e["node"] for e in events if e["type"] == "node_start"]
+    assert nodes == ["compact", "agent", "tools", "agent"]
+    assert types.count("node_end") == 4
+    assert all(e["duration_ms"] >= 0 for e in events if e["type"] == "node_end")
+
+    tool_start = next(e for e in events if e["type"] == "tool_start")
+    tool_end = next(e for e in events if e["type"] == "tool_end")
+    assert tool_start == {
+        "type": "tool_start",
+        "tool": "lookup_tool",
+        "call_id": "call-1",
+        "args": {"query": "tides"},
+    }
+    assert tool_end["status"] == "success"
+    assert types.index("tool_start") < types.index("tool_end")
+
+    assert "".join(e["content"] for e in events if e["type"] == "token") == (
+        "High tide is at noon."
+    )
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["iterations"] == 2
+    assert done["tokens_used"] == 115
+    assert done["tools_used"] == ["lookup_tool"]
+    assert "error" not in done
+
+
+@pytest.mark.asyncio
+async def test_shortcut_answers_end_with_done_event():
+    events = await _events("median of 1, 2, 9")
+
+    assert events[0] == {"type": "token", "content": "The median is 2."}
+    assert events[-1]["type"] == "done"
+    assert events[-1]["iterations"] == 0
+
+
+@pytest.mark.asyncio
+async def test_graph_failure_reports_error_in_done_event():
+    async def failing_astream(*args, **kwargs):
+        raise RuntimeError("boom")
+        yield  # pragma: no cover
+
+    graph = AsyncMock()
+    graph.astream = failing_astream
+    with patch("app.agents.react_agent.agent_graph", return_value=graph):
+        events = await _events("Hi")
+
+    assert events[0]["type"] == "token"
+    assert events[-1]["error"] == "agent_failed"
+
+
+@pytest.mark.asyncio
+async def test_closed_event_stream_counts_as_cancelled_run():
+    async def endless_astream(*args, **kwargs):
+        while True:
+            yield "messages", (AIMessage(content="tick"), {"langgraph_node": "agent"})
+
+    def executions(status: str) -> float:
+        return AGENT_EXECUTIONS.labels(tenant_id="t-cancel", status=status)._value.get()
+
+    graph = AsyncMock()
+    graph.astream = endless_astream
+    success, cancelled = executions("success"), executions("cancelled")
+    with patch("app.agents.react_agent.agent_graph", return_value=graph):
+        events = run_agent_events("t-cancel", "Hi", AsyncMock())
+        assert (await events.__anext__())["type"] == "token"
+        await events.aclose()
+
+    assert executions("cancelled") == cancelled + 1
+    assert executions("success") == success
+
+
+@pytest.mark.asyncio
+async def test_event_stream_runs_under_agent_flow_deadline():
+    seen = []
+
+    async def astream(*args, **kwargs):
+        seen.append(remaining_seconds())
+        yield "messages", (AIMessage(content="ok"), {"langgraph_node": "agent"})
+
+    graph = AsyncMock()
+    graph.astream = astream
+    with patch("app.agents.react_agent.agent_graph", return_value=graph):
+        await _events("Hi")
+
+    assert seen[0] is not None and 0 < seen[0] <= 90.0
+    assert remaining_seconds() is None
+
+
+@pytest.mark.asyncio
+async def test_agent_token_stream_is_coalesced_into_one_event():
+    answer = "High tide is at noon today."
+    model = _StreamingModel(messages=iter([AIMessage(content=answer)]))
+    graph = _create_agent_graph(model, [lookup_tool])
+
+    with patch("app.agents.react_agent.agent_graph", return_value=graph):
+        stream = run_agent_stream("t1", "When is high tide?", AsyncMock())
+        events = [e async for e in stream_text_tokens(stream, coalesce=True)]
+
+    assert events == [sse_event({"token": answer}), sse_event({"done": True})]
@@ -0,0 +1,162 @@
+"""Tests for the agent's deterministic intent router."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents import run_agent, run_agent_stream
+from app.agents.intents import (
+    IntentAnswer,
+    IntentContext,
+    IntentMatch,
+    IntentRoute,
+    IntentRouter,
+    intent_router,
+)
+from app.core.config import get_settings
+from app.core.metrics import AGENT_INTENT_ROUTES
+from app.llm.errors import LLMError
+
+
+def _ctx(get_document_fn=None) -> IntentContext:
+    return IntentContext("t1", get_document_fn or AsyncMock(return_value=None))
+
+
+def _settings(**update):
+    return get_settings().model_copy(update=update)
+
+
+def _count(intent: str, outcome: str) -> float:
+    return AGENT_INTENT_ROUTES.labels(intent=intent, outcome=outcome)._value.get()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("message", "intent", "answer"),
+    [
+        ("median of 3, 1, 7, 9", "statistics", "The median is 5."),
+        ("What's the max of 4 and 11?", "statistics", "The maximum is 11."),
+        ("lowest of -2 5 8", "statistics", "The minimum is -2."),
+        ("standard deviation of 2, 4, 4, 4, 5, 5, 7, 9", "statistics", "2.13809"),
+        ("15% of 200", "percentage", "15% of 200 is 30."),
+        ("What percent is 30 of 120?", "percentage", "30 is 25% of 120."),
+        ("percentage change from 80 to 60", "percentage", "is -25%."),
+        ("convert 5 km to miles", "unit_conversion", "5 km is 3.106856 mi."),
+        ("how many feet in 3 miles", "unit_conversion", "3 mi is 15840 ft."),
+        ("100 F in celsius", "unit_conversion", "100 °F is 37.777778 °C."),
+    ],
+)
+async def test_arithmetic_routes_answer_locally(message, intent, answer):
+    result = await intent_router.route(message, _ctx())
+
+    assert result is not None
+    assert result.intent == intent
+    assert answer in result.answer
+    assert result.tools_used == ["calculator_tool"]
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "tell me about python",
+        "what is the minimum wage in the netherlands",
+        "I walked 5 km in the morning",
+        "convert 5 km to kg",
+        "show document contracts",
+    ],
+)
+def test_non_matching_messages_are_not_routed(message):
+    assert intent_router.select(message) is None
+
+
+def test_partial_match_is_below_default_threshold_but_configurable():
+    message = "before lunch, what is 15% of 200 for the tip"
+    before = _count("percentage", "below_threshold")
+
+    assert intent_router.select(message) is None
+    assert _count("percentage", "below_threshold") == before + 1
+
+    with patch(
+        "app.core.config.get_settings",
+        return_value=_settings(agent_intent_thresholds={"percentage": 0.5}),
+    ):
+        selected = intent_router.select(message)
+    assert selected is not None and selected[0].name == "percentage"
+
+
+@pytest.mark.asyncio
+async def test_document_fetch_uses_tenant_fetcher_and_keeps_id_case():
+    get_doc = AsyncMock(return_value={"title": "Deed", "text": "Body"})
+
+    result = await intent_router.route("Show document Bench-Doc-7", _ctx(get_doc))
+
+    assert result.intent == "document_fetch"
+    assert "Title: Deed" in result.answer
+    get_doc.assert_awaited_once_with("Bench-Doc-7", "t1")
+
+
+@pytest.mark.asyncio
+async def test_document_summary_goes_straight_to_notary_prompt():
+    get_doc = AsyncMock(return_value={"title": "Akte", "text": "Koopakte tussen A en B."})
+    llm = MagicMock()
+    llm.generate_notary_summary = AsyncMock(return_value=MagicMock(raw_text="Samenvatting."))
+
+    with patch("app.services_llm.llm_client", llm):
+        result = await intent_router.route("vat document akte-12 samen", _ctx(get_doc))
+
+    assert result.answer == "Samenvatting."
+    assert result.tools_used == ["document_lookup_tool", "notary_summarize"]
+    prompt = llm.generate_notary_summary.await_args.args[0]
+    assert "LANGUAGE: NL" in prompt and "Koopakte tussen A en B." in prompt
+
+
+@pytest.mark.asyncio
+async def test_document_summary_declines_when_llm_fails():
+    get_doc = AsyncMock(return_value={"title": "Deed", "text": "Body"})
+    llm = MagicMock()
+    llm.generate_notary_summary = AsyncMock(side_effect=LLMError("down"))
+    before = _count("document_summary", "declined")
+
+    with patch("app.services_llm.llm_client", llm):
+        result = await intent_router.route("summarize document doc-1", _ctx(get_doc))
+
+    assert result is None
+    assert _count("document_summary", "declined") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_custom_route_failure_falls_through():
+    async def boom(match: IntentMatch, ctx: IntentContext) -> IntentAnswer:
+        raise RuntimeError("handler bug")
+
+    router = IntentRouter([])
+    router.register(IntentRoute("greeting", lambda t: IntentMatch("greeting", 1.0), boom))
+    before = _count("greeting", "failed")
+
+    assert await router.route("hi", _ctx()) is None
+    assert _count("greeting", "failed") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_routing_can_be_disabled():
+    with patch(
+        "app.core.config.get_settings",
+        return_value=_settings(agent_intent_routing_enabled=False),
+    ):
+        assert await intent_router.route("median of 1, 2, 3", _ctx()) is None
+
+
+@pytest.mark.asyncio
+async def test_run_agent_answers_routed_intents_without_the_graph():
+    before = _count("statistics", "hit")
+
+    with patch("app.agents.react_agent.agent_graph") as graph:
+        result = await run_agent("t1", "median of 1, 2, 3, 10", AsyncMock())
+        tokens = [t async for t in run_agent_stream("t1", "max of 1, 2, 3", AsyncMock())]
+
+    graph.assert_not_called()
+    assert result == {"answer": "The median is 2.5.", "tools_used": ["calculator_tool"]}
+    assert tokens == ["The maximum is 3."]
+    assert _count("statistics", "hit") == before + 2
@@ -0,0 +1,182 @@
+"""Tests for the agent's speculative web fallback."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.agents import run_agent, speculation
+from app.agents.speculation import SpeculativeSearch, first_success, may_need_web
+from app.core.config import get_settings
+from app.core.metrics import AGENT_SPECULATION, AGENT_SPECULATION_SECONDS
+
+
+QUESTION = "What is the latest news about the Dutch notary reform?"
+
+
+@pytest.fixture(autouse=True)
+def _reset_budget():
+    speculation._budget = None
+    yield
+    speculation._budget = None
+
+
+def _settings(**update):
+    update = {
+        "agent_speculative_fallback_enabled": True,
+        "agent_speculative_budget_percent": 100.0,
+        **update,
+    }
+    return get_settings().model_copy(update=update)
+
+
+def _count(kind: str, outcome: str) -> float:
+    return AGENT_SPECULATION.labels(kind=kind, outcome=outcome)._value.get()
+
+
+def _seconds(kind: str, outcome: str) -> float:
+    return AGENT_SPECULATION_SECONDS.labels(kind=kind, outcome=outcome)._value.get()
+
+
+def _graph(answer: str) -> AsyncMock:
+    async def ainvoke(inputs, config=None):
+        await asyncio.sleep(0.02)
+        return {"messages": [AIMessage(content=answer)]}
+
+    graph = AsyncMock()
+    graph.ainvoke = ainvoke
+    return graph
+
+
+def test_may_need_web():
+    assert may_need_web(QUESTION)
+    assert may_need_web("Who is the CEO of ASML?")
+    assert not may_need_web("What is 2 + 2?")
+    assert not may_need_web("What is the latest version of document doc-42?")
+
+
+@pytest.mark.asyncio
+async def test_disabled_or_unlikely_questions_do_not_speculate():
+    with patch("app.agents.speculation.asearch_web", AsyncMock()) as search:
+        assert SpeculativeSearch.maybe_start(QUESTION, "q") is None
+        with patch("app.core.config.get_settings", return_value=_settings()):
+            assert SpeculativeSearch.maybe_start("Explain recursion", "q") is None
+    search.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_budget_caps_speculation():
+    before = _count("search", "budget_exhausted")
+    settings = _settings(agent_speculative_budget_percent=50)
+    with (
+        patch("app.core.config.get_settings", return_value=settings),
+        patch("app.agents.speculation.asearch_web", AsyncMock(return_value="r")),
+    ):
+        # One run in the window: 50% of one run is less than one speculation.
+        assert SpeculativeSearch.maybe_start(QUESTION, "q") is None
+        started = SpeculativeSearch.maybe_start(QUESTION, "q")
+        assert started is not None
+        started.discard()
+
+    assert _count("search", "budget_exhausted") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_failed_graph_uses_search_started_alongside_it():
+    async def search(query):
+        await asyncio.sleep(0.01)
+        return "Reform passed in parliament."
+
+    used, saved = _count("search", "used"), _seconds("search", "saved")
+    with (
+        patch("app.core.config.get_settings", return_value=_settings()),
+        patch("app.agents.react_agent.agent_graph", return_value=_graph("")),
+        patch("app.agents.speculation.asearch_web", side_effect=search) as spec_search,
+        patch("app.agents.react_agent.asearch_web", AsyncMock()) as late_search,
+        patch(
+            "app.agents.react_agent._summarize_search_results",
+            AsyncMock(return_value="The reform passed."),
+        ),
+    ):
+        result = await run_agent("t-spec", QUESTION, AsyncMock())
+
+    assert result["answer"] == "The reform passed."
+    assert result["tools_used"] == ["search_tool"]
+    spec_search.assert_awaited_once()
+    late_search.assert_not_called()
+    assert _count("search", "used") == used + 1
+    assert _seconds("search", "saved") > saved
+
+
+@pytest.mark.asyncio
+async def test_answered_graph_cancels_speculative_search():
+    cancelled = asyncio.Event()
+
+    async def search(query):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    wasted = _count("search", "wasted")
+    with (
+        patch("app.core.config.get_settings", return_value=_settings()),
+        patch("app.agents.react_agent.agent_graph", return_value=_graph("It passed.")),
+        patch("app.agents.speculation.asearch_web", side_effect=search),
+    ):
+        result = await run_agent("t-spec", QUESTION, AsyncMock())
+        await asyncio.sleep(0)
+
+    assert result["answer"] == "It passed."
+    assert cancelled.is_set()
+    assert _count("search", "wasted") == wasted + 1
+
+
+@pytest.mark.asyncio
+async def test_first_success_returns_fastest_usable_answer_and_cancels_the_other():
+    primary_cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            primary_cancelled.set()
+            raise
+        return "slow"
+
+    async def fast():
+        return "fast"
+
+    wasted = _count("summarize", "wasted")
+    with patch("app.core.config.get_settings", return_value=_settings()):
+        speculation.speculation_budget().record_request()
+        assert await first_success(slow, fast) == "fast"
+
+    assert primary_cancelled.is_set()
+    assert _count("summarize", "wasted") == wasted + 1
+
+
+@pytest.mark.asyncio
+async def test_first_success_skips_failed_results():
+    async def failing():
+        raise RuntimeError("model down")
+
+    async def empty():
+        return None
+
+    async def answer():
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    with patch("app.core.config.get_settings", return_value=_settings()):
+        budget = speculation.speculation_budget()
+        budget.record_request()
+        budget.record_request()
+        saved = _seconds("summarize", "saved")
+        assert await first_success(failing, answer) == "answer"
+        assert _seconds("summarize", "saved") > saved
+        assert await first_success(empty, empty) is None
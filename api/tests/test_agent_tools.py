@@ -2,10 +2,24 @@
 
 from __future__ import annotations
 
+from unittest.mock import AsyncMock
+
 import pytest
 
 from app.agents.tools import calculator_tool, search_tool
-from app.agents.tools.document_lookup import create_document_lookup_tool
+from app.agents.tools.document_lookup import (
+    create_document_lookup_tool,
+    document_lookup_config,
+    document_lookup_tool,
+)
+from app.agents.tools.search import asearch_web, clear_search_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_search_cache():
+    clear_search_cache()
+    yield
+    clear_search_cache()
 
 
 def test_calculator_tool_simple_arithmetic():
@@ -115,6 +129,8 @@ def test_search_tool_uses_tavily_when_configured():
     ):
         mock_settings.return_value.search_provider = "tavily"
         mock_settings.return_value.tavily_api_key = "tvly-test-key"
+        mock_settings.return_value.search_cache_ttl_seconds = 300
+        mock_settings.return_value.search_cache_max_entries = 16
         mock_tool = mock_tavily_class.return_value
         mock_tool.invoke.return_value = mock_tavily_result
 
@@ -165,3 +181,178 @@ async def test_document_lookup_tool_error_on_fetch():
     result = await tool.ainvoke({"document_id": "doc1"})
     assert "Error" in result
     assert "Database connection failed" in result
+
+
+@pytest.mark.asyncio
+async def test_shared_document_lookup_tool_reads_tenant_from_config():
+    """The shared tool resolves tenant and fetcher from the run config, not a closure."""
+    get_doc = AsyncMock(return_value={"title": "Deed", "text": "Body"})
+    config = {"configurable": document_lookup_config("t2", get_doc)}
+
+    result = await document_lookup_tool.ainvoke({"document_id": "doc1"}, config)
+
+    assert "Deed" in result
+    get_doc.assert_awaited_once_with("doc1", "t2")
+    assert "config" not in document_lookup_tool.args
+
+
+@pytest.mark.asyncio
+async def test_shared_document_lookup_tool_without_tenant_config():
+    """Without a tenant in the config the tool reports that lookup is unavailable."""
+    result = await document_lookup_tool.ainvoke({"document_id": "doc1"})
+    assert "not available" in result
+
+
+def _long_document() -> dict:
+    filler = "This clause contains standard boilerplate wording. " * 40
+    text = (
+        "# Deed of transfer\n"
+        + filler
+        + "\nArtikel 3 Koopprijs\nThe purchase price is 350000 euro.\n"
+        + filler * 20
+    )
+    return {"title": "Deed", "text": text}
+
+
+@pytest.mark.asyncio
+async def test_document_lookup_returns_outline_and_relevant_passages_within_budget():
+    """Passage mode returns the outline and matching passages, capped by the char budget."""
+    doc = _long_document()
+    get_doc = AsyncMock(return_value=doc)
+    config = {"configurable": document_lookup_config("t1", get_doc, question="purchase price?")}
+
+    result = await document_lookup_tool.ainvoke({"document_id": "d1"}, config)
+
+    assert len(doc["text"]) > 40_000
+    assert len(result) <= 3000
+    assert "- Deed of transfer" in result and "- Artikel 3 Koopprijs" in result
+    assert "The purchase price is 350000 euro." in result
+    assert "keyword search" in result
+
+
+@pytest.mark.asyncio
+async def test_document_lookup_prefers_rag_index_and_model_query():
+    """Indexed passages are used when available; the model's query beats the user message."""
+    search = AsyncMock(return_value=[{"chunk_index": 7, "text": "Indexed passage."}])
+    config = {
+        "configurable": document_lookup_config(
+            "t1",
+            AsyncMock(return_value=_long_document()),
+            search_passages_fn=search,
+            question="user message",
+        )
+    }
+
+    result = await document_lookup_tool.ainvoke(
+        {"document_id": "d1", "query": "purchase price"}, config
+    )
+
+    assert "[7] Indexed passage." in result and "index search" in result
+    search.assert_awaited_once_with("d1", "t1", "purchase price", 3)
+
+
+@pytest.mark.asyncio
+async def test_document_lookup_full_mode_is_still_capped():
+    """Full mode returns the text but never beyond AGENT_DOCUMENT_LOOKUP_MAX_CHARS."""
+    from unittest.mock import patch
+
+    from app.agents.tools import lookup_document
+    from app.core.config import get_settings
+
+    settings = get_settings().model_copy(
+        update={"agent_document_lookup_mode": "full", "agent_document_lookup_max_chars": 500}
+    )
+    with patch("app.core.config.get_settings", return_value=settings):
+        result = await lookup_document("d1", "t1", AsyncMock(return_value=_long_document()))
+
+    assert result.startswith("Title: Deed\n\nContent:\n# Deed of transfer")
+    assert len(result) == 500
+
+
+class _CountingDDGS:
+    calls = 0
+
+    def text(self, query: str, region: str, max_results: int):
+        type(self).calls += 1
+        return [{"title": "Result", "body": "Body", "href": "https://example.com"}]
+
+
+@pytest.mark.asyncio
+async def test_asearch_web_caches_by_normalized_query():
+    """Repeated queries within the TTL are served from the cache."""
+    from unittest.mock import patch
+
+    _CountingDDGS.calls = 0
+    with patch("duckduckgo_search.DDGS", _CountingDDGS):
+        first = await asearch_web("Weather  Paris")
+        second = await asearch_web("weather paris")
+        await asearch_web("weather paris", max_results=3)
+
+    assert first == second
+    assert _CountingDDGS.calls == 2  # a different max_results is a different entry
+
+
+@pytest.mark.asyncio
+async def test_asearch_web_times_out_without_blocking_event_loop():
+    """A hung DuckDuckGo call is abandoned after the provider timeout; the loop stays free."""
+    import asyncio
+    import threading
+    from unittest.mock import patch
+
+    from app.agents.tools.search import SearchToolError
+    from app.core.config import get_settings
+
+    release = threading.Event()
+
+    class HangingDDGS:
+        def text(self, query: str, region: str, max_results: int):
+            release.wait(5)
+            return []
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    settings = get_settings().model_copy(update={"search_duckduckgo_timeout_seconds": 0.2})
+    ticking = asyncio.create_task(ticker())
+    try:
+        with (
+            patch("app.core.config.get_settings", return_value=settings),
+            patch("duckduckgo_search.DDGS", HangingDDGS),
+        ):
+            with pytest.raises(SearchToolError, match="timed out"):
+                await asearch_web("slow query")
+    finally:
+        release.set()
+        ticking.cancel()
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_asearch_web_reuses_async_tavily_client():
+    """Tavily goes through its async API and one client is reused across queries."""
+    from unittest.mock import patch
+
+    from app.core.config import get_settings
+
+    settings = get_settings().model_copy(
+        update={"search_provider": "tavily", "tavily_api_key": "tvly-test-key"}
+    )
+    with (
+        patch("app.core.config.get_settings", return_value=settings),
+        patch("langchain_tavily.TavilySearch") as mock_tavily_class,
+    ):
+        client = mock_tavily_class.return_value
+        client.ainvoke = AsyncMock(
+            return_value={"results": [{"title": "T", "content": "C", "url": "https://t"}]}
+        )
+        await asearch_web("first query")
+        await asearch_web("second query")
+
+    mock_tavily_class.assert_called_once_with(max_results=5, topic="general")
+    assert client.ainvoke.await_count == 2
+    client.invoke.assert_not_called()
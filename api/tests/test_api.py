@@ -364,6 +364,31 @@ async def test_request_id_propagates_from_header(client):
     assert r.headers.get("X-Request-ID") == req_id
 
 
+@pytest.mark.asyncio
+async def test_streaming_response_passes_through_middleware(app, client):
+    """Streamed bodies arrive intact, with request id, security headers and metrics."""
+    from fastapi.responses import StreamingResponse
+
+    from app.core.metrics import REQUEST_COUNT
+
+    @app.get("/_stream_probe")
+    async def probe():
+        async def body():
+            for i in range(100):
+                yield f"data: {i}\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    count = REQUEST_COUNT.labels(method="GET", path="/_stream_probe", status=200)
+    before = count._value.get()
+    r = await client.get("/_stream_probe", headers={"X-Request-ID": "stream-1"})
+
+    assert r.text.count("data: ") == 100
+    assert r.headers["X-Request-ID"] == "stream-1"
+    assert r.headers["X-Content-Type-Options"] == "nosniff"
+    assert count._value.get() == before + 1
+
+
 @pytest.mark.asyncio
 async def test_documents_create_rejects_text_over_max_length(client, tenant_headers):
     """Document text exceeding 500k chars returns 422."""
@@ -422,6 +447,15 @@ async def test_metrics_requires_api_key_when_configured(client_with_api_key):
     )
 
 
+@pytest.mark.asyncio
+async def test_api_key_rejection_runs_before_inner_middleware(client_with_api_key):
+    """The API key check is the outermost layer, so a 401 skips request id and headers."""
+    r = await client_with_api_key.get("/metrics")
+    assert r.status_code == 401
+    assert "X-Request-ID" not in r.headers
+    assert "X-Content-Type-Options" not in r.headers
+
+
 @pytest.mark.asyncio
 async def test_metrics_succeeds_with_valid_api_key(client_with_api_key):
     """When API_KEY is set, /metrics returns 200 with valid X-API-Key."""
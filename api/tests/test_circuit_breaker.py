@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import asyncio
 import time
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
 
 from app.circuit_breaker import (
     CircuitBreaker,
     CircuitBreakerConfig,
     CircuitState,
+    RedisCircuitBreaker,
+    SlidingWindowCircuitBreaker,
+    SlidingWindowConfig,
+    build_circuit_breaker,
 )
 
 
@@ -211,3 +217,261 @@ def test_circuit_state_to_metric_conversion():
     assert _circuit_state_to_metric(CircuitState.CLOSED) == 0
     assert _circuit_state_to_metric(CircuitState.HALF_OPEN) == 1
     assert _circuit_state_to_metric(CircuitState.OPEN) == 2
+
+
+def _redis_with_scripts(acquire=None, success=None, failure=None, release=None) -> MagicMock:
+    """Redis client whose registered Lua scripts return the given results."""
+    scripts = {
+        "acquire": acquire or AsyncMock(return_value=[1, "closed"]),
+        "success": success or AsyncMock(return_value="closed"),
+        "failure": failure or AsyncMock(return_value="closed"),
+        "release": release or AsyncMock(return_value="closed"),
+    }
+    client = MagicMock()
+    client.register_script.side_effect = [
+        scripts["acquire"],
+        scripts["success"],
+        scripts["failure"],
+        scripts["release"],
+    ]
+    return client
+
+
+def test_build_circuit_breaker_selects_backend():
+    assert type(build_circuit_breaker("a")) is CircuitBreaker
+    assert isinstance(build_circuit_breaker("b", backend="redis"), RedisCircuitBreaker)
+
+
+@pytest.mark.asyncio
+async def test_redis_breaker_uses_local_state_without_redis():
+    """Without REDIS_URL the shared breaker behaves like the local one."""
+    cb = RedisCircuitBreaker("test-local", CircuitBreakerConfig(failure_threshold=2))
+    with patch("app.core.redis.get_redis", AsyncMock(return_value=None)):
+        await cb.arecord_failure()
+        await cb.arecord_failure()
+        assert cb.state == CircuitState.OPEN
+        assert await cb.acan_execute() == (False, "Circuit test-local is OPEN")
+
+
+@pytest.mark.asyncio
+async def test_redis_breaker_follows_shared_open_state():
+    """A circuit opened by another replica blocks calls here without local failures."""
+    client = _redis_with_scripts(acquire=AsyncMock(return_value=[0, "open"]))
+    cb = RedisCircuitBreaker("test-shared")
+    with patch("app.core.redis.get_redis", AsyncMock(return_value=client)):
+        can_execute, reason = await cb.acan_execute()
+    assert can_execute is False
+    assert reason == "Circuit test-shared is OPEN"
+    assert cb.state == CircuitState.OPEN
+    assert cb.failure_count == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_breaker_reports_busy_probe_slot():
+    client = _redis_with_scripts(acquire=AsyncMock(return_value=[0, "half_open"]))
+    cb = RedisCircuitBreaker("test-probe")
+    with patch("app.core.redis.get_redis", AsyncMock(return_value=client)):
+        can_execute, reason = await cb.acan_execute()
+    assert can_execute is False
+    assert "probe in flight" in reason
+
+
+def _llm_client_with_breaker(breaker: CircuitBreaker):
+    from app.core.config import Settings
+    from app.services_llm import LLMClient
+
+    settings = Settings(llm_provider="ollama", llm_base_url="http://localhost:11434")
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+    client._circuit_breakers["ollama"] = breaker
+    return client
+
+
+@pytest.mark.asyncio
+async def test_redis_breaker_releases_probe_slot_of_cancelled_call():
+    release = AsyncMock(return_value="half_open")
+    client = _redis_with_scripts(acquire=AsyncMock(return_value=[1, "half_open"]), release=release)
+    cb = RedisCircuitBreaker("test-release")
+    llm = _llm_client_with_breaker(cb)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    with (
+        patch("app.core.redis.get_redis", AsyncMock(return_value=client)),
+        patch.object(llm._providers["ollama"], "complete", hang),
+    ):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(llm.complete("hello", tenant_id="t1"), timeout=0.05)
+
+    release.assert_awaited_once_with(keys=["cb:test-release"], args=[])
+
+
+@pytest.mark.asyncio
+async def test_recorded_calls_do_not_release_probe_slot():
+    from app.llm.types import LLMResult
+
+    cb = CircuitBreaker("test-no-release")
+    cb.arelease = AsyncMock()
+    llm = _llm_client_with_breaker(cb)
+    result = LLMResult(raw_text="hi", model="m", latency_ms=1.0)
+    with patch.object(llm._providers["ollama"], "complete", AsyncMock(return_value=result)):
+        await llm.complete("hello", tenant_id="t1")
+    cb.arelease.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_redis_breaker_passes_thresholds_to_scripts():
+    failure = AsyncMock(return_value="open")
+    client = _redis_with_scripts(failure=failure)
+    config = CircuitBreakerConfig(failure_threshold=3, recovery_timeout=10.0)
+    cb = RedisCircuitBreaker("test-args", config)
+    with patch("app.core.redis.get_redis", AsyncMock(return_value=client)):
+        await cb.arecord_failure()
+    kwargs = failure.await_args.kwargs
+    assert kwargs["keys"] == ["cb:test-args"]
+    assert kwargs["args"][1] == 3
+    assert cb.state == CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_redis_breaker_falls_back_to_local_state_when_redis_fails():
+    client = _redis_with_scripts(
+        acquire=AsyncMock(side_effect=ConnectionError("redis down")),
+        failure=AsyncMock(side_effect=ConnectionError("redis down")),
+    )
+    cb = RedisCircuitBreaker("test-fallback", CircuitBreakerConfig(failure_threshold=1))
+    with patch("app.core.redis.get_redis", AsyncMock(return_value=client)):
+        assert await cb.acan_execute() == (True, None)
+        await cb.arecord_failure()
+        assert cb.state == CircuitState.OPEN
+        assert cb.failure_count == 1
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _sliding(clock: FakeClock, **overrides) -> SlidingWindowCircuitBreaker:
+    values = {
+        "window_seconds": 60.0,
+        "minimum_calls": 4,
+        "failure_rate_threshold": 0.5,
+        "slow_call_threshold_seconds": 10.0,
+        "slow_call_rate_threshold": 0.5,
+        "recovery_timeout": 30.0,
+        "success_threshold": 2,
+        "half_open_max_calls": 1,
+    }
+    values.update(overrides)
+    return SlidingWindowCircuitBreaker("sliding", SlidingWindowConfig(**values), clock=clock)
+
+
+def test_sliding_breaker_opens_on_failure_rate_despite_interleaved_successes():
+    """Alternating success/failure never trips the consecutive policy but trips this one."""
+    cb = _sliding(FakeClock())
+    cb.record_success(1.0)
+    cb.record_failure(1.0)
+    cb.record_success(1.0)
+    assert cb.state == CircuitState.CLOSED  # below minimum_calls
+    cb.record_failure(1.0)
+    assert cb.state == CircuitState.OPEN
+    assert cb.can_execute() == (False, "Circuit sliding is OPEN")
+
+
+def test_sliding_breaker_opens_on_slow_call_rate():
+    cb = _sliding(FakeClock())
+    for duration in (11.0, 12.0, 1.0, 15.0):
+        cb.record_success(duration)
+    assert cb.state == CircuitState.OPEN
+
+
+def test_sliding_breaker_forgets_calls_outside_window():
+    clock = FakeClock()
+    cb = _sliding(clock)
+    cb.record_failure(1.0)
+    cb.record_failure(1.0)
+    clock.now = 61.0
+    cb.record_success(1.0)
+    cb.record_success(1.0)
+    cb.record_success(1.0)
+    cb.record_failure(1.0)
+    assert cb.state == CircuitState.CLOSED
+    assert cb.rates() == (0.25, 0.0, 4)
+
+
+def test_sliding_breaker_half_open_limits_concurrent_probes():
+    clock = FakeClock()
+    cb = _sliding(clock)
+    for _ in range(4):
+        cb.record_failure(1.0)
+    assert cb.state == CircuitState.OPEN
+
+    clock.now = 29.0
+    assert cb.can_execute()[0] is False
+    clock.now = 30.0
+    assert cb.can_execute() == (True, None)
+    assert cb.state == CircuitState.HALF_OPEN
+    allowed, reason = cb.can_execute()
+    assert allowed is False
+    assert "probe in flight" in reason
+
+    cb.record_success(1.0)
+    assert cb.can_execute() == (True, None)
+    cb.record_success(1.0)
+    assert cb.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_sliding_breaker_frees_probe_slot_of_cancelled_call():
+    clock = FakeClock()
+    cb = _sliding(clock)
+    for _ in range(4):
+        cb.record_failure(1.0)
+    clock.now = 30.0
+    llm = _llm_client_with_breaker(cb)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    with patch.object(llm._providers["ollama"], "complete", hang):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(llm.complete("hello", tenant_id="t1"), timeout=0.05)
+
+    assert cb.state == CircuitState.HALF_OPEN
+    assert cb.can_execute() == (True, None)
+
+
+def test_sliding_breaker_reopens_on_slow_probe():
+    clock = FakeClock()
+    cb = _sliding(clock)
+    for _ in range(4):
+        cb.record_failure(1.0)
+    clock.now = 30.0
+    assert cb.can_execute()[0] is True
+    cb.record_success(20.0)
+    assert cb.state == CircuitState.OPEN
+    clock.now = 59.0
+    assert cb.can_execute()[0] is False
+
+
+def test_llm_client_selects_breaker_policy_per_provider():
+    from app.core.config import Settings
+    from app.services_llm import LLMClient
+
+    settings = Settings(
+        llm_provider="ollama",
+        llm_base_url="http://localhost:11434",
+        circuit_breaker_policies={"ollama": "sliding_window"},
+        circuit_breaker_slow_call_seconds=45,
+    )
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+    ollama_cb = client._circuit_breakers["ollama"]
+    assert isinstance(ollama_cb, SlidingWindowCircuitBreaker)
+    assert ollama_cb.config.slow_call_threshold_seconds == 45
+    assert type(client._circuit_breakers["openai"]) is CircuitBreaker
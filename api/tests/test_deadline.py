@@ -0,0 +1,214 @@
+"""Tests for end-to-end request deadlines."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.core.config import Settings
+from app.core.deadline import (
+    deadline_expired,
+    deadline_scope,
+    get_deadline,
+    parse_deadline_header,
+    remaining_seconds,
+)
+from app.llm.providers import _post_with_retries
+from app.services_llm import LLMClient, LLMDeadlineExceededError
+
+
+def test_deadline_scope_only_tightens_and_restores():
+    assert get_deadline() is None
+    with deadline_scope(10):
+        outer = get_deadline()
+        with deadline_scope(60):
+            assert get_deadline() == outer
+        with deadline_scope(1):
+            assert get_deadline() < outer
+        assert get_deadline() == outer
+    assert get_deadline() is None
+    assert remaining_seconds() is None
+
+
+def test_deadline_scope_ignores_missing_budget():
+    with deadline_scope(None):
+        assert get_deadline() is None
+    with deadline_scope(0):
+        assert get_deadline() is None
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, None), ("", None), ("abc", None), ("-1", None), ("nan", None), ("2.5", 2.5)],
+)
+def test_parse_deadline_header(value, expected):
+    assert parse_deadline_header(value, max_seconds=300) == expected
+
+
+def test_parse_deadline_header_caps_to_max():
+    assert parse_deadline_header("9000", max_seconds=300) == 300
+
+
+@pytest.mark.asyncio
+async def test_middleware_applies_deadline_header(app, client):
+    seen: dict[str, float | None] = {}
+
+    @app.get("/_deadline_probe")
+    async def probe():
+        seen["remaining"] = remaining_seconds()
+        return {}
+
+    r = await client.get("/_deadline_probe", headers={"X-Request-Timeout": "5"})
+    assert r.status_code == 200
+    assert 0 < seen["remaining"] <= 5
+
+    await client.get("/_deadline_probe")
+    assert seen["remaining"] is None
+
+
+@pytest.mark.asyncio
+async def test_post_with_retries_clamps_timeout_to_remaining_budget():
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+            return_value=MagicMock(status_code=200)
+        )
+        with deadline_scope(2):
+            await _post_with_retries(
+                url="http://llm", json_payload={}, headers=None, timeout_seconds=60, max_retries=3
+            )
+    assert mock_client.call_args.kwargs["timeout"] <= 2
+
+
+@pytest.mark.asyncio
+async def test_post_with_retries_stops_when_backoff_would_exhaust_deadline():
+    post = AsyncMock(side_effect=httpx.ConnectError("refused"))
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = post
+        with deadline_scope(1.5):
+            with pytest.raises(httpx.ConnectError):
+                await _post_with_retries(
+                    url="http://llm",
+                    json_payload={},
+                    headers=None,
+                    timeout_seconds=60,
+                    max_retries=5,
+                )
+    # The first backoff is 1s, leaving under a second for a retry; no retry is attempted.
+    assert post.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_post_with_retries_raises_deadline_error_when_call_outlives_budget():
+    async def slow_post(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = slow_post
+        with deadline_scope(0.05):
+            with pytest.raises(LLMDeadlineExceededError):
+                await _post_with_retries(
+                    url="http://llm",
+                    json_payload={},
+                    headers=None,
+                    timeout_seconds=60,
+                    max_retries=2,
+                )
+            assert deadline_expired()
+
+
+@pytest.mark.asyncio
+async def test_timeout_of_deadline_clamped_attempt_is_a_deadline_error():
+    post = AsyncMock(side_effect=httpx.ReadTimeout("read timed out"))
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = post
+        with deadline_scope(5):
+            with pytest.raises(LLMDeadlineExceededError):
+                await _post_with_retries(
+                    url="http://llm",
+                    json_payload={},
+                    headers=None,
+                    timeout_seconds=60,
+                    max_retries=3,
+                )
+    assert post.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_of_configured_attempt_stays_a_provider_timeout():
+    post = AsyncMock(side_effect=httpx.ReadTimeout("read timed out"))
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = post
+        with pytest.raises(httpx.ReadTimeout):
+            await _post_with_retries(
+                url="http://llm", json_payload={}, headers=None, timeout_seconds=2, max_retries=1
+            )
+
+
+@pytest.mark.asyncio
+async def test_llm_client_clamped_timeout_does_not_trip_circuit_breaker():
+    settings = Settings(
+        llm_provider="ollama", llm_base_url="http://primary:11434", llm_timeout_seconds=60
+    )
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+
+    breaker = client._circuit_breakers[client._circuit_breaker_key()]
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+            side_effect=httpx.ReadTimeout("read timed out")
+        )
+        with deadline_scope(5):
+            with pytest.raises(LLMDeadlineExceededError):
+                await client.complete("hello", tenant_id="t1")
+    assert breaker.failure_count == 0
+
+
+@pytest.mark.asyncio
+async def test_llm_client_deadline_errors_do_not_trip_circuit_breaker():
+    settings = Settings(llm_provider="ollama", llm_base_url="http://primary:11434")
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+
+    breaker = client._circuit_breakers[client._circuit_breaker_key()]
+    with patch.object(
+        client._providers["ollama"],
+        "complete",
+        AsyncMock(side_effect=LLMDeadlineExceededError("out of time")),
+    ):
+        with pytest.raises(LLMDeadlineExceededError):
+            await client.complete("hello", tenant_id="t1")
+    assert breaker.failure_count == 0
+
+
+@pytest.mark.asyncio
+async def test_llm_client_fails_fast_when_deadline_already_expired():
+    settings = Settings(llm_provider="ollama", llm_base_url="http://primary:11434")
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+
+    provider_complete = AsyncMock()
+    with patch.object(client._providers["ollama"], "complete", provider_complete):
+        with deadline_scope(0.001):
+            await asyncio.sleep(0.01)
+            with pytest.raises(LLMDeadlineExceededError):
+                await client.complete("hello", tenant_id="t1")
+    provider_complete.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_run_agent_returns_deadline_exceeded_for_slow_graph():
+    from app.agents.react_agent import run_agent
+
+    async def slow_invoke(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    mock_graph = MagicMock()
+    mock_graph.ainvoke = slow_invoke
+    with patch("app.agents.react_agent.agent_graph", return_value=mock_graph):
+        with deadline_scope(0.05):
+            result = await run_agent("t1", "What is the weather?", AsyncMock())
+    assert result["error"] == "deadline_exceeded"
+    assert result["tools_used"] == []
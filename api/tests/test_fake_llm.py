@@ -0,0 +1,141 @@
+"""Tests for the fake Ollama / OpenAI-compatible model server."""
+
+from __future__ import annotations
+
+import orjson
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.devtools.fake_llm import FakeLLMConfig, create_app
+
+
+def _client(**overrides) -> AsyncClient:
+    config = FakeLLMConfig(ttft_ms=0, tokens_per_second=10_000, **overrides)
+    return AsyncClient(transport=ASGITransport(app=create_app(config)), base_url="http://fake")
+
+
+@pytest.mark.asyncio
+async def test_generate_is_deterministic_and_honours_num_predict():
+    async with _client() as client:
+        body = {"model": "m", "prompt": "hello", "stream": False, "options": {"num_predict": 5}}
+        first = (await client.post("/api/generate", json=body)).json()
+        second = (await client.post("/api/generate", json=body)).json()
+    assert first["response"] == second["response"]
+    assert first["eval_count"] == 5
+    assert first["done"] is True
+
+
+@pytest.mark.asyncio
+async def test_generate_streams_ndjson():
+    async with _client(max_tokens=3) as client:
+        r = await client.post("/api/generate", json={"model": "m", "prompt": "hi"})
+    lines = [orjson.loads(line) for line in r.text.splitlines()]
+    assert [line["done"] for line in lines] == [False, False, False, True]
+    assert lines[-1]["eval_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_returns_tool_call_then_text():
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": "search",
+                "parameters": {"type": "object", "properties": {"query": {"type": "string"}}},
+            },
+        }
+    ]
+    async with _client() as client:
+        r = await client.post(
+            "/v1/chat/completions",
+            json={
+                "model": "m",
+                "messages": [{"role": "user", "content": "weather"}],
+                "tools": tools,
+            },
+        )
+        call = r.json()["choices"][0]["message"]["tool_calls"][0]
+        assert call["function"]["name"] == "search"
+        assert orjson.loads(call["function"]["arguments"]) == {"query": "weather"}
+
+        messages = [
+            {"role": "user", "content": "weather"},
+            {"role": "assistant", "tool_calls": [call]},
+            {"role": "tool", "tool_call_id": call["id"], "content": "sunny"},
+        ]
+        r = await client.post(
+            "/v1/chat/completions", json={"model": "m", "messages": messages, "tools": tools}
+        )
+    assert r.json()["choices"][0]["message"]["content"]
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_streams_sse_until_done():
+    async with _client(max_tokens=4) as client:
+        r = await client.post(
+            "/v1/chat/completions",
+            json={"model": "m", "messages": [{"role": "user", "content": "hi"}], "stream": True},
+        )
+    frames = [line[6:] for line in r.text.splitlines() if line.startswith("data: ")]
+    assert frames[-1] == "[DONE]"
+    contents = [orjson.loads(f)["choices"][0]["delta"].get("content") for f in frames[:-1]]
+    assert len([c for c in contents if c]) == 4
+
+
+@pytest.mark.asyncio
+async def test_ollama_chat_returns_tool_call_then_text():
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": "search",
+                "parameters": {"type": "object", "properties": {"query": {"type": "string"}}},
+            },
+        }
+    ]
+    async with _client() as client:
+        messages = [{"role": "user", "content": "weather"}]
+        r = await client.post(
+            "/api/chat",
+            json={"model": "m", "messages": messages, "tools": tools, "stream": False},
+        )
+        message = r.json()["message"]
+        assert message["tool_calls"] == [
+            {"function": {"name": "search", "arguments": {"query": "weather"}}}
+        ]
+
+        messages += [message, {"role": "tool", "content": "sunny"}]
+        r = await client.post(
+            "/api/chat",
+            json={"model": "m", "messages": messages, "tools": tools, "stream": False},
+        )
+    assert r.json()["message"]["content"]
+    assert "tool_calls" not in r.json()["message"]
+
+
+@pytest.mark.asyncio
+async def test_ollama_chat_streams_ndjson():
+    async with _client(max_tokens=3) as client:
+        r = await client.post(
+            "/api/chat", json={"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+        )
+    lines = [orjson.loads(line) for line in r.text.splitlines()]
+    assert [line["done"] for line in lines] == [False, False, False, True]
+    assert all(line["message"]["content"] for line in lines[:-1])
+    assert lines[-1]["eval_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_embeddings_match_across_apis():
+    async with _client(embedding_dimension=8) as client:
+        ollama = (await client.post("/api/embed", json={"model": "m", "input": ["a"]})).json()
+        openai = (await client.post("/v1/embeddings", json={"model": "m", "input": "a"})).json()
+    assert ollama["embeddings"][0] == openai["data"][0]["embedding"]
+    assert len(ollama["embeddings"][0]) == 8
+
+
+@pytest.mark.asyncio
+async def test_error_rate_injects_failures():
+    async with _client(error_rate=1.0) as client:
+        r = await client.post("/api/generate", json={"model": "m", "prompt": "x", "stream": False})
+    assert r.status_code == 500
@@ -0,0 +1,193 @@
+"""Tests for LLM request hedging."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.config import Settings
+from app.llm.hedging import HedgeBudget, Hedger, LatencyTracker, run_hedged
+from app.services_llm import LLMClient, LLMResult
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window_size=100)
+    assert tracker.percentile(95) is None
+    for value in range(1, 101):
+        tracker.record(value / 100)
+    assert tracker.percentile(50) == 0.5
+    assert tracker.percentile(95) == 0.95
+    assert tracker.percentile(100) == 1.0
+
+
+def test_latency_tracker_keeps_only_recent_window():
+    tracker = LatencyTracker(window_size=3)
+    for value in (10.0, 1.0, 2.0, 3.0):
+        tracker.record(value)
+    assert len(tracker) == 3
+    assert tracker.percentile(100) == 3.0
+
+
+def test_hedge_budget_caps_ratio_and_expires_with_window():
+    clock = FakeClock()
+    budget = HedgeBudget(0.1, window_seconds=60.0, clock=clock)
+    for _ in range(9):
+        budget.record_request()
+    assert budget.try_acquire() is False
+
+    budget.record_request()
+    assert budget.try_acquire() is True
+    assert budget.try_acquire() is False
+
+    clock.now = 61.0
+    for _ in range(10):
+        budget.record_request()
+    assert budget.try_acquire() is True
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_returns_primary_without_hedging_when_fast():
+    secondary = AsyncMock(return_value="hedge")
+
+    async def primary():
+        return "primary"
+
+    outcome = await run_hedged(primary, secondary, delay=0.5, allow_hedge=lambda: True)
+    assert outcome.result == "primary"
+    assert outcome.hedged is False
+    secondary.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_fires_hedge_and_cancels_slow_primary():
+    primary_cancelled = asyncio.Event()
+
+    async def primary():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            primary_cancelled.set()
+            raise
+        return "primary"
+
+    async def secondary():
+        return "hedge"
+
+    outcome = await run_hedged(primary, secondary, delay=0.01, allow_hedge=lambda: True)
+    assert outcome.result == "hedge"
+    assert outcome.hedged is True
+    assert outcome.winner == "hedge"
+    assert primary_cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_waits_for_primary_when_budget_denies():
+    secondary = AsyncMock(return_value="hedge")
+
+    async def primary():
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    outcome = await run_hedged(primary, secondary, delay=0.01, allow_hedge=lambda: False)
+    assert outcome.result == "primary"
+    assert outcome.hedged is False
+    secondary.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_uses_other_call_when_first_fails():
+    async def primary():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("replica down")
+
+    async def secondary():
+        await asyncio.sleep(0.05)
+        return "hedge"
+
+    outcome = await run_hedged(primary, secondary, delay=0.01, allow_hedge=lambda: True)
+    assert outcome.result == "hedge"
+
+
+@pytest.mark.asyncio
+async def test_run_hedged_raises_primary_error_when_both_fail():
+    async def primary():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("primary failed")
+
+    async def secondary():
+        raise ValueError("hedge failed")
+
+    with pytest.raises(RuntimeError, match="primary failed"):
+        await run_hedged(primary, secondary, delay=0.01, allow_hedge=lambda: True)
+
+
+@pytest.mark.asyncio
+async def test_hedger_skips_hedging_until_min_samples():
+    hedger = Hedger("ollama", min_samples=3, budget_percent=100.0)
+    secondary = AsyncMock(return_value="hedge")
+
+    async def primary():
+        return "primary"
+
+    for _ in range(3):
+        assert hedger.hedge_delay() is None
+        assert await hedger.run(primary, secondary) == "primary"
+    assert hedger.hedge_delay() is not None
+    secondary.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_llm_client_complete_hedges_to_secondary_endpoint():
+    settings = Settings(
+        llm_provider="ollama",
+        llm_base_url="http://primary:11434",
+        llm_hedge_enabled=True,
+        llm_hedge_base_url="http://secondary:11434",
+        llm_hedge_min_samples=1,
+        llm_hedge_min_delay_ms=10,
+        llm_hedge_budget_percent=100,
+    )
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+
+    hedger = client._hedger("ollama")
+    hedger.latencies.record(0.01)
+
+    async def slow_primary(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    hedge_provider = client._hedge_provider("ollama")
+    assert hedge_provider._base_url() == "http://secondary:11434"
+    with (
+        patch.object(client._providers["ollama"], "complete", side_effect=slow_primary),
+        patch.object(
+            hedge_provider,
+            "complete",
+            AsyncMock(return_value=LLMResult(raw_text="invoice", model="m", latency_ms=1.0)),
+        ),
+    ):
+        result = await client.complete("Classify", tenant_id="t1", hedge=True)
+    assert result.raw_text == "invoice"
+
+
+@pytest.mark.asyncio
+async def test_llm_client_complete_ignores_hedge_when_disabled():
+    settings = Settings(llm_provider="ollama", llm_base_url="http://primary:11434")
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+
+    primary = AsyncMock(return_value=LLMResult(raw_text="ok", model="m", latency_ms=1.0))
+    with patch.object(client._providers["ollama"], "complete", primary):
+        await client.complete("Classify", tenant_id="t1", hedge=True)
+    primary.assert_awaited_once()
+    assert client._hedgers == {}
@@ -0,0 +1,204 @@
+"""Tests for the LiteLLM provider behind LLMClient."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.circuit_breaker import CircuitState, RedisCircuitBreaker, SlidingWindowCircuitBreaker
+from app.core.config import Settings
+from app.llm.errors import LLMDeadlineExceededError, LLMProviderError
+from app.llm.litellm_provider import LiteLLMProvider
+from app.services_litellm_gateway import litellm_gateway
+from app.services_llm import LLMClient
+
+
+def _response(text: str, model: str, prompt_tokens: int = 7, completion_tokens: int = 3) -> dict:
+    return {
+        "model": model,
+        "choices": [{"message": {"content": text}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+    }
+
+
+def _settings(**overrides) -> Settings:
+    values = {
+        "llm_provider": "litellm",
+        "llm_base_url": None,
+        "llm_litellm_models": ["ollama/llama3.2", "openai/gpt-4o-mini"],
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+@pytest.mark.asyncio
+async def test_complete_falls_back_to_next_model_and_captures_usage():
+    acompletion = AsyncMock(
+        side_effect=[RuntimeError("ollama down"), _response("hi", "gpt-4o-mini", 11, 2)]
+    )
+    provider = LiteLLMProvider(_settings())
+    with patch.object(litellm_gateway, "acompletion", acompletion):
+        result = await provider.complete("hello", flow="ask")
+
+    assert result.raw_text == "hi"
+    assert result.used_fallback is True
+    assert (result.prompt_tokens, result.completion_tokens) == (11, 2)
+    assert [c.kwargs["model"] for c in acompletion.call_args_list] == [
+        "ollama/llama3.2",
+        "openai/gpt-4o-mini",
+    ]
+    assert acompletion.call_args.kwargs["num_retries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_complete_raises_when_every_model_fails():
+    acompletion = AsyncMock(side_effect=RuntimeError("boom"))
+    provider = LiteLLMProvider(_settings())
+    with patch.object(litellm_gateway, "acompletion", acompletion):
+        with pytest.raises(LLMProviderError):
+            await provider.complete("hello")
+    assert acompletion.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_open_model_breaker_is_skipped():
+    provider = LiteLLMProvider(_settings())
+    for _ in range(5):
+        await provider._breaker("ollama/llama3.2").arecord_failure()
+    acompletion = AsyncMock(return_value=_response("ok", "gpt-4o-mini"))
+    with patch.object(litellm_gateway, "acompletion", acompletion):
+        await provider.complete("hello")
+    assert acompletion.call_args.kwargs["model"] == "openai/gpt-4o-mini"
+
+
+@pytest.mark.asyncio
+async def test_fallback_breaker_is_checked_only_when_its_model_is_tried():
+    provider = LiteLLMProvider(_settings())
+    fallback = provider._breaker("openai/gpt-4o-mini")
+    fallback.acan_execute = AsyncMock(return_value=(True, None))
+    acompletion = AsyncMock(return_value=_response("ok", "llama3.2"))
+    with patch.object(litellm_gateway, "acompletion", acompletion):
+        await provider.complete("hello")
+    fallback.acan_execute.assert_not_awaited()
+
+
+def test_model_breakers_follow_circuit_breaker_settings():
+    windowed = LiteLLMProvider(_settings(circuit_breaker_policies={"litellm": "sliding_window"}))
+    shared = LiteLLMProvider(_settings(circuit_breaker_backend="redis"))
+    assert isinstance(windowed._breaker("ollama/llama3.2"), SlidingWindowCircuitBreaker)
+    assert isinstance(shared._breaker("ollama/llama3.2"), RedisCircuitBreaker)
+
+
+@pytest.mark.asyncio
+async def test_deadline_exceeded_releases_model_breaker_slot():
+    provider = LiteLLMProvider(_settings())
+    breaker = provider._breaker("ollama/llama3.2")
+    breaker.arelease = AsyncMock()
+    acompletion = AsyncMock(side_effect=LLMDeadlineExceededError("no budget left"))
+    with patch.object(litellm_gateway, "acompletion", acompletion):
+        with pytest.raises(LLMDeadlineExceededError):
+            await provider.complete("hello")
+    breaker.arelease.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_frees_half_open_probe_slot():
+    provider = LiteLLMProvider(
+        _settings(
+            circuit_breaker_policies={"litellm": "sliding_window"},
+            circuit_breaker_half_open_max_calls=1,
+        )
+    )
+    breaker = provider._breaker("ollama/llama3.2")
+    breaker.state = CircuitState.HALF_OPEN
+
+    async def hang(**kwargs):
+        await asyncio.sleep(10)
+
+    with patch.object(litellm_gateway, "acompletion", hang):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(provider.complete("hello"), timeout=0.05)
+
+    assert breaker.can_execute()[0] is True
+
+
+@pytest.mark.asyncio
+async def test_failed_model_does_not_release_its_slot():
+    provider = LiteLLMProvider(_settings())
+    breaker = provider._breaker("ollama/llama3.2")
+    breaker.arelease = AsyncMock()
+    acompletion = AsyncMock(
+        side_effect=[RuntimeError("ollama down"), _response("hi", "gpt-4o-mini")]
+    )
+    with patch.object(litellm_gateway, "acompletion", acompletion):
+        await provider.complete("hello")
+    breaker.arelease.assert_not_awaited()
+
+
+def test_cost_routing_orders_cheapest_first():
+    provider = LiteLLMProvider(
+        _settings(
+            llm_litellm_routing="cost",
+            llm_litellm_model_costs={"ollama/llama3.2": 1e-6, "openai/gpt-4o-mini": 0.0},
+        )
+    )
+    assert provider.models() == ["openai/gpt-4o-mini", "ollama/llama3.2"]
+
+
+def test_latency_routing_orders_fastest_first():
+    provider = LiteLLMProvider(_settings(llm_litellm_routing="latency"))
+    provider._record_latency("ollama/llama3.2", 2.0)
+    provider._record_latency("openai/gpt-4o-mini", 0.5)
+    assert provider.models() == ["openai/gpt-4o-mini", "ollama/llama3.2"]
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_before_first_token():
+    async def chunks():
+        for piece in ("Hel", "lo"):
+            yield {"choices": [{"delta": {"content": piece}}]}
+
+    acompletion = AsyncMock(side_effect=[RuntimeError("refused"), chunks()])
+    provider = LiteLLMProvider(_settings())
+    with patch.object(litellm_gateway, "acompletion", acompletion):
+        tokens = [t async for t in provider.stream_complete("hello")]
+
+    assert tokens == ["Hel", "lo"]
+    assert acompletion.call_args.kwargs["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_closing_stream_closes_upstream_litellm_stream():
+    closed = []
+
+    async def chunks():
+        try:
+            for piece in ("Hel", "lo", " there"):
+                yield {"choices": [{"delta": {"content": piece}}]}
+        finally:
+            closed.append(True)
+
+    acompletion = AsyncMock(return_value=chunks())
+    provider = LiteLLMProvider(_settings())
+    with patch.object(litellm_gateway, "acompletion", acompletion):
+        stream = provider.stream_complete("hello")
+        assert await stream.__anext__() == "Hel"
+        await stream.aclose()
+
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_llm_client_routes_to_litellm_provider():
+    settings = _settings(llm_litellm_models=[], llm_model="ollama/llama3.2")
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+
+    assert client.is_configured()
+    acompletion = AsyncMock(return_value=_response("positive", "llama3.2"))
+    with patch.object(litellm_gateway, "acompletion", acompletion):
+        result = await client.complete("classify", tenant_id="t1")
+    assert result.raw_text == "positive"
+    assert acompletion.call_args.kwargs["model"] == "ollama/llama3.2"
@@ -0,0 +1,59 @@
+"""Tests for the load-test harness (benchmarks/load)."""
+
+from __future__ import annotations
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.load.report import build_report, percentile, saturation_point, to_markdown
+from benchmarks.load.runner import Sample, StageResult, run
+from benchmarks.load.scenarios import select_mix
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) is None
+
+
+def test_saturation_point_is_first_stage_that_falls_behind():
+    stages = [
+        {"offered_rps": 5, "overall": {"error_rate": 0.0, "p95_ms": 100, "throughput_rps": 5}},
+        {"offered_rps": 10, "overall": {"error_rate": 0.0, "p95_ms": 900, "throughput_rps": 10}},
+        {"offered_rps": 20, "overall": {"error_rate": 0.2, "p95_ms": 900, "throughput_rps": 12}},
+    ]
+    assert saturation_point(stages) == 20
+    assert saturation_point(stages, max_p95_ms=500) == 10
+    assert saturation_point(stages[:1]) is None
+
+
+def test_report_includes_ttft_for_streaming_scenarios():
+    samples = [
+        Sample("ask_stream", 2.0, 0.5, 200, ttft_s=0.1),
+        Sample("classify", 2.0, 0.2, 200),
+        Sample("classify", 2.0, 0.3, 500),
+    ]
+    report = build_report([StageResult(2.0, 1.0, samples)], metadata={"commit": "abc"})
+    stage = report["stages"][0]
+    assert stage["scenarios"]["ask_stream"]["ttft_p50_ms"] == 100.0
+    assert stage["scenarios"]["classify"]["error_rate"] == 0.5
+    assert "| classify |" in to_markdown(report)
+
+
+def test_select_mix_rejects_unknown_scenarios():
+    assert [s.name for s in select_mix(["classify"])] == ["classify"]
+    with pytest.raises(ValueError):
+        select_mix(["nope"])
+
+
+@pytest.mark.asyncio
+async def test_run_against_app(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test/api/v1") as client:
+        mix = select_mix(["documents_create", "documents_get"])
+        results = await run(client, mix, rates=[50], duration=0.2, seed_data=False)
+    samples = results[0].samples
+    assert samples
+    assert {s.scenario for s in samples} <= {"documents_create", "documents_get"}
+    assert all(s.status in (201, 404) for s in samples)
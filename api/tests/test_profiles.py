@@ -0,0 +1,84 @@
+"""Tests for per-flow generation profiles."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.chat_models import create_chat_model
+from app.core.config import Settings
+from app.llm.profiles import GenerationProfile, get_profile, ollama_options, openai_params
+from app.services_llm import LLMClient
+
+
+def test_get_profile_applies_settings_overrides():
+    settings = Settings(
+        llm_generation_profiles={"classify": {"max_tokens": 4, "stop": [".", "\n"], "bogus": 1}}
+    )
+    with patch("app.llm.profiles.get_settings", return_value=settings):
+        profile = get_profile("classify")
+    assert profile.max_tokens == 4
+    assert profile.stop == (".", "\n")
+    assert profile.temperature == 0.0
+
+
+def test_get_profile_unknown_name_uses_provider_defaults():
+    profile = get_profile("something-new")
+    assert profile == GenerationProfile("something-new")
+    assert ollama_options(profile, default_max_tokens=512) == {"num_predict": 512}
+    assert openai_params(profile, default_max_tokens=2048) == {"max_tokens": 2048}
+
+
+def test_classify_profile_caps_tokens_without_newline_stop():
+    profile = get_profile("classify")
+    assert ollama_options(profile, default_max_tokens=512) == {
+        "num_predict": 8,
+        "temperature": 0.0,
+    }
+    assert openai_params(profile, default_max_tokens=2048) == {
+        "max_tokens": 8,
+        "temperature": 0.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_classify_label_after_leading_newline_is_kept():
+    settings = Settings(llm_provider="ollama", llm_base_url="http://localhost:11434")
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"response": "\nInvoice\n", "model": "m"}
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=response)
+        result = await client.complete("Classify", tenant_id="t1", profile=get_profile("classify"))
+
+    assert result.raw_text == "Invoice"
+
+
+@pytest.mark.asyncio
+async def test_llm_client_sends_profile_to_ollama():
+    settings = Settings(llm_provider="ollama", llm_base_url="http://localhost:11434")
+    with patch("app.services_llm.get_settings", return_value=settings):
+        client = LLMClient()
+
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"response": "invoice", "model": "m"}
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=response)
+        await client.complete("Classify", tenant_id="t1", profile=get_profile("classify"))
+
+    payload = mock_client.return_value.__aenter__.return_value.post.call_args.kwargs["json"]
+    assert payload["options"]["num_predict"] == 8
+    assert "stop" not in payload["options"]
+    assert mock_client.call_args.kwargs["timeout"] == 15.0
+
+
+def test_create_chat_model_uses_profile_limits():
+    settings = Settings(llm_provider="openai_compatible", llm_base_url="http://localhost:8000")
+    profile = GenerationProfile("summarizer", max_tokens=128, stop=("END",), temperature=0.3)
+    model = create_chat_model(settings, profile)
+    assert model.max_tokens == 128
+    assert model.stop == ["END"]
+    assert model.temperature == 0.3
@@ -33,6 +33,45 @@ def test_chunk_text_respects_sentence_boundaries():
     assert any(c.strip().endswith(".") for c in chunks)
 
 
+# --- Passage selection tests ---
+
+
+def test_keyword_passages_ranks_by_query_terms_in_document_order():
+    """keyword_passages returns the chunks that match the query, in document order."""
+    from app.rag.passages import keyword_passages
+
+    filler = "General provisions apply to this agreement. " * 12
+    text = (
+        filler
+        + "The purchase price is 350000 euro, payable at transfer. "
+        + filler
+        + "The purchase price may be adjusted for defects found before transfer. "
+        + filler
+    )
+    passages = keyword_passages(text, "what is the purchase price?", top_k=2, chunk_size=200)
+
+    assert len(passages) == 2
+    assert all("purchase price" in p["text"] for p in passages)
+    assert passages[0]["chunk_index"] < passages[1]["chunk_index"]
+
+
+def test_keyword_passages_without_matches_returns_opening_chunks():
+    """Without matching query terms the opening chunks are returned."""
+    from app.rag.passages import keyword_passages
+
+    text = "Alpha beta gamma. " * 60
+    passages = keyword_passages(text, "", top_k=2, chunk_size=200)
+    assert [p["chunk_index"] for p in passages] == [0, 1]
+
+
+def test_outline_collects_heading_lines():
+    """outline picks markdown, numbered and article headings."""
+    from app.rag.passages import outline
+
+    text = "# Koopakte\nIntro text that is long enough to not be a heading at all.\n1. Partijen\nArtikel 2 Koopprijs\nplain line"
+    assert outline(text) == ["Koopakte", "1. Partijen", "Artikel 2 Koopprijs"]
+
+
 # --- Embedding service tests ---
 
 
@@ -9,9 +9,11 @@ import pytest
 from app.core.redis import (
     cache_key,
     check_rate_limit,
+    check_token_quota,
     close_redis,
     get_cached,
     ping_redis,
+    record_token_usage,
     set_cached,
 )
 
@@ -163,6 +165,66 @@ async def test_check_rate_limit_exception_returns_true():
         assert result is True
 
 
+@pytest.mark.asyncio
+async def test_record_token_usage_increments_minute_and_day_counters():
+    """record_token_usage adds tokens to both fixed-window counters."""
+    mock_client = MagicMock()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    mock_client.pipeline.return_value = pipe
+    with patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = mock_client
+        await record_token_usage("t1", 42)
+    keys = [c.args for c in pipe.incrby.call_args_list]
+    assert [k[1] for k in keys] == [42, 42]
+    assert keys[0][0].startswith("tq:t1:m:") and keys[1][0].startswith("tq:t1:d:")
+
+
+@pytest.mark.asyncio
+async def test_record_token_usage_logs_redis_errors():
+    """record_token_usage does not raise on Redis errors, but logs them."""
+    mock_client = MagicMock()
+    mock_client.pipeline.side_effect = ConnectionError("Redis down")
+    with (
+        patch("app.core.redis.get_redis", AsyncMock(return_value=mock_client)),
+        patch("app.core.redis.logger") as logger,
+    ):
+        await record_token_usage("t1", 42)
+    logger.warning.assert_called_once()
+    assert logger.warning.call_args.kwargs["error"] == "Redis down"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("used", "expected"),
+    [
+        ((None, None), None),
+        (("999", "5000"), None),
+        (("1000", "5000"), "minute"),
+        (("1", "9000"), "day"),
+    ],
+)
+async def test_check_token_quota(used, expected):
+    """check_token_quota reports the first exhausted window."""
+    mock_client = MagicMock()
+    mock_client.mget = AsyncMock(return_value=list(used))
+    with patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = mock_client
+        assert await check_token_quota("t1", per_minute=1000, per_day=9000) == expected
+
+
+@pytest.mark.asyncio
+async def test_check_token_quota_fails_open():
+    """check_token_quota allows the request when Redis errors or quotas are disabled."""
+    mock_client = MagicMock()
+    mock_client.mget = AsyncMock(side_effect=ConnectionError("Redis down"))
+    with patch("app.core.redis.get_redis", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = mock_client
+        assert await check_token_quota("t1", per_minute=10, per_day=0) is None
+        assert await check_token_quota("t1", per_minute=0, per_day=0) is None
+    mock_client.mget.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_close_redis():
     """close_redis closes client and sets to None."""
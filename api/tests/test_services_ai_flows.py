@@ -125,6 +125,20 @@ async def test_classify_label_matching(db_session):
         assert out.confidence == 0.9
 
 
+@pytest.mark.asyncio
+async def test_classify_opts_into_hedging(db_session):
+    with patch("app.services_ai_flows.llm_client") as mock_llm:
+        mock_llm.complete = AsyncMock(
+            return_value=LLMResult(raw_text="letter", model="mock", latency_ms=1.0),
+        )
+        await run_classify_flow(
+            tenant_id="t1",
+            db=db_session,
+            payload=ClassifyRequest(text="Dear Sir,", candidate_labels=["letter", "invoice"]),
+        )
+        assert mock_llm.complete.call_args.kwargs["hedge"] is True
+
+
 @pytest.mark.asyncio
 async def test_classify_label_not_in_candidates_uses_first(db_session):
     with patch("app.services_ai_flows.llm_client") as mock_llm:
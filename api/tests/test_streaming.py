@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
-from unittest.mock import patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from prometheus_client import REGISTRY
+
+from app.http.sse import sse_event, stream_text_tokens
+from app.llm.streaming import StreamObserver
 
 
 @pytest.mark.asyncio
@@ -95,3 +100,222 @@ async def test_ask_stream_respects_tenant(client, tenant_headers):
             assert r.status_code == 200
         mock_stream.assert_called_once()
         assert mock_stream.call_args.kwargs["tenant_id"] == "tenant-1"
+
+
+def _disconnecting_request(*states: bool) -> MagicMock:
+    request = MagicMock()
+    request.url.path = "/api/v1/ai/ask/stream"
+    request.is_disconnected = AsyncMock(side_effect=list(states))
+    return request
+
+
+def _tracked_source(tokens: list[str], closed: list[bool]):
+    async def source():
+        try:
+            for token in tokens:
+                yield token
+        finally:
+            closed.append(True)
+
+    return source()
+
+
+@pytest.mark.asyncio
+async def test_stream_text_tokens_stops_and_closes_source_on_disconnect():
+    """A disconnected client stops the stream and closes the upstream generator."""
+    closed: list[bool] = []
+    request = _disconnecting_request(False, True)
+    before = REGISTRY.get_sample_value(
+        "ai_platform_llm_tokens_saved_total", {"path": "/api/v1/ai/ask/stream"}
+    )
+
+    events = [
+        e
+        async for e in stream_text_tokens(
+            _tracked_source(["abcdefgh", "b", "c"], closed),
+            request=request,
+            max_tokens=10,
+            disconnect_check_interval=0,
+        )
+    ]
+
+    assert events == [sse_event({"token": "abcdefgh"})]
+    assert closed == [True]
+    after = REGISTRY.get_sample_value(
+        "ai_platform_llm_tokens_saved_total", {"path": "/api/v1/ai/ask/stream"}
+    )
+    # Saved tokens are estimated from the text sent (8 chars ~ 2 tokens), not chunks.
+    assert after - (before or 0) == 8
+
+
+@pytest.mark.asyncio
+async def test_stream_text_tokens_polls_connection_at_most_once_per_interval():
+    """The connection is checked on a time interval, not before every token."""
+    request = MagicMock()
+    request.url.path = "/api/v1/ai/ask/stream"
+    request.is_disconnected = AsyncMock(return_value=False)
+    tokens = [str(i) for i in range(50)]
+
+    events = [
+        e
+        async for e in stream_text_tokens(
+            _tracked_source(tokens, []), request=request, disconnect_check_interval=60
+        )
+    ]
+
+    assert len(events) == 51
+    assert request.is_disconnected.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_text_tokens_closes_source_when_cancelled():
+    """Server-side cancellation (e.g. disconnect listener) still closes the upstream stream."""
+    closed: list[bool] = []
+    started = asyncio.Event()
+
+    async def slow_source():
+        try:
+            yield "a"
+            started.set()
+            await asyncio.sleep(10)
+            yield "b"
+        finally:
+            closed.append(True)
+
+    async def consume():
+        async for _ in stream_text_tokens(slow_source()):
+            pass
+
+    task = asyncio.create_task(consume())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_stream_text_tokens_completes_when_client_connected():
+    """Connected clients receive every token and the done event."""
+    closed: list[bool] = []
+    request = _disconnecting_request(False, False)
+    events = [
+        e async for e in stream_text_tokens(_tracked_source(["a", "b"], closed), request=request)
+    ]
+    assert events[-1] == sse_event({"done": True})
+    assert len(events) == 3
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_stream_text_tokens_coalesces_fast_chunks():
+    """Coalescing merges chunks that arrive within the flush window into one event."""
+
+    async def source():
+        for token in ["Hel", "lo", " wor", "ld"]:
+            yield token
+
+    events = [e async for e in stream_text_tokens(source(), coalesce=True)]
+    assert events == [sse_event({"token": "Hello world"}), sse_event({"done": True})]
+
+
+@pytest.mark.asyncio
+async def test_stream_text_tokens_coalesce_flushes_on_interval_and_size():
+    """Batches flush when the interval elapses and once the byte limit is reached."""
+
+    async def source():
+        yield "a"
+        await asyncio.sleep(0.05)
+        yield "bbbb"
+        yield "cc"
+
+    with patch("app.http.sse.get_settings") as m:
+        m.return_value.sse_coalesce_flush_ms = 10
+        m.return_value.sse_coalesce_max_bytes = 4
+        events = [e async for e in stream_text_tokens(source(), coalesce=True)]
+    assert events == [
+        sse_event({"token": "a"}),
+        sse_event({"token": "bbbb"}),
+        sse_event({"token": "cc"}),
+        sse_event({"done": True}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_accepts_coalesce_query_param(client, tenant_headers):
+    """Clients opt into coalesced frames with ?coalesce=true."""
+    with patch("app.http.routers.workflows.run_ask_flow_stream") as mock_stream:
+
+        async def fake_stream(*args, **kwargs):
+            yield "50"
+            yield " EUR"
+
+        mock_stream.return_value = fake_stream()
+        r = await client.post(
+            "/api/v1/ai/ask/stream?coalesce=true",
+            headers=tenant_headers,
+            json={"question": "Total?", "context": "Total is 50 EUR."},
+        )
+    assert r.status_code == 200
+    assert r.text == 'data: {"token":"50 EUR"}\n\ndata: {"done":true}\n\n'
+
+
+def test_stream_observer_records_ttft_and_throughput():
+    """StreamObserver reports TTFT, duration, token count and tokens/sec once."""
+    now = [0.0]
+    labels = {"provider": "ollama", "model": "obs-model", "flow": "observer_test"}
+    observer = StreamObserver(**labels, clock=lambda: now[0])
+    now[0] = 0.5
+    observer.on_token()
+    for _ in range(10):
+        now[0] += 0.1
+        observer.on_token()
+    observer.finish()
+    observer.finish()
+
+    def sample(name):
+        return REGISTRY.get_sample_value(name, labels)
+
+    assert sample("ai_platform_llm_time_to_first_token_seconds_sum") == pytest.approx(0.5)
+    assert sample("ai_platform_llm_stream_duration_seconds_sum") == pytest.approx(1.5)
+    assert sample("ai_platform_llm_stream_duration_seconds_count") == 1
+    assert sample("ai_platform_llm_stream_tokens_sum") == 11
+    assert sample("ai_platform_llm_stream_tokens_per_second_sum") == pytest.approx(10.0)
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_flow_label_reaches_provider_metrics():
+    """Provider stream metrics are labelled with the calling flow."""
+    from app.services_llm import LLMClient
+
+    with patch("app.services_llm.get_settings") as m:
+        m.return_value.llm_base_url = "http://localhost:11434"
+        m.return_value.llm_provider = "ollama"
+        m.return_value.llm_model = "flow-label-model"
+        m.return_value.llm_timeout_seconds = 30
+        client = LLMClient()
+
+    lines = ['{"response": "Hi"}', '{"response": " there"}']
+
+    async def aiter_lines():
+        for line in lines:
+            yield line
+
+    response = MagicMock(status_code=200, aiter_lines=aiter_lines)
+    with patch("httpx.AsyncClient") as mock_client_cls:
+        stream_cm = MagicMock()
+        stream_cm.__aenter__ = AsyncMock(return_value=response)
+        stream_cm.__aexit__ = AsyncMock(return_value=None)
+        mock_client_cls.return_value.__aenter__.return_value.stream = MagicMock(
+            return_value=stream_cm
+        )
+        tokens = [t async for t in client.stream_complete("hi", flow="ask_stream")]
+
+    assert tokens == ["Hi", " there"]
+    assert (
+        REGISTRY.get_sample_value(
+            "ai_platform_llm_stream_tokens_sum",
+            {"provider": "ollama", "model": "flow-label-model", "flow": "ask_stream"},
+        )
+        == 2
+    )
@@ -0,0 +1,154 @@
+"""Tests for per-tenant token accounting and token quotas."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import Settings
+from app.http.middleware import _install_rate_limit_middleware
+from app.llm.types import LLMResult
+from app.core.metrics import LLM_TOKENS_USED, TOKEN_QUOTA_REJECTIONS
+from app.llm.usage import estimate_tokens, record_usage, tenant_label, token_quota_limits
+from app.services_llm import LLMClient
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens(None) == 0
+    assert estimate_tokens("abcde") == 2
+
+
+def test_token_quota_limits_apply_tenant_overrides():
+    settings = Settings(
+        token_quota_per_minute=1000,
+        token_quota_per_day=50000,
+        token_quota_overrides={"heavy": {"per_minute": 100}},
+    )
+    assert token_quota_limits(settings, "t1") == (1000, 50000)
+    assert token_quota_limits(settings, "heavy") == (100, 50000)
+
+
+def test_tenant_label_buckets_unconfigured_tenants():
+    settings = Settings(
+        token_quota_overrides={"heavy": {"per_minute": 100}}, metrics_tenant_labels=["acme"]
+    )
+    assert tenant_label(settings, "default") == "default"
+    assert tenant_label(settings, "heavy") == "heavy"
+    assert tenant_label(settings, "acme") == "acme"
+    assert tenant_label(settings, "random-header-value") == "other"
+
+
+@pytest.mark.asyncio
+async def test_usage_of_unconfigured_tenant_is_counted_as_other():
+    def tokens(tenant: str) -> float:
+        return LLM_TOKENS_USED.labels(
+            tenant_id=tenant, flow="ask", token_type="prompt"
+        )._value.get()
+
+    before = tokens("other")
+    with (
+        patch("app.core.config.get_settings", return_value=Settings()),
+        patch("app.llm.usage.record_token_usage", new_callable=AsyncMock) as record,
+    ):
+        await record_usage("unknown-tenant", flow="ask", prompt_tokens=5, completion_tokens=1)
+    assert tokens("other") == before + 5
+    assert tokens("unknown-tenant") == 0
+    # Quota counters stay per tenant.
+    record.assert_awaited_once_with("unknown-tenant", 6)
+
+
+def _client() -> LLMClient:
+    settings = Settings(llm_provider="ollama", llm_base_url="http://primary:11434")
+    with patch("app.services_llm.get_settings", return_value=settings):
+        return LLMClient()
+
+
+@pytest.mark.asyncio
+async def test_complete_records_provider_reported_usage():
+    client = _client()
+    result = LLMResult(
+        raw_text="ok", model="m", latency_ms=1.0, prompt_tokens=120, completion_tokens=8
+    )
+    with (
+        patch.object(client._providers["ollama"], "complete", AsyncMock(return_value=result)),
+        patch("app.llm.usage.record_token_usage", new_callable=AsyncMock) as record,
+    ):
+        await client.complete("hello", tenant_id="t1", flow="ask")
+    record.assert_awaited_once_with("t1", 128)
+
+
+@pytest.mark.asyncio
+async def test_complete_estimates_usage_when_provider_reports_none():
+    client = _client()
+    result = LLMResult(raw_text="12345678", model="m", latency_ms=1.0)
+    with (
+        patch.object(client._providers["ollama"], "complete", AsyncMock(return_value=result)),
+        patch("app.llm.usage.record_token_usage", new_callable=AsyncMock) as record,
+    ):
+        await client.complete("x" * 40, tenant_id="t1")
+    record.assert_awaited_once_with("t1", 10 + 2)
+
+
+@pytest.mark.asyncio
+async def test_stream_complete_records_estimated_usage():
+    client = _client()
+
+    async def tokens(*args, **kwargs):
+        yield "abcd"
+        yield "efgh"
+
+    with (
+        patch.object(client._providers["ollama"], "stream_complete", tokens),
+        patch("app.llm.usage.record_token_usage", new_callable=AsyncMock) as record,
+    ):
+        chunks = [c async for c in client.stream_complete("x" * 8, tenant_id="t1")]
+    assert chunks == ["abcd", "efgh"]
+    record.assert_awaited_once_with("t1", 2 + 2)
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_tenant_over_token_quota():
+    settings = Settings(token_quota_per_minute=1000)
+    app = FastAPI()
+    _install_rate_limit_middleware(app, settings)
+
+    @app.get(f"{settings.api_v1_prefix}/probe")
+    async def probe():
+        return {}
+
+    with (
+        patch("app.http.middleware.check_rate_limit", AsyncMock(return_value=True)),
+        patch("app.http.middleware.check_token_quota", AsyncMock(return_value="minute")) as quota,
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://t") as ac:
+            r = await ac.get(f"{settings.api_v1_prefix}/probe", headers={"X-Tenant-ID": "t1"})
+    assert r.status_code == 429
+    assert 0 < int(r.headers["Retry-After"]) <= 60
+    quota.assert_awaited_once_with("t1", per_minute=1000, per_day=0)
+
+
+@pytest.mark.asyncio
+async def test_quota_rejections_of_unconfigured_tenants_share_one_label():
+    settings = Settings(token_quota_per_minute=1000)
+    app = FastAPI()
+    _install_rate_limit_middleware(app, settings)
+
+    @app.get(f"{settings.api_v1_prefix}/probe")
+    async def probe():
+        return {}
+
+    other = TOKEN_QUOTA_REJECTIONS.labels(tenant_id="other", window="minute")
+    before = other._value.get()
+    with (
+        patch("app.http.middleware.check_rate_limit", AsyncMock(return_value=True)),
+        patch("app.http.middleware.check_token_quota", AsyncMock(return_value="minute")),
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://t") as ac:
+            for tenant in ("x1", "x2"):
+                headers = {"X-Tenant-ID": tenant}
+                await ac.get(f"{settings.api_v1_prefix}/probe", headers=headers)
+    assert other._value.get() == before + 2
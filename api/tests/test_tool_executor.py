@@ -0,0 +1,112 @@
+"""Tests for the agent's concurrent tool-execution node."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from app.agents.tool_executor import ToolExecutor
+from app.agents.tools import document_lookup_config, document_lookup_tool
+from app.core.config import get_settings
+from app.core.metrics import AGENT_TOOL_CALLS
+
+
+@tool
+async def slow_tool(x: str) -> str:
+    """Sleeps briefly, then echoes."""
+    await asyncio.sleep(0.2)
+    return f"slow:{x}"
+
+
+@tool
+async def hanging_tool(x: str) -> str:
+    """Never finishes in time."""
+    await asyncio.sleep(10)
+    return "late"
+
+
+def _state(*calls: tuple[str, dict]) -> dict:
+    tool_calls = [{"name": n, "args": a, "id": f"call_{i}"} for i, (n, a) in enumerate(calls)]
+    return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+
+
+def _settings(**update):
+    return get_settings().model_copy(update=update)
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_in_one_turn_run_concurrently():
+    executor = ToolExecutor([slow_tool])
+    started = time.perf_counter()
+    result = await executor(_state(*[("slow_tool", {"x": str(i)}) for i in range(5)]), {})
+    elapsed = time.perf_counter() - started
+
+    assert [m.content for m in result["messages"]] == [f"slow:{i}" for i in range(5)]
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_timed_out_tool_returns_partial_results():
+    executor = ToolExecutor([slow_tool, hanging_tool])
+    settings = _settings(agent_tool_timeouts={"hanging_tool": 0.3})
+    with patch("app.core.config.get_settings", return_value=settings):
+        started = time.perf_counter()
+        result = await executor(_state(("slow_tool", {"x": "a"}), ("hanging_tool", {"x": "b"})), {})
+        elapsed = time.perf_counter() - started
+
+    fast, slow = result["messages"]
+    assert fast.content == "slow:a" and fast.status == "success"
+    assert "timed out" in slow.content and slow.status == "error"
+    assert slow.tool_call_id == "call_1"
+    assert elapsed < 1.0
+
+
+@pytest.mark.asyncio
+async def test_unknown_tool_and_tool_errors_become_error_messages():
+    @tool
+    async def broken_tool(x: str) -> str:
+        """Always fails."""
+        raise RuntimeError("backend down")
+
+    executor = ToolExecutor([broken_tool])
+    result = await executor(_state(("broken_tool", {"x": "a"}), ("missing_tool", {})), {})
+
+    broken, missing = result["messages"]
+    assert "backend down" in broken.content and broken.status == "error"
+    assert "unknown tool" in missing.content
+
+
+@pytest.mark.asyncio
+async def test_run_config_reaches_tools():
+    get_doc = AsyncMock(return_value={"title": "Deed", "text": "Body"})
+    executor = ToolExecutor([document_lookup_tool])
+    config = {"configurable": document_lookup_config("t1", get_doc)}
+
+    result = await executor(_state(("document_lookup_tool", {"document_id": "d1"})), config)
+
+    assert "Deed" in result["messages"][0].content
+    get_doc.assert_awaited_once_with("d1", "t1")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_tool_call_reports_cancelled_not_success():
+    events = []
+    executor = ToolExecutor([hanging_tool])
+    calls = AGENT_TOOL_CALLS.labels(tool_name="hanging_tool", status="cancelled")
+    before = calls._value.get()
+
+    task = asyncio.create_task(
+        executor(_state(("hanging_tool", {"x": "a"})), {}, writer=events.append)
+    )
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert calls._value.get() == before + 1
+    assert events[-1]["type"] == "tool_end" and events[-1]["status"] == "cancelled"
@@ -0,0 +1,119 @@
+"""Tests for Ollama model warm-up and readiness."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.core.config import Settings
+from app.llm.warmup import ModelWarmer
+
+
+def _settings(**overrides) -> Settings:
+    values = {
+        "llm_provider": "ollama",
+        "llm_base_url": "http://localhost:11434",
+        "llm_model": "llama3.2",
+        "llm_warmup_models": ["nomic-embed-text", "llama3.2"],
+        "llm_keep_alive": "1h",
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def test_warmer_is_ready_immediately_when_not_ollama():
+    warmer = ModelWarmer(_settings(llm_provider="openai_compatible"))
+    assert warmer.enabled is False
+    assert warmer.ready is True
+
+
+@pytest.mark.asyncio
+async def test_warm_once_preloads_each_model_with_keep_alive():
+    warmer = ModelWarmer(_settings())
+    assert warmer.ready is False
+
+    with patch("httpx.AsyncClient") as mock_client:
+        post = AsyncMock(return_value=MagicMock())
+        mock_client.return_value.__aenter__.return_value.post = post
+        assert await warmer.warm_once() is True
+
+    payloads = [c.kwargs["json"] for c in post.call_args_list]
+    assert [p["model"] for p in payloads] == ["llama3.2", "nomic-embed-text"]
+    assert all(p["prompt"] == "" and p["keep_alive"] == "1h" for p in payloads)
+    assert warmer.warmed_models == {"llama3.2", "nomic-embed-text"}
+
+
+def _response(status_code: int) -> httpx.Response:
+    return httpx.Response(status_code, request=httpx.Request("POST", "http://localhost:11434"))
+
+
+@pytest.mark.asyncio
+async def test_embedding_models_are_loaded_through_embed_endpoint():
+    warmer = ModelWarmer(_settings())
+
+    async def post(url, json):
+        if url.endswith("/api/generate"):
+            return _response(400 if json["model"] == "nomic-embed-text" else 200)
+        return _response(200)
+
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_post = AsyncMock(side_effect=post)
+        mock_client.return_value.__aenter__.return_value.post = mock_post
+        assert await warmer.warm_once() is True
+        mock_post.reset_mock()
+        assert await warmer.warm_once() is True
+
+    assert warmer.warmed_models == {"llama3.2", "nomic-embed-text"}
+    # Once known, embedding models go straight to /api/embed on refresh.
+    urls = [(c.args[0], c.kwargs["json"]["model"]) for c in mock_post.call_args_list]
+    assert urls == [
+        ("http://localhost:11434/api/generate", "llama3.2"),
+        ("http://localhost:11434/api/embed", "nomic-embed-text"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_auxiliary_model_does_not_block_readiness():
+    warmer = ModelWarmer(_settings(llm_warmup_refresh_seconds=0))
+
+    async def post(url, json):
+        return _response(500 if json["model"] == "nomic-embed-text" else 200)
+
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = AsyncMock(side_effect=post)
+        warmer.start()
+        await warmer._task
+
+    assert warmer.ready is True
+    assert warmer.warmed_models == {"llama3.2"}
+    assert "nomic-embed-text" in warmer.last_error
+    await warmer.stop()
+
+
+@pytest.mark.asyncio
+async def test_warmer_becomes_ready_after_failed_warmup_gives_up():
+    warmer = ModelWarmer(_settings(llm_warmup_max_wait_seconds=0, llm_warmup_refresh_seconds=0))
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+            side_effect=httpx.ConnectError("refused")
+        )
+        warmer.start()
+        await warmer._task
+    assert warmer.ready is True
+    assert "refused" in warmer.last_error
+    await warmer.stop()
+
+
+@pytest.mark.asyncio
+async def test_readiness_endpoint_reflects_warmup_state(app, client):
+    app.state.model_warmer = MagicMock(ready=False)
+    r = await client.get("/api/v1/health/ready")
+    assert r.status_code == 503
+    assert (await client.get("/api/v1/health")).json()["ready"] is False
+
+    app.state.model_warmer.ready = True
+    r = await client.get("/api/v1/health/ready")
+    assert r.status_code == 200
+    assert r.json() == {"ready": True}